@@ -0,0 +1,345 @@
+from dataclasses import dataclass
+
+import pandas as pd
+
+from cubo import (AGREGACOES, NOTAS, COLUNAS_HISTOGRAMA, construir_cubo,
+                  agregar, totais, ordem_aparicao, contagem_notas)
+from esquema import DIMENSOES, LIMITE_NOTA_BAIXA, FAIXAS_CATEGORIA, ROTULOS_CATEGORIA, normalizar_esquema
+from reamostragem import REPLICAS, ajuste_benjamini_hochberg, bootstrap_medias, teste_permutacao_celulas
+from risco import tabela_risco
+from tendencias import FREQUENCIAS, construir_cubo_temporal, tendencias, variacao_recente
+
+# ============================================================================
+# API DAS ANÁLISES
+# Cada análise recebe os dados (DataFrame com as colunas originais ou o cubo
+# já agregado) e devolve um objeto com as tabelas calculadas, sem imprimir
+# nada nem gravar arquivos. O relatório no console e os gráficos (main.py e
+# graficos.py) são apenas consumidores destes resultados.
+# ============================================================================
+
+# Probabilidade de nota baixa (%) que o limite inferior do IC 95% precisa passar para
+# se recomendar treinamento
+LIMITE_TREINAMENTO = 20
+
+
+@dataclass(frozen=True)
+class ResultadosIndividuais:
+    """Estatísticas de cada atendente (análise 1)"""
+    tabela: pd.DataFrame
+    histogramas: pd.DataFrame
+    media_geral: float
+
+
+@dataclass(frozen=True)
+class RankingAtendentes:
+    """Atendentes por média CSAT, da maior para a menor (análise 2)"""
+    tabela: pd.DataFrame
+    media_geral: float
+
+
+@dataclass(frozen=True)
+class RankingTiposContato:
+    """Tipos de contato por média CSAT, da maior para a menor (análise 3)"""
+    tabela: pd.DataFrame
+
+
+@dataclass(frozen=True)
+class TiposExtremos:
+    """Melhor ou pior tipo de contato de cada atendente (análises 4 e 5)
+
+    `celulas` tem média e volume só das combinações atendente × tipo de
+    contato observadas (formato longo), sem a matriz densa, quase toda
+    vazia quando há muitos atendentes e tipos.
+    """
+    tabela: pd.DataFrame
+    celulas: pd.DataFrame
+    media_geral: float
+
+
+@dataclass(frozen=True)
+class ProcessosNotasBaixas:
+    """Tipos de contato com mais notas baixas por fluxo do processo (análise 6)"""
+    tabela: pd.DataFrame
+    por_opportunity: pd.DataFrame
+
+
+@dataclass(frozen=True)
+class DestaquesAtendentes:
+    """Desempenho de cada atendente por tipo de contato e por opportunity (análise 7)
+
+    `perfis` resume cada atendente numa linha: média, volume e os tipos de
+    contato de destaque (maior média) e de dificuldade (menor média).
+    """
+    geral: pd.DataFrame
+    por_tipo: pd.DataFrame
+    por_opportunity: pd.DataFrame
+    perfis: pd.DataFrame
+
+
+@dataclass(frozen=True)
+class ProbabilidadeNotaBaixa:
+    """Risco de nota baixa por atendente e por célula atendente × tipo de contato (análise 8)"""
+    tabela: pd.DataFrame
+    celulas: pd.DataFrame
+    geral: pd.Series
+
+
+@dataclass(frozen=True)
+class Recomendacoes:
+    """Indicadores e grupos que embasam as recomendações (análise 9)"""
+    geral: pd.Series
+    notas_altas: int
+    treinamento: pd.DataFrame
+    tipos_problematicos: pd.Series
+    por_opportunity: pd.DataFrame
+    melhores_atendentes: pd.DataFrame
+    categorias: pd.Series
+    volume: pd.Series
+
+
+@dataclass(frozen=True)
+class Tendencias:
+    """Médias móveis por grupo e variação recente (análise 10)"""
+    tabela: pd.DataFrame
+    variacao_atendentes: pd.DataFrame
+    variacao_tipos: pd.DataFrame
+    geral_semanal: pd.DataFrame
+
+
+@dataclass(frozen=True)
+class Significancia:
+    """Incerteza dos rankings e células piores que a média do atendente (análise 11)
+
+    `tabela` junta as outras três, uma seção por nível 'tabela'.
+    """
+    tabela: pd.DataFrame
+    atendentes: pd.DataFrame
+    tipos_contato: pd.DataFrame
+    celulas: pd.DataFrame
+    replicas: int
+    semente: int
+
+
+def preparar_cubo(dados):
+    """Devolve o cubo de agregação: `dados` pode ser o próprio cubo ou um DataFrame de avaliações"""
+    if isinstance(dados.index, pd.MultiIndex) and list(dados.index.names) == DIMENSOES \
+            and set(AGREGACOES) <= set(dados.columns):
+        return dados
+    return construir_cubo(normalizar_esquema(dados))
+
+
+def preparar_temporal(dados):
+    """Devolve o cubo temporal: `dados` pode ser o próprio cubo temporal ou um DataFrame de avaliações"""
+    if dados is None or isinstance(dados.index, pd.MultiIndex):
+        return dados
+    return construir_cubo_temporal(normalizar_esquema(dados))
+
+
+def resultados_individuais(dados):
+    """1 - Média, mediana, desvio, volume e extremos das notas de cada atendente"""
+    cubo = preparar_cubo(dados)
+    por_atendente = agregar(cubo, ['attendant'])
+    tabela = por_atendente[['media', 'mediana', 'desvio_padrao', 'n', 'min', 'max', 'soma']].round(2)
+    tabela.columns = ['Média', 'Mediana', 'Desvio Padrão', 'Total Avaliações', 'Nota Mín', 'Nota Máx', 'Soma']
+    return ResultadosIndividuais(tabela, por_atendente[COLUNAS_HISTOGRAMA], totais(cubo)['media'])
+
+
+def ranking_atendentes(dados):
+    """2 - Atendentes em ordem decrescente de média"""
+    cubo = preparar_cubo(dados)
+    ranking = agregar(cubo, ['attendant'])[['media', 'n']].round(2)
+    ranking.columns = ['Média CSAT', 'Total Avaliações']
+    ranking = ranking.sort_values('Média CSAT', ascending=False)
+    ranking['Posição'] = range(1, len(ranking) + 1)
+    return RankingAtendentes(ranking[['Posição', 'Média CSAT', 'Total Avaliações']], totais(cubo)['media'])
+
+
+def ranking_tipos_contato(dados):
+    """3 - Tipos de contato em ordem decrescente de média"""
+    ranking = agregar(preparar_cubo(dados), ['contact type'])[['media', 'n']].round(2)
+    ranking.columns = ['Média CSAT', 'Total Avaliações']
+    return RankingTiposContato(ranking.sort_values('Média CSAT', ascending=False))
+
+
+def melhores_tipos_contato(dados):
+    """4 - Tipo de contato com a maior média de cada atendente"""
+    cubo = preparar_cubo(dados)
+    celulas = agregar(cubo, ['attendant', 'contact type'])
+    melhores = _tipo_extremo_por_atendente(cubo, celulas, 'idxmax')
+    melhores.columns = ['Atendente', 'Melhor Tipo de Contato', 'Média CSAT', 'Qtd Avaliações']
+    return TiposExtremos(melhores.sort_values('Média CSAT', ascending=False),
+                         celulas[['media', 'n']], totais(cubo)['media'])
+
+
+def piores_tipos_contato(dados):
+    """5 - Tipo de contato com a menor média de cada atendente"""
+    cubo = preparar_cubo(dados)
+    celulas = agregar(cubo, ['attendant', 'contact type'])
+    piores = _tipo_extremo_por_atendente(cubo, celulas, 'idxmin')
+    piores.columns = ['Atendente', 'Pior Tipo de Contato', 'Média CSAT', 'Qtd Avaliações']
+    return TiposExtremos(piores.sort_values('Média CSAT'),
+                         celulas[['media', 'n']], totais(cubo)['media'])
+
+
+def _tipo_extremo_por_atendente(cubo, celulas, extremo):
+    """Tipo de contato com maior (idxmax) ou menor (idxmin) média de cada atendente"""
+    medias = celulas['media'].round(2)
+
+    # Uma única passada agrupada; empates ficam com o primeiro tipo em ordem alfabética
+    posicoes = medias.groupby(level='attendant', sort=False).agg(extremo)
+    posicoes = posicoes.reindex(ordem_aparicao(cubo, 'attendant'))
+    escolhidas = celulas.loc[posicoes.to_list()]
+
+    return pd.DataFrame({
+        'attendant': escolhidas.index.get_level_values('attendant'),
+        'contact type': escolhidas.index.get_level_values('contact type'),
+        'media': medias.loc[posicoes.to_list()].to_numpy(),
+        'n': escolhidas['n'].to_numpy()
+    })
+
+
+def processos_notas_baixas(dados, opportunity='fluxo do processo', limite=5):
+    """6 - Tipos de contato com mais notas baixas (< 3) na opportunity indicada"""
+    cubo = preparar_cubo(dados)
+    fluxo = cubo[cubo.index.get_level_values('opportunity') == opportunity]
+    por_tipo = agregar(fluxo, ['contact type'])
+    por_tipo = por_tipo[por_tipo['baixas'] > 0]
+
+    # A média usa só as notas baixas do histograma
+    notas_baixas = [nota for nota in NOTAS if nota < LIMITE_NOTA_BAIXA]
+    soma_baixas = sum(por_tipo[f'nota_{nota}'] * nota for nota in notas_baixas)
+    processos = pd.DataFrame({
+        'baixas': por_tipo['baixas'],
+        'media_baixas': soma_baixas / por_tipo['baixas']
+    }).round(2)
+    processos.columns = ['Qtd Notas Baixas', 'Média Dessas Notas']
+    processos = processos.sort_values('Qtd Notas Baixas', ascending=False).head(limite)
+
+    por_opportunity = agregar(cubo, ['opportunity'])[['media', 'n']].round(2)
+    por_opportunity.columns = ['Média', 'Qtd']
+    return ProcessosNotasBaixas(processos, por_opportunity)
+
+
+def destaques_atendentes(dados):
+    """7 - Desempenho de cada atendente por tipo de contato e por opportunity"""
+    cubo = preparar_cubo(dados)
+    geral = agregar(cubo, ['attendant'])
+    por_tipo = agregar(cubo, ['attendant', 'contact type'])
+
+    # Destaque e dificuldade de todos os atendentes num único agrupamento cada
+    perfis = pd.DataFrame({'Média': geral['media'].round(2), 'Total Avaliações': geral['n']})
+    for extremo, rotulo in [('idxmax', 'Destaque'), ('idxmin', 'Dificuldade')]:
+        tipos = _tipo_extremo_por_atendente(cubo, por_tipo, extremo).set_index('attendant').reindex(geral.index)
+        perfis[rotulo] = tipos['contact type']
+        perfis[f'Média {rotulo}'] = tipos['media']
+    return DestaquesAtendentes(geral, por_tipo, agregar(cubo, ['attendant', 'opportunity']), perfis)
+
+
+def probabilidade_nota_baixa(dados):
+    """8 - Probabilidade de nota baixa por atendente, com intervalo de Wilson e estimativa ajustada"""
+    cubo = preparar_cubo(dados)
+    por_atendente = agregar(cubo, ['attendant']).reindex(ordem_aparicao(cubo, 'attendant'))
+
+    # Intervalo de Wilson e estimativa bayesiana empírica: poucas avaliações não lideram o ranking
+    risco = tabela_risco(por_atendente['baixas'], por_atendente['n'])
+    probabilidades = pd.DataFrame({
+        'Atendente': por_atendente.index,
+        'Total Avaliações': por_atendente['n'].to_numpy(),
+        'Notas Baixas': por_atendente['baixas'].to_numpy(),
+        'Probabilidade (%)': (por_atendente['baixas'] / por_atendente['n'] * 100).round(2).to_numpy(),
+        'IC 95% Inferior (%)': risco['ic_inferior'].round(2).to_numpy(),
+        'IC 95% Superior (%)': risco['ic_superior'].round(2).to_numpy(),
+        'Probabilidade Ajustada (%)': risco['ajustada'].round(2).to_numpy(),
+    })
+    probabilidades = probabilidades.sort_values('Probabilidade Ajustada (%)', ascending=False, kind='stable')
+
+    # Mesmo cálculo, de uma vez, para todas as células atendente × tipo de contato
+    por_celula = agregar(cubo, ['attendant', 'contact type'])
+    celulas = tabela_risco(por_celula['baixas'], por_celula['n']).round(2)
+    celulas.insert(0, 'n', por_celula['n'])
+    celulas = celulas.sort_values('ajustada', ascending=False, kind='stable')
+    return ProbabilidadeNotaBaixa(probabilidades, celulas, totais(cubo))
+
+
+def recomendacoes(dados, probabilidade=None, ranking=None, limite_treinamento=LIMITE_TREINAMENTO):
+    """9 - Indicadores gerais, atendentes para treinamento, processos e opportunities a revisar
+
+    `probabilidade` e `ranking` são os resultados das análises 8 e 2; se
+    omitidos, são calculados a partir dos dados.
+    """
+    cubo = preparar_cubo(dados)
+    probabilidade = probabilidade if probabilidade is not None else probabilidade_nota_baixa(cubo).tabela
+    ranking = ranking if ranking is not None else ranking_atendentes(cubo).tabela
+    geral = totais(cubo)
+    notas_altas = contagem_notas(geral.to_frame().T, [nota for nota in NOTAS if nota >= 4]).iloc[0]
+
+    # Limite inferior de Wilson: só indica quem, com 95% de confiança, passa do limite (poucas
+    # avaliações alargam o intervalo, e a estimativa ajustada tende à taxa geral, não ao limite)
+    treinamento = probabilidade[probabilidade['IC 95% Inferior (%)'] > limite_treinamento]
+
+    baixas_por_tipo = agregar(cubo, ['contact type'])['baixas']
+    tipos_problematicos = baixas_por_tipo[baixas_por_tipo > 0].sort_values(ascending=False).head(3)
+    por_opportunity = agregar(cubo, ['opportunity'])
+
+    categoria = pd.cut(NOTAS, bins=FAIXAS_CATEGORIA, labels=ROTULOS_CATEGORIA, include_lowest=True)
+    categorias = pd.Series(geral[COLUNAS_HISTOGRAMA].to_numpy(dtype=int), index=categoria)
+    categorias = categorias.groupby(level=0, observed=False).sum().sort_values(ascending=False)
+
+    # Mesma ordem de value_counts: volume decrescente, empates pela ordem de aparição
+    volume = agregar(cubo, ['attendant'])['n'].reindex(ordem_aparicao(cubo, 'attendant'))
+    volume = volume.sort_values(ascending=False, kind='stable').sort_values(ascending=True)
+
+    return Recomendacoes(geral, notas_altas, treinamento, tipos_problematicos, por_opportunity,
+                         ranking.head(3), categorias, volume)
+
+
+def tendencias_recentes(temporal, frequencia='semanal'):
+    """10 - Médias móveis de todas as granularidades e variação recente por grupo
+
+    Devolve None quando não há cubo temporal (dados sem coluna de data).
+    """
+    temporal = preparar_temporal(temporal)
+    if temporal is None or temporal.empty:
+        return None
+    tabelas = {}
+    for dimensao in ['attendant', 'contact type']:
+        for granularidade in FREQUENCIAS:
+            tabela = tendencias(temporal, dimensao, granularidade)
+            tabelas[dimensao, granularidade] = tabela.rename_axis(['periodo', 'grupo'])
+    tabela_tendencias = pd.concat(tabelas, names=['dimensao', 'frequencia'])
+
+    variacao_atendentes = variacao_recente(tabelas['attendant', frequencia].rename_axis(['periodo', 'attendant']),
+                                           'attendant', frequencia)
+    variacao_tipos = variacao_recente(tabelas['contact type', frequencia].rename_axis(['periodo', 'contact type']),
+                                      'contact type', frequencia)
+    regra, janela = FREQUENCIAS[frequencia]
+    geral = temporal.groupby(pd.Grouper(level='dia', freq=regra)).sum().rolling(janela, min_periods=1).sum()
+    return Tendencias(tabela_tendencias, variacao_atendentes.sort_values('Variação Média', kind='stable'),
+                      variacao_tipos.sort_values('Variação Média', kind='stable'), geral)
+
+
+def significancia(dados, replicas=REPLICAS, semente=0, trabalhadores=None):
+    """11 - Intervalos bootstrap e estabilidade dos rankings, e testes de permutação por célula"""
+    cubo = preparar_cubo(dados)
+    colunas = {'media': 'Média CSAT', 'ic_inferior': 'IC 95% Inferior', 'ic_superior': 'IC 95% Superior',
+               'posicao': 'Posição', 'prob_mesma_posicao': 'P(Mesma Posição) (%)',
+               'prob_primeiro': 'P(1º Lugar) (%)', 'prob_top3': 'P(Top 3) (%)'}
+    rankings = {}
+    for dimensao in ['attendant', 'contact type']:
+        estabilidade = bootstrap_medias(agregar(cubo, [dimensao]), replicas, semente, trabalhadores=trabalhadores)
+        for coluna in ['prob_mesma_posicao', 'prob_primeiro', 'prob_top3']:
+            estabilidade[coluna] = estabilidade[coluna] * 100
+        rankings[dimensao] = estabilidade.rename(columns=colunas).sort_values('Posição').round(2)
+
+    # Cada célula atendente × tipo de contato contra a média do próprio atendente
+    celulas = teste_permutacao_celulas(cubo, 'attendant', 'contact type', replicas, semente,
+                                       trabalhadores=trabalhadores)
+    celulas['q_valor'] = ajuste_benjamini_hochberg(celulas['p_valor'])
+    celulas.columns = ['Avaliações', 'Média Célula', 'Média Atendente', 'Permutações', 'p-valor', 'q-valor (BH)']
+    celulas = celulas.sort_values(['p-valor', 'Média Célula'], kind='stable').round(4)
+    tabela = pd.concat({
+        'ranking atendentes': rankings['attendant'],
+        'ranking tipos de contato': rankings['contact type'],
+        'células': celulas.set_axis([' × '.join(celula) for celula in celulas.index]),
+    }, names=['tabela', 'grupo'])
+    return Significancia(tabela, rankings['attendant'], rankings['contact type'], celulas, replicas, semente)
@@ -0,0 +1,60 @@
+"""
+Benchmark do cache colunar: compara a leitura direta da planilha com a
+primeira execução (gera o cache) e as seguintes (lê o cache via memory map).
+
+Uso:
+    python benchmarks/cache_planilha.py --linhas 1000000
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import carregar_dados  # noqa: E402
+from sintetico import gerar_dados, salvar_planilha  # noqa: E402
+
+
+def cronometrar(funcao, *args, **kwargs):
+    """Executa a função sem imprimir nada e devolve o tempo em segundos"""
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        funcao(*args, **kwargs)
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--linhas', type=int, default=1_000_000, help='linhas da planilha sintética')
+    parser.add_argument('--repeticoes', type=int, default=3, help='execuções com o cache quente')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        os.chdir(diretorio)
+        planilha = 'sintetico.xlsx'
+
+        print(f"Gerando planilha sintética com {args.linhas:,} linhas...")
+        inicio = time.perf_counter()
+        salvar_planilha(gerar_dados(args.linhas), planilha)
+        print(f"  {time.perf_counter() - inicio:.1f}s ({os.path.getsize(planilha) / 1e6:.1f} MB)")
+
+        sem_cache = cronometrar(carregar_dados, planilha, usar_cache=False)
+        frio = cronometrar(carregar_dados, planilha)
+        quente = min(cronometrar(carregar_dados, planilha) for _ in range(args.repeticoes))
+
+    print()
+    print(f"{'Cenário':<28}{'Tempo (s)':>12}")
+    print("-" * 40)
+    print(f"{'Sem cache (XLSX direto)':<28}{sem_cache:>12.2f}")
+    print(f"{'Cache frio (gera Feather)':<28}{frio:>12.2f}")
+    print(f"{'Cache quente (memory map)':<28}{quente:>12.2f}")
+    print("-" * 40)
+    print(f"Ganho do cache quente: {sem_cache / quente:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
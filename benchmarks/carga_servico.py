@@ -0,0 +1,172 @@
+"""
+Teste de carga do serviço HTTP (servico.py).
+
+Sobe o serviço num processo separado com dados sintéticos (ou um arquivo
+indicado), abre várias conexões keep-alive e dispara consultas às análises
+1 a 9 com filtros sorteados entre `--consultas-distintas` combinações durante
+`--duracao` segundos. Mostra requisições por segundo, latências (p50, p95,
+p99) e os acertos do cache LRU.
+
+Uso:
+    python benchmarks/carga_servico.py --linhas 1000000 --conexoes 32 --duracao 15
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from urllib.parse import quote
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from sintetico import salvar_parquet  # noqa: E402
+
+
+def porta_livre():
+    """Porta TCP livre no localhost"""
+    with socket.socket() as soquete:
+        soquete.bind(('127.0.0.1', 0))
+        return soquete.getsockname()[1]
+
+
+async def requisitar(leitor, escritor, metodo, caminho):
+    """Envia uma requisição HTTP/1.1 e devolve (status, corpo)"""
+    escritor.write(f"{metodo} {caminho} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode('latin-1'))
+    await escritor.drain()
+    status = int((await leitor.readline()).split()[1])
+    tamanho = 0
+    while True:
+        cabecalho = await leitor.readline()
+        if cabecalho in (b'\r\n', b''):
+            break
+        nome, _, valor = cabecalho.decode('latin-1').partition(':')
+        if nome.lower() == 'content-length':
+            tamanho = int(valor)
+    return status, await leitor.readexactly(tamanho)
+
+
+async def aguardar_servico(porta, processo, limite=600):
+    """Espera o serviço aceitar conexões (a carga dos dados pode demorar)"""
+    inicio = time.perf_counter()
+    while time.perf_counter() - inicio < limite:
+        if processo.poll() is not None:
+            raise RuntimeError("O serviço terminou antes de ficar pronto")
+        try:
+            leitor, escritor = await asyncio.open_connection('127.0.0.1', porta)
+        except OSError:
+            await asyncio.sleep(0.2)
+            continue
+        status, corpo = await requisitar(leitor, escritor, 'GET', '/saude')
+        escritor.close()
+        return time.perf_counter() - inicio, json.loads(corpo)
+    raise TimeoutError("O serviço não ficou pronto a tempo")
+
+
+def montar_consultas(quantidade, atendentes, tipos_contato, dias, semente):
+    """Combinações de análise e filtros usadas na carga"""
+    gerador = random.Random(semente)
+    consultas = []
+    for _ in range(quantidade):
+        parametros = []
+        if gerador.random() < 0.5:
+            parametros.append('tipo_contato=' + quote(gerador.choice(tipos_contato)))
+        if gerador.random() < 0.3:
+            parametros.append('atendente=' + quote(gerador.choice(atendentes)))
+        if gerador.random() < 0.5:
+            # Os dados sintéticos cobrem os `dias` dias anteriores a 2025
+            parametros.append(f'desde={date(2025, 1, 1) - timedelta(days=gerador.randint(1, dias)):%Y-%m-%d}')
+        consultas.append(f"/analises/{gerador.randint(1, 9)}?{'&'.join(parametros)}")
+    return consultas
+
+
+async def cliente(porta, consultas, fim, latencias, erros, gerador):
+    """Uma conexão keep-alive disparando consultas até o fim do teste"""
+    leitor, escritor = await asyncio.open_connection('127.0.0.1', porta)
+    try:
+        while time.perf_counter() < fim:
+            inicio = time.perf_counter()
+            status, _ = await requisitar(leitor, escritor, 'GET', gerador.choice(consultas))
+            latencias.append(time.perf_counter() - inicio)
+            if status != 200:
+                erros.append(status)
+    finally:
+        escritor.close()
+
+
+async def carga(porta, consultas, conexoes, duracao, semente):
+    """Roda os clientes em paralelo e devolve as latências, os erros e o tempo total"""
+    latencias, erros = [], []
+    inicio = time.perf_counter()
+    fim = inicio + duracao
+    await asyncio.gather(*(cliente(porta, consultas, fim, latencias, erros, random.Random(semente + i))
+                           for i in range(conexoes)))
+    return latencias, erros, time.perf_counter() - inicio
+
+
+async def executar(args, porta, processo):
+    """Espera o serviço, aplica a carga e consulta as estatísticas do cache"""
+    preparo, saude = await aguardar_servico(porta, processo)
+    atendentes = [f'Atendente {i:04d}' for i in range(1, args.atendentes + 1)]
+    tipos = [f'tipo de contato {i:03d}' for i in range(1, args.tipos_contato + 1)]
+    consultas = montar_consultas(args.consultas_distintas, atendentes, tipos, args.dias, args.semente)
+    latencias, erros, total = await carga(porta, consultas, args.conexoes, args.duracao, args.semente)
+
+    leitor, escritor = await asyncio.open_connection('127.0.0.1', porta)
+    _, corpo = await requisitar(leitor, escritor, 'GET', '/saude')
+    escritor.close()
+    return preparo, saude, latencias, erros, total, json.loads(corpo)['cache']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dados', default=None, help='arquivo de dados (padrão: gera dados sintéticos)')
+    parser.add_argument('--linhas', type=int, default=1_000_000, help='linhas dos dados sintéticos')
+    parser.add_argument('--atendentes', type=int, default=50, help='atendentes dos dados sintéticos')
+    parser.add_argument('--tipos-contato', type=int, default=12, help='tipos de contato dos dados sintéticos')
+    parser.add_argument('--dias', type=int, default=180, help='dias cobertos pelos dados sintéticos')
+    parser.add_argument('--conexoes', type=int, default=16, help='conexões simultâneas')
+    parser.add_argument('--duracao', type=float, default=10.0, help='duração da carga em segundos')
+    parser.add_argument('--consultas-distintas', type=int, default=200,
+                        help='combinações distintas de análise e filtros (define a taxa de acerto do cache)')
+    parser.add_argument('--semente', type=int, default=0, help='semente do sorteio das consultas')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        dados = args.dados
+        if dados is None:
+            dados = os.path.join(diretorio, 'csat.parquet')
+            salvar_parquet(dados, args.linhas, atendentes=args.atendentes, tipos_contato=args.tipos_contato,
+                           opportunities=3, dias=args.dias)
+        porta = porta_livre()
+        processo = subprocess.Popen([sys.executable, os.path.join(RAIZ, 'servico.py'), os.path.abspath(dados),
+                                     '--porta', str(porta)], cwd=diretorio, stdout=subprocess.DEVNULL)
+        try:
+            preparo, saude, latencias, erros, total, cache = asyncio.run(executar(args, porta, processo))
+        finally:
+            processo.terminate()
+            processo.wait()
+
+    latencias = np.array(latencias) * 1000
+    print(f"Dados: {saude['linhas']:,} linhas, {saude['celulas']:,} células  |  carga inicial: {preparo:.1f} s")
+    print(f"Conexões: {args.conexoes}  |  duração: {total:.1f} s  |  consultas distintas: {args.consultas_distintas}")
+    print("-" * 60)
+    print(f"{'Requisições':<28}{len(latencias):>14,}")
+    print(f"{'Requisições por segundo':<28}{len(latencias) / total:>14,.0f}")
+    for rotulo, percentil in [('Latência p50 (ms)', 50), ('Latência p95 (ms)', 95), ('Latência p99 (ms)', 99)]:
+        print(f"{rotulo:<28}{np.percentile(latencias, percentil):>14.2f}")
+    print(f"{'Latência máxima (ms)':<28}{latencias.max():>14.2f}")
+    print(f"{'Erros':<28}{len(erros):>14,}")
+    print(f"{'Cache (acertos / falhas)':<28}{cache['acertos']:>8,} / {cache['falhas']:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark da exportação das tabelas de resultado (exportacao.py): o caminho
+ingênuo do pandas, que grava um formato depois do outro (`to_excel` com o
+openpyxl montando a planilha inteira em memória, `to_parquet` e `to_csv`),
+contra a versão atual, com a planilha em modo write-only, Parquet e CSV em
+lotes e um formato por thread.
+
+As tabelas são as das análises 1 a 9 (todos os campos dos resultados da API)
+sobre dados sintéticos de alta cardinalidade, para que as tabelas por
+célula atendente × tipo de contato fiquem grandes. O pico de memória é o do
+tracemalloc (alocações do Python e do NumPy), numa execução à parte.
+
+Uso:
+    python benchmarks/exportacao_resultados.py --linhas 300000 --atendentes 300 --tipos-contato 30
+"""
+import argparse
+import dataclasses
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import api  # noqa: E402
+from cubo import construir_cubo  # noqa: E402
+from esquema import normalizar_esquema  # noqa: E402
+from exportacao import ARQUIVO_XLSX, FORMATOS, exportar, tabelas_resultados  # noqa: E402
+from sintetico import gerar_dados  # noqa: E402
+
+
+def resultados_api(cubo):
+    """Todos os campos tabulares dos resultados das análises 1 a 9, numerados, e o nome de cada um"""
+    resultados = [api.resultados_individuais(cubo), api.ranking_atendentes(cubo), api.ranking_tipos_contato(cubo),
+                  api.melhores_tipos_contato(cubo), api.piores_tipos_contato(cubo),
+                  api.processos_notas_baixas(cubo), api.destaques_atendentes(cubo),
+                  api.probabilidade_nota_baixa(cubo), api.recomendacoes(cubo)]
+    campos = [(type(resultado).__name__.lower(), campo.name, getattr(resultado, campo.name))
+              for resultado in resultados for campo in dataclasses.fields(resultado)]
+    campos = [(f"{analise}_{nome}", valor) for analise, nome, valor in campos
+              if isinstance(valor, (pd.DataFrame, pd.Series))]
+    return ({numero: valor for numero, (_, valor) in enumerate(campos, start=1)},
+            {numero: nome for numero, (nome, _) in enumerate(campos, start=1)})
+
+
+def sequencial(tabelas, diretorio):
+    """Versão ingênua: um formato de cada vez, cada tabela gravada inteira pelo pandas"""
+    with pd.ExcelWriter(os.path.join(diretorio, ARQUIVO_XLSX), engine='openpyxl') as planilha:
+        for nome, tabela in tabelas.items():
+            tabela.to_excel(planilha, sheet_name=nome[:31], index=False)
+    for formato in ('parquet', 'csv'):
+        os.makedirs(os.path.join(diretorio, formato), exist_ok=True)
+    for nome, tabela in tabelas.items():
+        tabela.to_parquet(os.path.join(diretorio, 'parquet', f"{nome}.parquet"), index=False)
+    for nome, tabela in tabelas.items():
+        tabela.to_csv(os.path.join(diretorio, 'csv', f"{nome}.csv"), index=False)
+
+
+def medir(funcao, tabelas):
+    """Tempo (s) e pico de memória (MB) de uma exportação numa pasta temporária
+
+    O tracemalloc deixa o openpyxl muito mais lento, então o tempo vem de
+    uma execução sem rastreio e o pico de memória de uma segunda execução.
+    """
+    with tempfile.TemporaryDirectory() as diretorio:
+        inicio = time.perf_counter()
+        funcao(tabelas, diretorio)
+        tempo = time.perf_counter() - inicio
+    with tempfile.TemporaryDirectory() as diretorio:
+        tracemalloc.start()
+        funcao(tabelas, diretorio)
+        pico = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+    return tempo, pico
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--linhas', type=int, default=300_000, help='linhas dos dados sintéticos')
+    parser.add_argument('--atendentes', type=int, default=300, help='atendentes dos dados sintéticos')
+    parser.add_argument('--tipos-contato', type=int, default=30, help='tipos de contato dos dados sintéticos')
+    args = parser.parse_args()
+
+    cubo = construir_cubo(normalizar_esquema(gerar_dados(args.linhas, atendentes=args.atendentes,
+                                                         tipos_contato=args.tipos_contato)))
+    tabelas = tabelas_resultados(*resultados_api(cubo))
+    linhas = sum(map(len, tabelas.values()))
+
+    tempo_sequencial, pico_sequencial = medir(sequencial, tabelas)
+    tempo_atual, pico_atual = medir(lambda tabelas, diretorio: exportar(tabelas, diretorio, FORMATOS), tabelas)
+
+    print(f"Tabelas: {len(tabelas)}  |  linhas exportadas: {linhas:,}  |  formatos: {', '.join(FORMATOS)}")
+    print(f"{'Versão':<36}{'Tempo (s)':>12}{'Pico (MB)':>12}")
+    print("-" * 60)
+    print(f"{'Sequencial (pandas)':<36}{tempo_sequencial:>12.2f}{pico_sequencial:>12.1f}")
+    print(f"{'Em lotes, um formato por thread':<36}{tempo_atual:>12.2f}{pico_atual:>12.1f}")
+    print("-" * 60)
+    print(f"Ganho: {tempo_sequencial / tempo_atual:.1f}x no tempo, {pico_sequencial / pico_atual:.1f}x na memória")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark dos filtros do serviço HTTP (servico.py): a varredura anterior, que
+a cada consulta compara todas as linhas do cubo diário com os valores pedidos
+(`isin` e máscaras booleanas), contra os índices por valor (indices.py),
+montados uma vez na carga e cruzados a cada consulta.
+
+Mede só a seleção das linhas (a parte que os índices substituem) em filtros
+conjuntivos cada vez mais seletivos, e confere que as duas versões escolhem
+exatamente as mesmas linhas.
+
+Uso:
+    python benchmarks/filtros_indexados.py --linhas 5000000 --atendentes 1000 --dias 365
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from esquema import COLUNA_DATA, normalizar_esquema  # noqa: E402
+from cubo import construir_cubo  # noqa: E402
+from servico import DIMENSOES_SERVICO, FILTROS, CuboDiario  # noqa: E402
+from sintetico import gerar_dados  # noqa: E402
+
+
+def varredura(dados, filtros):
+    """Versão anterior: máscara booleana sobre todas as linhas do cubo diário"""
+    mascara = np.ones(dados.linhas, dtype=bool)
+    for parametro, nivel in FILTROS.items():
+        if parametro in filtros:
+            mascara &= dados.celulas_dias.get_level_values(nivel).isin(filtros[parametro])
+    if 'notas' in filtros:
+        mascara &= np.logical_or.reduce([dados.colunas[f'nota_{nota}'] > 0 for nota in filtros['notas']])
+    return np.flatnonzero(mascara)
+
+
+def indexado(dados, filtros):
+    """Versão atual: interseção dos índices por valor"""
+    return dados._posicoes(filtros, 0, dados.linhas)
+
+
+def medir(funcao, dados, filtros, repeticoes):
+    """Tempo médio (ms) de uma seleção e as posições escolhidas"""
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        posicoes = funcao(dados, filtros)
+    return (time.perf_counter() - inicio) / repeticoes * 1000, posicoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--linhas', type=int, default=5_000_000, help='linhas dos dados sintéticos')
+    parser.add_argument('--atendentes', type=int, default=1000, help='atendentes dos dados sintéticos')
+    parser.add_argument('--tipos-contato', type=int, default=100, help='tipos de contato dos dados sintéticos')
+    parser.add_argument('--opportunities', type=int, default=10, help='opportunities dos dados sintéticos')
+    parser.add_argument('--dias', type=int, default=365, help='dias cobertos pelos dados sintéticos')
+    parser.add_argument('--repeticoes', type=int, default=20, help='repetições de cada consulta')
+    args = parser.parse_args()
+
+    tipado = normalizar_esquema(gerar_dados(args.linhas, atendentes=args.atendentes,
+                                            tipos_contato=args.tipos_contato,
+                                            opportunities=args.opportunities, dias=args.dias))
+    tipado['dia'] = tipado[COLUNA_DATA].dt.floor('D')
+    cubo = construir_cubo(tipado, dimensoes=DIMENSOES_SERVICO)
+    inicio = time.perf_counter()
+    dados = CuboDiario(cubo)
+    carga = time.perf_counter() - inicio
+
+    atendente = dados.celulas.get_level_values('attendant')[0]
+    tipo = dados.celulas.get_level_values('contact type')[0]
+    opportunity = dados.celulas.get_level_values('opportunity')[0]
+    consultas = {
+        'notas baixas': {'notas': (1, 2)},
+        'opportunity': {'opportunity': (opportunity,)},
+        'notas baixas + opportunity': {'notas': (1, 2), 'opportunity': (opportunity,)},
+        '+ atendente': {'notas': (1, 2), 'opportunity': (opportunity,), 'atendente': (atendente,)},
+        '+ tipo de contato': {'notas': (1, 2), 'opportunity': (opportunity,), 'atendente': (atendente,),
+                              'tipo_contato': (tipo,)},
+    }
+
+    print(f"Avaliações: {args.linhas:,}  |  linhas do cubo diário: {dados.linhas:,}  |  "
+          f"CuboDiario (com índices): {carga:.2f}s")
+    print(f"{'Filtro':<30}{'Linhas':>12}{'Varredura (ms)':>16}{'Índices (ms)':>14}{'Ganho':>8}")
+    print("-" * 80)
+    for rotulo, filtros in consultas.items():
+        tempo_varredura, esperadas = medir(varredura, dados, filtros, args.repeticoes)
+        tempo_indice, posicoes = medir(indexado, dados, filtros, args.repeticoes)
+        if not np.array_equal(esperadas, posicoes):
+            sys.exit(f"Seleções diferentes para '{rotulo}'")
+        print(f"{rotulo:<30}{len(posicoes):>12,}{tempo_varredura:>16.2f}{tempo_indice:>14.2f}"
+              f"{tempo_varredura / tempo_indice:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
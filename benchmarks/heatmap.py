@@ -0,0 +1,82 @@
+"""
+Benchmark do heatmap do gráfico 4 com muitos atendentes e tipos de contato:
+a matriz densa anotada célula a célula (como era antes) contra a versão
+limitada (graficos.py), que acima de um número de células desenha só os
+grupos de maior volume numa imagem rasterizada.
+
+Mede o tempo de desenho + gravação do PNG e o pico de memória alocada
+(tracemalloc) de cada versão, num único processo.
+
+Uso:
+    python benchmarks/heatmap.py --atendentes 400 --tipos-contato 150
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import graficos  # noqa: E402
+from cubo import agregar, construir_cubo, totais  # noqa: E402
+from esquema import normalizar_esquema  # noqa: E402
+from sintetico import gerar_dados  # noqa: E402
+
+
+def heatmap_denso(celulas, media_geral):
+    """Versão anterior: pivot denso de todas as células e uma anotação por célula"""
+    plt, sns = graficos.plt, graficos.sns
+    pivot_table = celulas['media'].unstack('contact type')
+    fig, ax = plt.subplots(figsize=(14, 8))
+    sns.heatmap(pivot_table, annot=True, fmt='.2f', cmap='RdYlGn',
+                center=media_geral, ax=ax, cbar_kws={'label': 'Média CSAT'})
+    plt.tight_layout()
+
+
+def medir(desenho, celulas, media_geral, arquivo):
+    """Tempo (s) e pico de memória (MB) para desenhar e gravar o gráfico"""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    desenho(celulas, media_geral)
+    graficos.plt.savefig(arquivo, dpi=300, bbox_inches='tight')
+    graficos.plt.close()
+    tempo = time.perf_counter() - inicio
+    pico = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return tempo, pico, os.path.getsize(arquivo) / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--linhas', type=int, default=1_000_000, help='linhas dos dados sintéticos')
+    parser.add_argument('--atendentes', type=int, default=400, help='atendentes dos dados sintéticos')
+    parser.add_argument('--tipos-contato', type=int, default=150, help='tipos de contato dos dados sintéticos')
+    parser.add_argument('--sem-denso', action='store_true', help='não mede a versão anterior (pode levar minutos)')
+    args = parser.parse_args()
+
+    cubo = construir_cubo(normalizar_esquema(gerar_dados(args.linhas, atendentes=args.atendentes,
+                                                         tipos_contato=args.tipos_contato)))
+    celulas = agregar(cubo, ['attendant', 'contact type'])[['media', 'n']]
+    media_geral = totais(cubo)['media']
+    graficos.configurar_estilo()
+
+    versoes = {'Limitada (atual)': graficos.desenhar_heatmap_desempenho}
+    if not args.sem_denso:
+        versoes['Densa anotada'] = heatmap_denso
+
+    print(f"Células observadas: {len(celulas):,}  |  {args.atendentes} atendentes × {args.tipos_contato} tipos")
+    print(f"{'Versão':<20}{'Tempo (s)':>12}{'Pico (MB)':>12}{'PNG (MB)':>12}")
+    print("-" * 56)
+    with tempfile.TemporaryDirectory() as diretorio:
+        # Um desenho pequeno antes, para que o cache de fontes não entre na medição da primeira versão
+        medir(graficos.desenhar_heatmap_desempenho, celulas.iloc[:10], media_geral,
+              os.path.join(diretorio, 'aquecimento.png'))
+        for rotulo, desenho in versoes.items():
+            tempo, pico, tamanho = medir(desenho, celulas, media_geral, os.path.join(diretorio, 'heatmap.png'))
+            print(f"{rotulo:<20}{tempo:>12.2f}{pico:>12.1f}{tamanho:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
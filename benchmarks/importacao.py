@@ -0,0 +1,77 @@
+"""
+Benchmark da inicialização: tempo de importação (`python -X importtime`) de
+uma execução só de tabelas (`main.py --somente 2 --sem-graficos`), com as
+bibliotecas de gráficos carregadas sob demanda, contra a mesma execução
+forçando a importação de matplotlib e seaborn (como era antes).
+
+Cada variante roda num processo novo, algumas vezes; vale o menor tempo.
+
+Uso:
+    python benchmarks/importacao.py --repeticoes 5
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BIBLIOTECAS_GRAFICOS = ('matplotlib', 'seaborn')
+
+# Executa main.py como script; a variante "antes" carrega o estilo dos gráficos na partida
+PROGRAMA = """
+import runpy, sys
+sys.argv = ['main.py', {dados!r}, '--somente', '2', '--sem-graficos']
+if {ansioso}:
+    import graficos
+    graficos.configurar_estilo()
+runpy.run_path('main.py', run_name='__main__')
+"""
+
+
+def medir(dados, ansioso):
+    """Tempo total do processo, tempo de importação e importação das bibliotecas de gráficos (s)"""
+    comando = [sys.executable, '-X', 'importtime', '-c', PROGRAMA.format(dados=dados, ansioso=ansioso)]
+    ambiente = dict(os.environ, MPLBACKEND='Agg')
+    inicio = time.perf_counter()
+    processo = subprocess.run(comando, cwd=RAIZ, env=ambiente, capture_output=True, text=True, check=True)
+    total = time.perf_counter() - inicio
+
+    importacao = graficos = 0
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith('import time:') or 'cumulative' in linha:
+            continue
+        _, acumulado, nome = linha.split('|')
+        # Só os módulos de primeiro nível (sem recuo) para não contar duas vezes
+        if not nome[1:].startswith(' '):
+            microssegundos = int(acumulado)
+            importacao += microssegundos
+            if nome.strip().split('.')[0] in BIBLIOTECAS_GRAFICOS:
+                graficos += microssegundos
+    return total, importacao / 1e6, graficos / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dados', default='analise_suporte.xlsx', help='arquivo de dados (relativo à raiz)')
+    parser.add_argument('--repeticoes', type=int, default=3, help='execuções de cada variante')
+    args = parser.parse_args()
+
+    variantes = {'Gráficos sob demanda': False, 'Gráficos na partida': True}
+    melhores = {}
+    for rotulo, ansioso in variantes.items():
+        medicoes = [medir(args.dados, ansioso) for _ in range(args.repeticoes)]
+        melhores[rotulo] = tuple(min(medicao[i] for medicao in medicoes) for i in range(3))
+
+    print(f"Execução: main.py --somente 2 --sem-graficos  |  melhor de {args.repeticoes}")
+    print(f"{'Variante':<24}{'Total (s)':>12}{'Importação (s)':>16}{'matplotlib+seaborn (s)':>24}")
+    print("-" * 76)
+    for rotulo, (total, importacao, graficos) in melhores.items():
+        print(f"{rotulo:<24}{total:>12.3f}{importacao:>16.3f}{graficos:>24.3f}")
+    print("-" * 76)
+    economia = melhores['Gráficos na partida'][0] - melhores['Gráficos sob demanda'][0]
+    print(f"Economia na partida: {economia:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Paridade e desempenho dos backends: calcula os cubos com o pandas e com o
+SQLite (consultas_sql.py) e confere que o cubo, o cubo temporal e as tabelas
+das análises 1 a 10 (api.py) são idênticos nos dois. Roda sobre a planilha
+do projeto e sobre dados sintéticos (com datas) do tamanho pedido.
+
+Antes das medições roda uma verificação com asserções sobre uma entrada
+pequena e fixa (notas, datas e rótulos ausentes, blocos pequenos e várias
+faixas de consulta); com --verificar roda só ela, em poucos segundos.
+
+Mede também o tempo de cada backend; no SQLite, a primeira execução inclui a
+carga do banco e a segunda reaproveita o banco já gravado. Termina com
+código de saída 1 se alguma tabela divergir.
+
+Uso:
+    python benchmarks/paridade_sql.py --verificar
+    python benchmarks/paridade_sql.py --linhas 1000000 --trabalhadores 4
+"""
+import argparse
+import contextlib
+import dataclasses
+import io
+import os
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+import api  # noqa: E402
+from cubo import cubos_iguais  # noqa: E402
+from main import carregar_dados  # noqa: E402
+from sintetico import gerar_dados, salvar_parquet  # noqa: E402
+
+
+def carregar(arquivo, backend, trabalhadores):
+    """Cubos calculados pelo backend e o tempo gasto (s), sem a saída do console"""
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        cubo, temporal = carregar_dados(arquivo, com_temporal=True, trabalhadores=trabalhadores, backend=backend)
+    return cubo, temporal, time.perf_counter() - inicio
+
+
+def analises(cubo, temporal):
+    """Todas as tabelas das análises 1 a 10, por nome"""
+    resultados = {
+        'resultados_individuais': api.resultados_individuais(cubo),
+        'ranking_atendentes': api.ranking_atendentes(cubo),
+        'ranking_tipos_contato': api.ranking_tipos_contato(cubo),
+        'melhores_tipos_contato': api.melhores_tipos_contato(cubo),
+        'piores_tipos_contato': api.piores_tipos_contato(cubo),
+        'processos_notas_baixas': api.processos_notas_baixas(cubo),
+        'destaques_atendentes': api.destaques_atendentes(cubo),
+        'probabilidade_nota_baixa': api.probabilidade_nota_baixa(cubo),
+        'recomendacoes': api.recomendacoes(cubo),
+    }
+    if temporal is not None:
+        resultados['tendencias_recentes'] = api.tendencias_recentes(temporal)
+    tabelas = {}
+    for nome, resultado in resultados.items():
+        for campo in dataclasses.fields(resultado):
+            tabelas[f'{nome}.{campo.name}'] = getattr(resultado, campo.name)
+    return tabelas
+
+
+def divergencias(referencia, outra):
+    """Nomes das tabelas que diferem entre os dois backends"""
+    diferentes = []
+    for nome, valor in referencia.items():
+        try:
+            if isinstance(valor, pd.DataFrame):
+                pd.testing.assert_frame_equal(valor, outra[nome])
+            elif isinstance(valor, pd.Series):
+                pd.testing.assert_series_equal(valor, outra[nome])
+            elif not (valor == outra[nome] or (valor != valor and outra[nome] != outra[nome])):
+                raise AssertionError(nome)
+        except (AssertionError, ValueError, TypeError):
+            diferentes.append(nome)
+    return diferentes
+
+
+def comparar(rotulo, arquivo, trabalhadores):
+    """Roda os dois backends num arquivo, imprime os tempos e devolve as divergências"""
+    cubo_pandas, temporal_pandas, tempo_pandas = carregar(arquivo, 'pandas', trabalhadores)
+    cubo_sql, temporal_sql, tempo_carga = carregar(arquivo, 'sqlite', trabalhadores)
+    _, _, tempo_sql = carregar(arquivo, 'sqlite', trabalhadores)
+
+    diferentes = [] if cubos_iguais(cubo_pandas, cubo_sql) else ['cubo']
+    if (temporal_pandas is None) != (temporal_sql is None):
+        diferentes.append('cubo temporal')
+    elif temporal_pandas is not None and not temporal_pandas.equals(temporal_sql):
+        diferentes.append('cubo temporal')
+    tabelas = analises(cubo_pandas, temporal_pandas)
+    diferentes += divergencias(tabelas, analises(cubo_sql, temporal_sql))
+
+    print(f"{rotulo:<28}{tempo_pandas:>10.2f}{tempo_carga:>14.2f}{tempo_sql:>12.2f}"
+          f"{len(tabelas):>9}  {'iguais' if not diferentes else 'DIVERGEM'}")
+    for nome in diferentes:
+        print(f"    ✗ {nome}")
+    return diferentes
+
+
+def verificar(diretorio):
+    """Asserções de paridade dos backends sobre uma entrada pequena e fixa, gravada em `diretorio`"""
+    dados = gerar_dados(2_000, atendentes=12, tipos_contato=9, dias=60, semente=7)
+    gerador = np.random.default_rng(7)
+    dados['csat'] = dados['csat'].astype(float).mask(gerador.random(len(dados)) < 0.05)
+    dados['date'] = dados['date'].mask(gerador.random(len(dados)) < 0.05)
+    for dimensao in ('attendant', 'contact type', 'opportunity'):
+        dados[dimensao] = dados[dimensao].mask(gerador.random(len(dados)) < 0.02)
+    arquivo = os.path.join(diretorio, 'paridade.csv')
+    dados.to_csv(arquivo, index=False)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        cubo, temporal = carregar_dados(arquivo, 97, com_temporal=True, backend='pandas')
+        cubo_sql, temporal_sql = carregar_dados(arquivo, 97, com_temporal=True, trabalhadores=3,
+                                                backend='sqlite')
+    # Rótulos ausentes não tiram a avaliação do cubo; só a nota ausente tira
+    assert int(cubo['n'].sum()) == int(dados['csat'].count())
+    assert cubos_iguais(cubo, cubo_sql), "cubos diferentes"
+    assert temporal is not None and temporal.equals(temporal_sql), "cubos temporais diferentes"
+    diferentes = divergencias(analises(cubo, temporal), analises(cubo_sql, temporal_sql))
+    assert not diferentes, f"tabelas diferentes: {diferentes}"
+    print("✓ Paridade pandas × SQLite na entrada fixa (2.000 linhas com ausentes)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--linhas', type=int, default=1_000_000, help='linhas dos dados sintéticos')
+    parser.add_argument('--atendentes', type=int, default=200, help='atendentes dos dados sintéticos')
+    parser.add_argument('--tipos-contato', type=int, default=50, help='tipos de contato dos dados sintéticos')
+    parser.add_argument('--dias', type=int, default=180, help='dias cobertos pelos dados sintéticos')
+    parser.add_argument('--trabalhadores', type=int, default=None, help='processos de consulta do SQLite')
+    parser.add_argument('--verificar', action='store_true',
+                        help='só a verificação com asserções na entrada pequena e fixa')
+    args = parser.parse_args()
+
+    diretorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory() as diretorio:
+        os.chdir(diretorio)
+        try:
+            verificar(diretorio)
+        finally:
+            os.chdir(diretorio_original)
+    if args.verificar:
+        return
+
+    print(f"{'Dados':<28}{'pandas (s)':>10}{'SQLite 1ª (s)':>14}{'SQLite (s)':>12}{'Tabelas':>9}  Paridade")
+    print("-" * 84)
+    with tempfile.TemporaryDirectory() as diretorio:
+        # Bancos e caches ficam na pasta temporária
+        os.chdir(diretorio)
+        try:
+            diferentes = comparar('analise_suporte.xlsx', os.path.join(RAIZ, 'analise_suporte.xlsx'),
+                                  args.trabalhadores)
+            arquivo = os.path.join(diretorio, 'csat.parquet')
+            salvar_parquet(arquivo, args.linhas, atendentes=args.atendentes, tipos_contato=args.tipos_contato,
+                           dias=args.dias)
+            diferentes += comparar(f'sintético ({args.linhas:,} linhas)', arquivo, args.trabalhadores)
+        finally:
+            os.chdir(diretorio_original)
+    sys.exit(1 if diferentes else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark da reamostragem (análise 11): bootstrap das médias por atendente e
+teste de permutação por atendente × tipo de contato, com dados sintéticos.
+
+As réplicas são sorteadas dos histogramas do cubo, então o tempo depende da
+quantidade de grupos e de réplicas, não do número de linhas. Também confere
+que o resultado é o mesmo com um e com vários processos.
+
+Uso:
+    python benchmarks/reamostragem.py --linhas 1000000 --atendentes 200
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cubo import agregar, construir_cubo  # noqa: E402
+from esquema import normalizar_esquema  # noqa: E402
+from reamostragem import REPLICAS, bootstrap_medias, teste_permutacao_celulas  # noqa: E402
+from sintetico import gerar_dados  # noqa: E402
+
+
+def cronometrar(funcao, *args, **kwargs):
+    """Tempo (em segundos) de uma execução, e o resultado"""
+    inicio = time.perf_counter()
+    resultado = funcao(*args, **kwargs)
+    return time.perf_counter() - inicio, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--linhas', type=int, default=1_000_000, help='quantidade de avaliações')
+    parser.add_argument('--atendentes', type=int, default=200, help='quantidade de atendentes')
+    parser.add_argument('--tipos-contato', type=int, default=20, help='quantidade de tipos de contato')
+    parser.add_argument('--replicas', type=int, default=REPLICAS, help='réplicas de cada teste')
+    parser.add_argument('--trabalhadores', type=int, default=None, help='processos (padrão: um por núcleo)')
+    args = parser.parse_args()
+
+    cubo = construir_cubo(normalizar_esquema(gerar_dados(args.linhas, args.atendentes, args.tipos_contato, 5)))
+    estatisticas = agregar(cubo, ['attendant'])
+
+    tempo_bootstrap, bootstrap = cronometrar(bootstrap_medias, estatisticas, args.replicas,
+                                             trabalhadores=args.trabalhadores)
+    tempo_permutacao, permutacao = cronometrar(teste_permutacao_celulas, cubo, 'attendant', 'contact type',
+                                               args.replicas, trabalhadores=args.trabalhadores)
+    iguais = (bootstrap.equals(bootstrap_medias(estatisticas, args.replicas, trabalhadores=1))
+              and permutacao.equals(teste_permutacao_celulas(cubo, 'attendant', 'contact type',
+                                                             args.replicas, trabalhadores=1)))
+
+    print(f"Linhas: {args.linhas:,}  |  réplicas: {args.replicas:,}  |  "
+          f"grupos: {len(bootstrap):,}  |  células: {len(permutacao):,}")
+    print(f"{'Etapa':<28}{'Tempo (s)':>12}")
+    print("-" * 40)
+    print(f"{'Bootstrap das médias':<28}{tempo_bootstrap:>12.4f}")
+    print(f"{'Permutação por célula':<28}{tempo_permutacao:>12.4f}")
+    print("-" * 40)
+    print(f"Permutações por célula (média): {permutacao['permutacoes'].mean():,.0f}  |  "
+          f"mesmo resultado com 1 processo: {'sim' if iguais else 'NÃO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark do detalhamento por atendente (análise 7): o laço anterior, que
+para cada atendente recorta as tabelas, ordena e imprime no console, contra
+a versão atual (relatorios.py), que ordena cada tabela uma única vez, acha
+destaque e dificuldade de todos os atendentes num agrupamento e grava um
+arquivo por atendente numa pool de threads.
+
+A saída do laço anterior vai para um buffer em memória (não para o console),
+o que favorece a versão antiga.
+
+Uso:
+    python benchmarks/relatorios_atendentes.py --atendentes 1000 --tipos-contato 150
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import api  # noqa: E402
+from cubo import construir_cubo  # noqa: E402
+from esquema import normalizar_esquema  # noqa: E402
+from relatorios import escrever_relatorios_atendentes  # noqa: E402
+from sintetico import gerar_dados  # noqa: E402
+
+
+def laco_por_atendente(cubo):
+    """Versão anterior: recorte, ordenação e impressão atendente a atendente"""
+    resultado = api.destaques_atendentes(cubo)
+    por_atendente, por_tipo, por_opp = resultado.geral, resultado.por_tipo, resultado.por_opportunity
+    for atendente in por_atendente.index:
+        print(f"\n{'─' * 80}")
+        print(f"ATENDENTE: {atendente}")
+        print(f"{'─' * 80}")
+        print(f"Média Geral: {por_atendente.at[atendente, 'media']:.2f}")
+        print(f"Total de Avaliações: {por_atendente.at[atendente, 'n']}")
+        perf_tipo = por_tipo.loc[atendente][['media', 'n']].round(2)
+        perf_tipo.columns = ['Média', 'Qtd']
+        perf_tipo = perf_tipo.sort_values('Média', ascending=False)
+        print(f"\nPerformance por Tipo de Contato:")
+        print(perf_tipo)
+        perf_opp = por_opp.loc[atendente][['media', 'n']].round(2)
+        perf_opp.columns = ['Média', 'Qtd']
+        print(f"\nPerformance por Tipo de Opportunity:")
+        print(perf_opp.sort_values('Média', ascending=False))
+        melhor_tipo = perf_tipo['Média'].idxmax()
+        pior_tipo = perf_tipo['Média'].idxmin()
+        print(f"\n✓ DESTAQUE: {melhor_tipo} (Média: {perf_tipo.loc[melhor_tipo, 'Média']})")
+        print(f"✗ DIFICULDADE: {pior_tipo} (Média: {perf_tipo.loc[pior_tipo, 'Média']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--linhas', type=int, default=1_000_000, help='linhas dos dados sintéticos')
+    parser.add_argument('--atendentes', type=int, default=1000, help='atendentes dos dados sintéticos')
+    parser.add_argument('--tipos-contato', type=int, default=150, help='tipos de contato dos dados sintéticos')
+    parser.add_argument('--trabalhadores', type=int, default=None, help='threads de gravação')
+    args = parser.parse_args()
+
+    cubo = construir_cubo(normalizar_esquema(gerar_dados(args.linhas, atendentes=args.atendentes,
+                                                         tipos_contato=args.tipos_contato)))
+
+    inicio = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        laco_por_atendente(cubo)
+    laco = time.perf_counter() - inicio
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        inicio = time.perf_counter()
+        arquivos = escrever_relatorios_atendentes(api.destaques_atendentes(cubo), diretorio, args.trabalhadores)
+        lote = time.perf_counter() - inicio
+
+    print(f"Atendentes: {args.atendentes:,}  |  tipos de contato: {args.tipos_contato}  |  células: {len(cubo):,}")
+    print(f"{'Versão':<36}{'Tempo (s)':>12}")
+    print("-" * 48)
+    print(f"{'Laço por atendente (console)':<36}{laco:>12.3f}")
+    print(f"{f'Em lote ({len(arquivos)} arquivos)':<36}{lote:>12.3f}")
+    print("-" * 48)
+    print(f"Ganho: {laco / lote:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
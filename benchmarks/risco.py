@@ -0,0 +1,90 @@
+"""
+Benchmark do cálculo de risco de nota baixa: a versão vetorizada (risco.py)
+contra um laço por grupo, como seria feito com o scipy grupo a grupo.
+
+Usa `scipy.stats.binomtest(...).proportion_ci(method='wilson')` no laço
+quando o scipy está instalado; senão, o laço aplica a mesma fórmula em
+Python puro. Os resultados das duas versões são conferidos.
+
+Uso:
+    python benchmarks/risco.py --grupos 50000
+"""
+import argparse
+import math
+import os
+import sys
+import time
+from statistics import NormalDist
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from risco import CONFIANCA, estimativa_bayes, priori_beta, tabela_risco  # noqa: E402
+
+try:
+    from scipy.stats import binomtest
+except ImportError:
+    binomtest = None
+
+
+def wilson_python(sucessos, n, confianca=CONFIANCA):
+    """Intervalo de Wilson de um único grupo, em Python puro"""
+    z = NormalDist().inv_cdf(0.5 + confianca / 2)
+    proporcao = sucessos / n
+    denominador = 1 + z * z / n
+    centro = (proporcao + z * z / (2 * n)) / denominador
+    margem = z * math.sqrt(proporcao * (1 - proporcao) / n + z * z / (4 * n * n)) / denominador
+    return centro - margem, centro + margem
+
+
+def laco_por_grupo(sucessos, n):
+    """Versão ingênua: um grupo por vez"""
+    alfa, beta = priori_beta(sucessos, n)
+    resultados = []
+    for k, total in zip(sucessos.tolist(), n.tolist()):
+        if binomtest is not None:
+            intervalo = binomtest(k, total).proportion_ci(confidence_level=CONFIANCA, method='wilson')
+            inferior, superior = intervalo.low, intervalo.high
+        else:
+            inferior, superior = wilson_python(k, total)
+        resultados.append((inferior * 100, superior * 100, estimativa_bayes(k, total, alfa, beta) * 100))
+    return np.array(resultados)
+
+
+def cronometrar(funcao, *args, repeticoes=3):
+    """Menor tempo (em segundos) entre as repetições, e o último resultado"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(*args)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--grupos', type=int, default=50_000, help='quantidade de células (grupos)')
+    parser.add_argument('--semente', type=int, default=0, help='semente do gerador')
+    args = parser.parse_args()
+
+    # Células com volumes bem desiguais (de 1 a ~2000 avaliações) e taxas variadas
+    gerador = np.random.default_rng(args.semente)
+    n = np.maximum(1, gerador.lognormal(3, 1.2, args.grupos).astype(np.int64))
+    sucessos = gerador.binomial(n, gerador.beta(4, 6, args.grupos))
+
+    vetorizado, tabela = cronometrar(tabela_risco, sucessos, n)
+    laco, referencia = cronometrar(laco_por_grupo, sucessos, n, repeticoes=1)
+
+    iguais = np.allclose(tabela[['ic_inferior', 'ic_superior', 'ajustada']].to_numpy(), referencia)
+    print(f"Grupos: {args.grupos:,}  |  laço com {'scipy' if binomtest is not None else 'Python puro'}")
+    print(f"{'Versão':<24}{'Tempo (s)':>12}")
+    print("-" * 36)
+    print(f"{'Vetorizada (numpy)':<24}{vetorizado:>12.4f}")
+    print(f"{'Laço por grupo':<24}{laco:>12.4f}")
+    print("-" * 36)
+    print(f"Ganho: {laco / vetorizado:.0f}x  |  resultados iguais: {'sim' if iguais else 'NÃO'}")
+
+
+if __name__ == "__main__":
+    main()
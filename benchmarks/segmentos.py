@@ -0,0 +1,63 @@
+"""
+Benchmark dos relatórios por segmento: a versão em lote (segmentos.py), que
+agrupa o cubo com várias chaves de uma vez, contra filtrar as avaliações de
+cada segmento e rodar as análises 1 a 5 e 8 (api.py) segmento a segmento.
+
+Uso:
+    python benchmarks/segmentos.py --linhas 1000000 --tipos-contato 50
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import api  # noqa: E402
+from esquema import normalizar_esquema  # noqa: E402
+from segmentos import SEGMENTACOES, analisar_segmentos  # noqa: E402
+from sintetico import gerar_dados  # noqa: E402
+
+ANALISES = [api.resultados_individuais, api.ranking_atendentes, api.ranking_tipos_contato,
+            api.melhores_tipos_contato, api.piores_tipos_contato, api.probabilidade_nota_baixa]
+
+
+def por_filtro(dados, dimensao):
+    """Versão ingênua: filtra e agrega as avaliações de novo para cada segmento"""
+    for segmento in dados[dimensao].unique():
+        parte = dados[dados[dimensao] == segmento]
+        for analise in ANALISES:
+            analise(parte)
+
+
+def em_lote(dados, dimensao):
+    """Um cubo só e agrupamentos com a dimensão do segmento como primeira chave"""
+    return analisar_segmentos(api.preparar_cubo(dados), dimensao)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--linhas', type=int, default=1_000_000, help='linhas dos dados sintéticos')
+    parser.add_argument('--atendentes', type=int, default=50, help='atendentes dos dados sintéticos')
+    parser.add_argument('--tipos-contato', type=int, default=50, help='tipos de contato dos dados sintéticos')
+    parser.add_argument('--opportunities', type=int, default=5, help='opportunities dos dados sintéticos')
+    args = parser.parse_args()
+
+    dados = normalizar_esquema(gerar_dados(args.linhas, atendentes=args.atendentes,
+                                           tipos_contato=args.tipos_contato, opportunities=args.opportunities))
+    print(f"Linhas: {args.linhas:,}  |  atendentes: {args.atendentes}  |  tipos de contato: "
+          f"{args.tipos_contato}  |  opportunities: {args.opportunities}")
+    print(f"{'Segmentação':<16}{'Segmentos':>10}{'Por filtro (s)':>16}{'Em lote (s)':>14}{'Ganho':>8}")
+    print("-" * 64)
+    for segmentacao, dimensao in SEGMENTACOES.items():
+        inicio = time.perf_counter()
+        por_filtro(dados, dimensao)
+        filtro = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        em_lote(dados, dimensao)
+        lote = time.perf_counter() - inicio
+        print(f"{segmentacao:<16}{dados[dimensao].nunique():>10}{filtro:>16.3f}{lote:>14.3f}{filtro / lote:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Suíte de benchmarks do pipeline CSAT com dados sintéticos.
+
+Para cada volume pedido gera um Parquet sintético e mede, separadamente, o
+carregamento, cada análise e o desenho dos gráficos: tempo de parede e pico
+de memória residente (RSS). O resultado é gravado em JSON para comparar
+versões e detectar regressões.
+
+Uso:
+    python benchmarks/suite.py --linhas 10000 1000000 --atendentes 200 --assimetria 0.5
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from graficos import renderizar_graficos  # noqa: E402
+from main import ANALISES, carregar_dados, grafo_analises  # noqa: E402
+from sintetico import salvar_parquet  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def reiniciar_pico_rss():
+    """Zera o pico de RSS do processo (Linux); devolve False se não for possível"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as arquivo:
+            arquivo.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def pico_rss_mb(filhos=False):
+    """Pico de memória residente em MB do processo (ou dos processos filhos)"""
+    if not filhos:
+        try:
+            with open('/proc/self/status') as arquivo:
+                for linha in arquivo:
+                    if linha.startswith('VmHWM:'):
+                        return int(linha.split()[1]) / 1024
+        except OSError:
+            pass
+    if resource is None:
+        return None
+    uso = resource.getrusage(resource.RUSAGE_CHILDREN if filhos else resource.RUSAGE_SELF)
+    # ru_maxrss vem em KB no Linux e em bytes no macOS
+    return uso.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def medir(funcao, *args, **kwargs):
+    """Executa a função sem imprimir nada e devolve (resultado, medição do estágio)"""
+    reiniciado = reiniciar_pico_rss()
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        resultado = funcao(*args, **kwargs)
+    medicao = {'segundos': round(time.perf_counter() - inicio, 4),
+               'pico_rss_mb': round(pico_rss_mb(), 1)}
+    if not reiniciado:
+        medicao['pico_rss_acumulado'] = True
+    return resultado, medicao
+
+
+def executar_cenario(linhas, args):
+    """Gera os dados de um volume e mede cada estágio do pipeline"""
+    diretorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory() as diretorio:
+        os.chdir(diretorio)
+        try:
+            arquivo = 'sintetico.parquet'
+
+            inicio = time.perf_counter()
+            salvar_parquet(arquivo, linhas, atendentes=args.atendentes, tipos_contato=args.tipos_contato,
+                           opportunities=args.opportunities, assimetria=args.assimetria, dias=args.dias,
+                           semente=args.semente)
+            geracao = time.perf_counter() - inicio
+            tamanho_arquivo = os.path.getsize(arquivo) / 1e6
+
+            estagios = {}
+            (cubo, temporal), estagios['carregamento'] = medir(carregar_dados, arquivo, usar_cache=args.cache,
+                                                               com_temporal=True)
+
+            # Análises na ordem do grafo, cada uma medida isoladamente
+            grafo = grafo_analises(cubo, temporal)
+            resultados = {}
+            for numero in ANALISES:
+                if numero == 10 and temporal is None:
+                    continue
+                funcao, dependencias = grafo[numero]
+                resultados[numero], estagios[f'analise_{numero}'] = medir(
+                    funcao, *(resultados[dependencia] for dependencia in dependencias))
+
+            if not args.sem_graficos:
+                especificacoes = [resultado[1] for resultado in resultados.values()
+                                  if isinstance(resultado, tuple) and resultado[1] is not None]
+                # Sem o cache de renderizações, para medir o desenho de fato
+                _, estagios['graficos'] = medir(renderizar_graficos, especificacoes, args.trabalhadores, False)
+                estagios['graficos']['pico_rss_filhos_mb'] = round(pico_rss_mb(filhos=True) or 0, 1)
+        finally:
+            os.chdir(diretorio_original)
+
+    return {
+        'linhas': linhas,
+        'tamanho_arquivo_mb': round(tamanho_arquivo, 2),
+        'geracao_segundos': round(geracao, 4),
+        'celulas_cubo': len(cubo),
+        'estagios': estagios,
+        'total_segundos': round(sum(estagio['segundos'] for estagio in estagios.values()), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--linhas', type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+                        help='volumes a medir (ex.: 10000 1000000 50000000)')
+    parser.add_argument('--atendentes', type=int, default=10, help='cardinalidade de attendant')
+    parser.add_argument('--tipos-contato', type=int, default=7, help='cardinalidade de contact type')
+    parser.add_argument('--opportunities', type=int, default=3, help='cardinalidade de opportunity')
+    parser.add_argument('--assimetria', type=float, default=0.0,
+                        help='inclinação das notas: 0 uniforme, >0 notas altas, <0 notas baixas')
+    parser.add_argument('--dias', type=int, default=None,
+                        help='acrescenta uma coluna de data cobrindo este número de dias (análise 10)')
+    parser.add_argument('--semente', type=int, default=0, help='semente do gerador')
+    parser.add_argument('--cache', action='store_true', help='carrega pelo cache colunar (Feather)')
+    parser.add_argument('--sem-graficos', action='store_true', help='não mede o desenho dos gráficos')
+    parser.add_argument('--trabalhadores', type=int, default=None, help='processos para os gráficos')
+    parser.add_argument('--saida', default='benchmark_resultados.json', help='arquivo JSON de saída')
+    args = parser.parse_args()
+
+    cenarios = []
+    for linhas in args.linhas:
+        print(f"Medindo {linhas:,} linhas...")
+        cenario = executar_cenario(linhas, args)
+        cenarios.append(cenario)
+        for estagio, medicao in cenario['estagios'].items():
+            print(f"  {estagio:<16}{medicao['segundos']:>10.3f}s{medicao['pico_rss_mb']:>10.1f} MB")
+        print(f"  {'total':<16}{cenario['total_segundos']:>10.3f}s")
+
+    relatorio = {
+        'data': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'ambiente': {
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'plataforma': platform.platform(),
+            'nucleos': os.cpu_count(),
+        },
+        'parametros': {
+            'atendentes': args.atendentes,
+            'tipos_contato': args.tipos_contato,
+            'opportunities': args.opportunities,
+            'assimetria': args.assimetria,
+            'dias': args.dias,
+            'semente': args.semente,
+            'cache': args.cache,
+            'graficos': not args.sem_graficos,
+        },
+        'cenarios': cenarios,
+    }
+    with open(args.saida, 'w', encoding='utf-8') as arquivo:
+        json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+    print(f"\nResultados gravados em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
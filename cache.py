@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from carregamento import TAMANHO_BLOCO, ler_blocos
+from esquema import DIMENSOES, normalizar_esquema
+
+# ============================================================================
+# CACHE COLUNAR DA PLANILHA
+# A planilha é convertida uma única vez para Feather (Arrow) com colunas
+# tipadas, gravadas bloco a bloco; nas execuções seguintes o arquivo é lido
+# via memory map.
+# ============================================================================
+
+DIRETORIO_CACHE = '.cache_csat'
+VERSAO_CACHE = 2
+
+
+def preparar_cache(caminho, tamanho_bloco=TAMANHO_BLOCO, diretorio=DIRETORIO_CACHE):
+    """Devolve o caminho do cache colunar da planilha, gerando-o se ela mudou"""
+    nome = nome_cache(caminho)
+    destino = os.path.join(diretorio, f'{nome}.feather')
+    arquivo_metadados = os.path.join(diretorio, f'{nome}.json')
+
+    estado = os.stat(caminho)
+    metadados = _ler_metadados(arquivo_metadados)
+    if metadados is not None and os.path.exists(destino):
+        mesmo_tamanho = metadados['tamanho'] == estado.st_size
+        if mesmo_tamanho and metadados['mtime_ns'] == estado.st_mtime_ns:
+            return destino
+
+        # Data de modificação diferente mas conteúdo igual (cópia, touch): só atualiza a chave
+        if mesmo_tamanho and metadados['sha256'] == _hash_arquivo(caminho):
+            metadados['mtime_ns'] = estado.st_mtime_ns
+            _gravar_metadados(arquivo_metadados, metadados)
+            return destino
+
+    os.makedirs(diretorio, exist_ok=True)
+    _converter(caminho, destino, tamanho_bloco)
+    _gravar_metadados(arquivo_metadados, {
+        'versao': VERSAO_CACHE,
+        'origem': os.path.abspath(caminho),
+        'tamanho': estado.st_size,
+        'mtime_ns': estado.st_mtime_ns,
+        'sha256': _hash_arquivo(caminho),
+    })
+    return destino
+
+
+def nome_cache(caminho):
+    """Nome do arquivo de origem mais um hash da pasta, para planilhas homônimas não colidirem"""
+    pasta = os.path.dirname(os.path.abspath(caminho))
+    return f"{os.path.basename(caminho)}-{hashlib.sha1(pasta.encode('utf-8')).hexdigest()[:8]}"
+
+
+def _converter(caminho, destino, tamanho_bloco):
+    """Lê a planilha em blocos e grava o Feather bloco a bloco, com dicionários unificados
+
+    Só um bloco fica em memória por vez. Cada dimensão guarda a lista dos
+    valores já vistos, na ordem em que aparecem (a mesma de
+    `union_categoricals`); os valores novos de um bloco entram no arquivo
+    como acréscimos (deltas) ao dicionário.
+    """
+    import pyarrow as pa
+
+    categorias = {dimensao: {} for dimensao in DIMENSOES}
+    esquema = escritor = None
+    # Grava num arquivo temporário para nunca deixar um cache pela metade
+    temporario = f'{destino}.tmp'
+    try:
+        for bloco in ler_blocos(caminho, tamanho_bloco):
+            tipado = normalizar_esquema(bloco, derivados=False)
+            for dimensao in DIMENSOES:
+                if dimensao in tipado:
+                    vistos = categorias[dimensao]
+                    for valor in tipado[dimensao].cat.categories:
+                        vistos.setdefault(valor, len(vistos))
+                    tipado[dimensao] = pd.Categorical(tipado[dimensao], categories=list(vistos))
+            if escritor is None:
+                esquema = pa.Schema.from_pandas(tipado, preserve_index=False)
+                # Índices int32 fixos: o dicionário cresce sem mudar o tipo da coluna
+                for posicao, campo in enumerate(esquema):
+                    if pa.types.is_dictionary(campo.type):
+                        esquema = esquema.set(posicao, campo.with_type(
+                            pa.dictionary(pa.int32(), campo.type.value_type)))
+                opcoes = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+                escritor = pa.ipc.new_file(temporario, esquema, options=opcoes)
+            escritor.write_table(pa.Table.from_pandas(tipado, schema=esquema, preserve_index=False),
+                                 max_chunksize=tamanho_bloco)
+    except BaseException:
+        if escritor is not None:
+            escritor.close()
+            os.remove(temporario)
+        raise
+    if escritor is None:
+        raise ValueError(f"Planilha sem registros: {caminho}")
+    escritor.close()
+    os.replace(temporario, destino)
+
+
+def _hash_arquivo(caminho, tamanho_leitura=1 << 20):
+    """SHA-256 do conteúdo do arquivo, lido em partes de 1 MB"""
+    resumo = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        for parte in iter(lambda: arquivo.read(tamanho_leitura), b''):
+            resumo.update(parte)
+    return resumo.hexdigest()
+
+
+def _ler_metadados(arquivo_metadados):
+    """Metadados do cache, ou None se não existirem ou forem de outra versão"""
+    try:
+        with open(arquivo_metadados, encoding='utf-8') as arquivo:
+            metadados = json.load(arquivo)
+    except (OSError, ValueError):
+        return None
+    if metadados.get('versao') != VERSAO_CACHE:
+        return None
+    return metadados
+
+
+def _gravar_metadados(arquivo_metadados, metadados):
+    """Grava os metadados do cache em JSON"""
+    with open(arquivo_metadados, 'w', encoding='utf-8') as arquivo:
+        json.dump(metadados, arquivo, indent=2)
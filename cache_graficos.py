@@ -0,0 +1,114 @@
+import hashlib
+import os
+import shutil
+from importlib import metadata
+
+import numpy as np
+import pandas as pd
+
+from cache import DIRETORIO_CACHE
+
+# ============================================================================
+# CACHE DOS GRÁFICOS RENDERIZADOS
+# Cada gráfico é identificado pelo hash dos dados que vão para o desenho, do
+# nome do desenho e do que define o estilo (código de graficos.py e versões
+# das bibliotecas). Se o hash já foi renderizado, o PNG é copiado do cache.
+# ============================================================================
+
+DIRETORIO_GRAFICOS = os.path.join(DIRETORIO_CACHE, 'graficos')
+VERSAO_CACHE_GRAFICOS = 1
+# Espaço máximo ocupado pelos PNGs guardados; os usados há mais tempo saem primeiro
+LIMITE_BYTES = 256 * 1024 * 1024
+
+
+def chave_grafico(especificacao):
+    """Hash (SHA-256) do conteúdo que define a imagem de um gráfico"""
+    resumo = hashlib.sha256()
+    _atualizar(resumo, (VERSAO_CACHE_GRAFICOS, _assinatura_estilo(), especificacao['desenho']))
+    _atualizar(resumo, especificacao['dados'])
+    return resumo.hexdigest()
+
+
+def buscar(chave, destino, diretorio=DIRETORIO_GRAFICOS):
+    """Copia o PNG guardado para `destino`; devolve False se a chave não estiver no cache"""
+    origem = os.path.join(diretorio, f'{chave}.png')
+    try:
+        shutil.copyfile(origem, destino)
+    except FileNotFoundError:
+        return False
+    # A data de modificação marca o último uso (ordem de descarte)
+    os.utime(origem)
+    return True
+
+
+def guardar(chave, arquivo, diretorio=DIRETORIO_GRAFICOS, limite_bytes=LIMITE_BYTES):
+    """Guarda o PNG recém-renderizado e descarta os menos usados além do limite"""
+    os.makedirs(diretorio, exist_ok=True)
+    destino = os.path.join(diretorio, f'{chave}.png')
+    # Grava num arquivo temporário para nunca deixar um PNG pela metade no cache
+    temporario = f'{destino}.{os.getpid()}.tmp'
+    shutil.copyfile(arquivo, temporario)
+    os.replace(temporario, destino)
+    descartar_antigos(diretorio, limite_bytes)
+
+
+def descartar_antigos(diretorio=DIRETORIO_GRAFICOS, limite_bytes=LIMITE_BYTES):
+    """Remove os PNGs usados há mais tempo até o cache caber no limite"""
+    try:
+        entradas = [entrada for entrada in os.scandir(diretorio) if entrada.name.endswith('.png')]
+    except FileNotFoundError:
+        return
+    estados = sorted(((entrada.stat(), entrada.path) for entrada in entradas),
+                     key=lambda item: item[0].st_mtime_ns, reverse=True)
+    ocupado = 0
+    for estado, caminho in estados:
+        ocupado += estado.st_size
+        if ocupado > limite_bytes:
+            try:
+                os.remove(caminho)
+            except FileNotFoundError:
+                pass
+
+
+def _assinatura_estilo():
+    """Código dos desenhos e versões das bibliotecas: mudar qualquer um invalida o cache"""
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'graficos.py'), 'rb') as arquivo:
+        codigo = hashlib.sha256(arquivo.read()).hexdigest()
+    versoes = tuple(_versao(pacote) for pacote in ('matplotlib', 'seaborn', 'numpy', 'pandas'))
+    return codigo, versoes
+
+
+def _versao(pacote):
+    """Versão instalada do pacote (ou vazio, se não for encontrada)"""
+    try:
+        return metadata.version(pacote)
+    except metadata.PackageNotFoundError:
+        return ''
+
+
+def _atualizar(resumo, valor):
+    """Acrescenta ao hash o valor, com o tipo e a estrutura (tabelas, listas, dicionários)"""
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        resumo.update(type(valor).__name__.encode())
+        _atualizar(resumo, [str(valor.dtypes) if isinstance(valor, pd.Series) else list(map(str, valor.dtypes)),
+                            getattr(valor, 'name', None), list(map(str, valor.index.names)),
+                            list(map(str, getattr(valor, 'columns', [])))])
+        # O índice entra no hash (rótulos e ordem das linhas aparecem no gráfico)
+        resumo.update(pd.util.hash_pandas_object(valor, index=True).to_numpy().tobytes())
+    elif isinstance(valor, pd.Index):
+        resumo.update(b'Index')
+        resumo.update(pd.util.hash_pandas_object(valor).to_numpy().tobytes())
+    elif isinstance(valor, np.ndarray):
+        resumo.update(f'ndarray{valor.dtype}{valor.shape}'.encode())
+        resumo.update(np.ascontiguousarray(valor).tobytes())
+    elif isinstance(valor, dict):
+        resumo.update(b'dict')
+        for chave in sorted(valor, key=str):
+            _atualizar(resumo, str(chave))
+            _atualizar(resumo, valor[chave])
+    elif isinstance(valor, (list, tuple)):
+        resumo.update(f'{type(valor).__name__}{len(valor)}'.encode())
+        for item in valor:
+            _atualizar(resumo, item)
+    else:
+        resumo.update(f'{type(valor).__name__}:{valor!r};'.encode())
@@ -0,0 +1,134 @@
+import glob
+import os
+from itertools import islice
+
+import pandas as pd
+
+# ============================================================================
+# CARREGAMENTO EM BLOCOS
+# Lê a planilha (ou CSV/Parquet/Feather) em blocos de linhas, sem materializar o
+# arquivo inteiro na memória.
+# ============================================================================
+
+TAMANHO_BLOCO = 100_000
+EXTENSOES = ('.xlsx', '.xlsm', '.csv', '.parquet', '.feather')
+# Formatos em que pular as linhas já lidas é barato (CSV sem montar as linhas puladas,
+# Parquet por row groups, Feather por lotes); as planilhas precisam ser lidas do início
+SALTO_BARATO = ('.csv', '.parquet', '.feather')
+
+
+def ler_blocos(caminho, tamanho_bloco=TAMANHO_BLOCO, inicio=0):
+    """Gera DataFrames com no máximo `tamanho_bloco` linhas cada
+
+    `inicio` pula as primeiras linhas de dados (usado no modo incremental).
+    """
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao in ('.xlsx', '.xlsm'):
+        return _blocos_xlsx(caminho, tamanho_bloco, inicio)
+    if extensao == '.csv':
+        return _blocos_csv(caminho, tamanho_bloco, inicio)
+    if extensao == '.parquet':
+        return _blocos_parquet(caminho, tamanho_bloco, inicio)
+    if extensao == '.feather':
+        return _blocos_feather(caminho, tamanho_bloco, inicio)
+    raise ValueError(f"Formato de arquivo não suportado: {caminho}")
+
+
+def listar_arquivos(caminho):
+    """Arquivos de dados indicados por um arquivo, uma pasta ou um padrão glob, em ordem alfabética"""
+    if os.path.isdir(caminho):
+        candidatos = [os.path.join(caminho, nome) for nome in os.listdir(caminho)]
+    elif any(caractere in caminho for caractere in '*?['):
+        candidatos = glob.glob(caminho, recursive=True)
+    else:
+        return [caminho]
+
+    # Arquivos de trava do Excel (~$planilha.xlsx) ficam de fora
+    arquivos = sorted(arquivo for arquivo in candidatos
+                      if os.path.isfile(arquivo)
+                      and os.path.splitext(arquivo)[1].lower() in EXTENSOES
+                      and not os.path.basename(arquivo).startswith('~$'))
+    if not arquivos:
+        raise FileNotFoundError(f"Nenhum arquivo de dados encontrado em: {caminho}")
+    return arquivos
+
+
+def contar_linhas(caminho):
+    """Total de linhas de dados lido dos metadados, ou None se o formato não permitir"""
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao == '.parquet':
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(caminho).metadata.num_rows
+    if extensao == '.feather':
+        import pyarrow as pa
+        with pa.memory_map(caminho) as origem:
+            leitor = pa.ipc.open_file(origem)
+            return sum(leitor.get_batch(i).num_rows for i in range(leitor.num_record_batches))
+    return None
+
+
+def _blocos_xlsx(caminho, tamanho_bloco, inicio):
+    """Percorre a primeira aba com o openpyxl em modo somente leitura"""
+    from openpyxl import load_workbook
+
+    planilha = load_workbook(caminho, read_only=True, data_only=True)
+    try:
+        linhas = planilha.worksheets[0].iter_rows(values_only=True)
+        cabecalho = list(next(linhas, ()))
+        # Linhas totalmente vazias no fim da aba são ignoradas
+        preenchidas = (linha for linha in linhas if not all(valor is None for valor in linha))
+        bloco = []
+        for linha in islice(preenchidas, inicio, None):
+            bloco.append(linha)
+            if len(bloco) == tamanho_bloco:
+                yield pd.DataFrame.from_records(bloco, columns=cabecalho)
+                bloco = []
+        if bloco:
+            yield pd.DataFrame.from_records(bloco, columns=cabecalho)
+    finally:
+        planilha.close()
+
+
+def _blocos_csv(caminho, tamanho_bloco, inicio):
+    """Lê o CSV com o leitor em blocos do pandas"""
+    with pd.read_csv(caminho, chunksize=tamanho_bloco, skiprows=range(1, inicio + 1)) as leitor:
+        yield from leitor
+
+
+def _blocos_parquet(caminho, tamanho_bloco, inicio):
+    """Lê o Parquet por lotes de registros, pulando row groups inteiros (requer pyarrow)"""
+    import pyarrow.parquet as pq
+
+    arquivo = pq.ParquetFile(caminho)
+    grupos = []
+    for grupo in range(arquivo.num_row_groups):
+        linhas_grupo = arquivo.metadata.row_group(grupo).num_rows
+        if not grupos and inicio >= linhas_grupo:
+            inicio -= linhas_grupo
+            continue
+        grupos.append(grupo)
+    if not grupos:
+        return
+
+    for lote in arquivo.iter_batches(batch_size=tamanho_bloco, row_groups=grupos):
+        if inicio >= lote.num_rows:
+            inicio -= lote.num_rows
+            continue
+        yield lote.slice(inicio).to_pandas()
+        inicio = 0
+
+
+def _blocos_feather(caminho, tamanho_bloco, inicio):
+    """Lê o Feather via memory map, fatiando os lotes sem copiar (requer pyarrow)"""
+    import pyarrow as pa
+
+    with pa.memory_map(caminho) as origem:
+        leitor = pa.ipc.open_file(origem)
+        for indice in range(leitor.num_record_batches):
+            lote = leitor.get_batch(indice)
+            if inicio >= lote.num_rows:
+                inicio -= lote.num_rows
+                continue
+            for posicao in range(inicio, lote.num_rows, tamanho_bloco):
+                yield lote.slice(posicao, tamanho_bloco).to_pandas()
+            inicio = 0
@@ -0,0 +1,288 @@
+import hashlib
+import json
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+import perfil
+from cache import DIRETORIO_CACHE
+from carregamento import TAMANHO_BLOCO, ler_blocos
+from cubo import AGREGACOES, NOTAS, combinar_cubos
+from esquema import COLUNA_DATA, DIMENSOES, LIMITE_NOTA_BAIXA, normalizar_esquema, uso_memoria
+from tendencias import DIMENSOES_TEMPORAIS, combinar_cubos_temporais
+
+# ============================================================================
+# BACKEND SQL (SQLite)
+# As avaliações são gravadas uma única vez num banco SQLite em disco e o
+# cubo de agregação sai de uma consulta GROUP BY; todas as análises são
+# consolidações do cubo. As dimensões ficam codificadas como inteiros (os
+# rótulos numa tabela à parte) e o dia como número de dias desde 1970, o que
+# deixa o agrupamento mais barato. Os blocos vão direto da leitura para o
+# banco (ele mesmo faz o papel do cache colunar), que é reaproveitado
+# enquanto os arquivos de origem não mudam; a consulta é dividida em faixas de linhas
+# executadas em paralelo, uma conexão (somente leitura) por processo.
+# ============================================================================
+
+BACKENDS = ('pandas', 'sqlite')
+DIRETORIO_BANCO = os.path.join(DIRETORIO_CACHE, 'sql')
+VERSAO_BANCO = 2
+
+# Páginas de cache do SQLite por conexão (valor negativo = KiB); o excedente vai para o disco
+CACHE_SQLITE_KIB = 65_536
+
+# Colunas do banco: os nomes das dimensões sem espaço
+COLUNAS_SQL = {'attendant': 'attendant', 'contact type': 'contact_type', 'opportunity': 'opportunity'}
+
+# Estatísticas suficientes de cada célula, na mesma ordem de AGREGACOES
+_EXPRESSOES = {
+    'n': 'COUNT(*)',
+    'soma': 'SUM(csat)',
+    'soma_quadrados': 'SUM(csat * csat)',
+    'min': 'MIN(csat)',
+    'max': 'MAX(csat)',
+    'baixas': f'SUM(csat < {LIMITE_NOTA_BAIXA})',
+    **{f'nota_{nota}': f'SUM(csat = {nota})' for nota in NOTAS},
+    'primeira_ocorrencia': 'MIN(posicao)',
+}
+_DIMENSOES_SQL = ', '.join(COLUNAS_SQL[dimensao] for dimensao in DIMENSOES)
+CONSULTA_CUBO = f"""
+    SELECT {_DIMENSOES_SQL}, {', '.join(f'{expressao} AS {nome}' for nome, expressao in _EXPRESSOES.items())}
+    FROM avaliacoes
+    WHERE posicao >= ? AND posicao < ?
+    GROUP BY {_DIMENSOES_SQL}
+"""
+CONSULTA_TEMPORAL = f"""
+    SELECT dia, attendant, contact_type, COUNT(*) AS n, SUM(csat) AS soma,
+           SUM(csat < {LIMITE_NOTA_BAIXA}) AS baixas
+    FROM avaliacoes
+    WHERE posicao >= ? AND posicao < ?
+      AND dia IS NOT NULL
+    GROUP BY dia, attendant, contact_type
+"""
+
+
+def caminho_banco(arquivos, diretorio=DIRETORIO_BANCO):
+    """Arquivo do banco de um conjunto de arquivos de dados"""
+    chave = hashlib.sha1('\n'.join(os.path.abspath(arquivo) for arquivo in arquivos).encode('utf-8'))
+    return os.path.join(diretorio, f'csat-{chave.hexdigest()[:12]}.sqlite')
+
+
+def _assinatura(arquivos):
+    """Tamanho e data de modificação de cada arquivo de origem"""
+    return [[os.path.abspath(arquivo), os.stat(arquivo).st_size, os.stat(arquivo).st_mtime_ns]
+            for arquivo in arquivos]
+
+
+def _conectar(banco, somente_leitura=False):
+    """Conexão com o cache limitado e tabelas temporárias em disco"""
+    if somente_leitura:
+        conexao = sqlite3.connect(f'file:{banco}?mode=ro', uri=True)
+    else:
+        conexao = sqlite3.connect(banco)
+    conexao.execute(f'PRAGMA cache_size = -{CACHE_SQLITE_KIB}')
+    conexao.execute('PRAGMA temp_store = FILE')
+    return conexao
+
+
+def _metadados(banco):
+    """Metadados gravados junto com as avaliações, ou None se o banco não existe ou é de outra versão"""
+    if not os.path.exists(banco):
+        return None
+    try:
+        with closing(_conectar(banco, somente_leitura=True)) as conexao:
+            metadados = json.loads(conexao.execute('SELECT valor FROM metadados').fetchone()[0])
+    except (sqlite3.Error, TypeError, ValueError):
+        return None
+    return metadados if metadados.get('versao') == VERSAO_BANCO else None
+
+
+def preparar_banco(arquivos, tamanho_bloco=TAMANHO_BLOCO, usar_cache=True, mostrar_memoria=False,
+                   diretorio=DIRETORIO_BANCO):
+    """Grava as avaliações no banco SQLite, a menos que os arquivos não tenham mudado
+
+    Devolve (caminho do banco, metadados, memória antes, memória depois). Os
+    blocos são lidos direto dos arquivos de origem, sem passar pelo cache
+    Feather, e gravados num arquivo temporário que só substitui o banco
+    anterior quando está completo. Sem `usar_cache` o banco é sempre regravado.
+    """
+    banco = caminho_banco(arquivos, diretorio)
+    assinatura = _assinatura(arquivos)
+    metadados = _metadados(banco) if usar_cache else None
+    if metadados is not None and metadados['assinatura'] == assinatura:
+        return banco, metadados, 0, 0
+
+    os.makedirs(diretorio, exist_ok=True)
+    temporario = f'{banco}.tmp'
+    if os.path.exists(temporario):
+        os.remove(temporario)
+    memoria_antes = memoria_depois = 0
+    total = 0
+    tem_data = False
+    with perfil.etapa('carga do banco SQL'):
+        conexao = _conectar(temporario)
+        try:
+            # Carga única: sem diário de transações, o banco só passa a valer no os.replace
+            conexao.execute('PRAGMA journal_mode = OFF')
+            conexao.execute('PRAGMA synchronous = OFF')
+            conexao.execute('CREATE TABLE avaliacoes (posicao INTEGER PRIMARY KEY, attendant INTEGER, '
+                            'contact_type INTEGER, opportunity INTEGER, csat INTEGER NOT NULL, dia INTEGER)')
+            conexao.execute('CREATE TABLE rotulos (dimensao TEXT, codigo INTEGER, valor, '
+                            'PRIMARY KEY (dimensao, codigo))')
+            conexao.execute('CREATE TABLE metadados (valor TEXT)')
+            dicionarios = {dimensao: {} for dimensao in DIMENSOES}
+            for arquivo in arquivos:
+                for bloco in perfil.medir_iteracao(ler_blocos(arquivo, tamanho_bloco), 'leitura do bloco'):
+                    tipado = normalizar_esquema(bloco, derivados=False)
+                    if mostrar_memoria:
+                        memoria_antes += uso_memoria(bloco)
+                        memoria_depois += uso_memoria(tipado)
+                    tem_data = tem_data or COLUNA_DATA in tipado
+                    registros = _registros(tipado, total, dicionarios)
+                    conexao.executemany('INSERT INTO avaliacoes VALUES (?, ?, ?, ?, ?, ?)',
+                                        registros.itertuples(index=False, name=None))
+                    total += len(tipado)
+            conexao.executemany('INSERT INTO rotulos VALUES (?, ?, ?)',
+                                [(dimensao, codigo, valor) for dimensao, dicionario in dicionarios.items()
+                                 for valor, codigo in dicionario.items()])
+            metadados = {'versao': VERSAO_BANCO, 'assinatura': assinatura, 'linhas': total, 'tem_data': tem_data}
+            conexao.execute('INSERT INTO metadados VALUES (?)', (json.dumps(metadados),))
+            conexao.commit()
+        finally:
+            conexao.close()
+        perfil.anotar(linhas=total, bytes_saida=os.path.getsize(temporario))
+    os.replace(temporario, banco)
+    return banco, metadados, memoria_antes, memoria_depois
+
+
+def _registros(tipado, inicio, dicionarios):
+    """Linhas (posição, códigos das dimensões, nota, dia) de um bloco, com None nos valores ausentes
+
+    `dicionarios` guarda o código de cada rótulo já visto, por dimensão, e
+    recebe os rótulos novos do bloco. Colunas com ausentes ficam como objeto
+    (inteiros Python e None), que o sqlite3 grava sem conversão.
+    """
+    posicoes = np.arange(inicio, inicio + len(tipado))
+    presentes = tipado['csat'].notna().to_numpy()
+    if not presentes.all():
+        # Notas ausentes ficam de fora, como no cubo do pandas; as demais mantêm a posição
+        tipado, posicoes = tipado[presentes], posicoes[presentes]
+    colunas = {'posicao': posicoes}
+    for dimensao in DIMENSOES:
+        categorias = tipado[dimensao].cat
+        dicionario = dicionarios[dimensao]
+        # O código -1 (valor ausente) cai no último elemento do mapa
+        mapa = np.array([dicionario.setdefault(valor, len(dicionario)) for valor in categorias.categories.tolist()]
+                        + [-1])
+        codigos = mapa[categorias.codes.to_numpy()]
+        colunas[COLUNAS_SQL[dimensao]] = _com_ausentes(codigos, codigos < 0)
+    colunas['csat'] = tipado['csat'].to_numpy(dtype=np.int64)
+    if COLUNA_DATA in tipado:
+        datas = tipado[COLUNA_DATA]
+        dias = datas.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]').astype(np.int64)
+        colunas['dia'] = _com_ausentes(dias, datas.isna().to_numpy())
+    else:
+        colunas['dia'] = np.full(len(tipado), None, dtype=object)
+    return pd.DataFrame(colunas, copy=False)
+
+
+def _com_ausentes(valores, ausentes):
+    """A própria coluna int64 ou, se houver ausentes, uma de objetos com None nessas posições"""
+    if not ausentes.any():
+        return valores
+    return np.where(ausentes, None, valores)
+
+
+def consultar(banco, consulta, inicio, fim):
+    """Executa a consulta agregada numa faixa de posições [início, fim) (em um processo de consulta)"""
+    with closing(_conectar(banco, somente_leitura=True)) as conexao:
+        return pd.read_sql_query(consulta, conexao, params=(inicio, fim))
+
+
+def rotulos(banco):
+    """Rótulos de cada dimensão, indexados pelo código gravado no banco"""
+    with closing(_conectar(banco, somente_leitura=True)) as conexao:
+        tabela = pd.read_sql_query('SELECT dimensao, codigo, valor FROM rotulos ORDER BY dimensao, codigo', conexao)
+    return {dimensao: np.array(grupo['valor'].tolist(), dtype=object)
+            for dimensao, grupo in tabela.groupby('dimensao', sort=False)}
+
+
+def _decodificar(parte, rotulos_dimensoes, dimensoes):
+    """Troca os códigos das dimensões pelos rótulos, como categóricas (igual ao esquema do backend pandas)
+
+    Código NULL (rótulo ausente) vira -1, que cai no None acrescentado ao fim dos rótulos.
+    """
+    for dimensao in dimensoes:
+        valores = np.append(rotulos_dimensoes.get(dimensao, np.empty(0, dtype=object)), None)
+        codigos = parte.pop(COLUNAS_SQL[dimensao]).fillna(-1).to_numpy(dtype=np.int64)
+        parte[dimensao] = pd.Categorical(valores[codigos])
+    return parte
+
+
+def _consultar_faixas(banco, consulta, linhas, trabalhadores):
+    """Divide as linhas em faixas e consulta cada uma no seu processo"""
+    if trabalhadores is None:
+        trabalhadores = os.cpu_count() or 1
+    trabalhadores = max(1, min(trabalhadores, linhas))
+    limites = np.linspace(0, linhas, trabalhadores + 1).astype(np.int64).tolist()
+    if trabalhadores == 1:
+        return [consultar(banco, consulta, 0, linhas)]
+    with ProcessPoolExecutor(max_workers=trabalhadores) as executor:
+        return list(executor.map(consultar, [banco] * trabalhadores, [consulta] * trabalhadores,
+                                 limites[:-1], limites[1:]))
+
+
+def cubo_sql(banco, linhas, trabalhadores=None, rotulos_dimensoes=None):
+    """Cubo de agregação calculado pelo SQLite, no mesmo formato de `cubo.construir_cubo`"""
+    if rotulos_dimensoes is None:
+        rotulos_dimensoes = rotulos(banco)
+    with perfil.etapa('consulta do cubo SQL'):
+        partes = []
+        for parte in _consultar_faixas(banco, CONSULTA_CUBO, linhas, trabalhadores):
+            parte = _decodificar(parte, rotulos_dimensoes, DIMENSOES)
+            partes.append(parte.set_index(DIMENSOES).astype({coluna: np.int64 for coluna in AGREGACOES}))
+        perfil.anotar(linhas=linhas)
+        return combinar_cubos(partes)
+
+
+def temporal_sql(banco, linhas, trabalhadores=None, rotulos_dimensoes=None):
+    """Cubo temporal (por dia, atendente e tipo de contato) calculado pelo SQLite"""
+    if rotulos_dimensoes is None:
+        rotulos_dimensoes = rotulos(banco)
+    with perfil.etapa('consulta do cubo temporal SQL'):
+        partes = []
+        for parte in _consultar_faixas(banco, CONSULTA_TEMPORAL, linhas, trabalhadores):
+            parte = _decodificar(parte, rotulos_dimensoes, DIMENSOES_TEMPORAIS[1:])
+            parte['dia'] = parte['dia'].to_numpy().astype('datetime64[D]').astype('datetime64[us]')
+            partes.append(parte.set_index(DIMENSOES_TEMPORAIS).astype(np.int64))
+        return combinar_cubos_temporais(partes)
+
+
+def reduzir_sql(arquivos, tamanho_bloco=TAMANHO_BLOCO, usar_cache=True, mostrar_memoria=False,
+                trabalhadores=None):
+    """Reduz os arquivos aos cubos pelo backend SQL, no formato de `ingestao.reduzir_arquivos`"""
+    banco, metadados, memoria_antes, memoria_depois = preparar_banco(arquivos, tamanho_bloco, usar_cache,
+                                                                     mostrar_memoria)
+    linhas = metadados['linhas']
+    if linhas == 0:
+        cubo = temporal = None
+    else:
+        rotulos_dimensoes = rotulos(banco)
+        cubo = cubo_sql(banco, linhas, trabalhadores, rotulos_dimensoes)
+        temporal = (temporal_sql(banco, linhas, trabalhadores, rotulos_dimensoes)
+                    if metadados['tem_data'] else None)
+
+    # As primeiras linhas vêm do próprio arquivo, com as colunas e tipos originais (só o primeiro
+    # bloco é lido); fechar o gerador fecha a planilha aberta pelo openpyxl
+    blocos = ler_blocos(arquivos[0], tamanho_bloco)
+    try:
+        primeiro_bloco = next(blocos, None)
+    finally:
+        blocos.close()
+    return {'cubo': cubo, 'temporal': temporal, 'linhas': linhas,
+            'primeiras_linhas': None if primeiro_bloco is None else primeiro_bloco.head(),
+            'colunas': [] if primeiro_bloco is None else list(primeiro_bloco.columns),
+            'memoria_antes': memoria_antes, 'memoria_depois': memoria_depois}
@@ -0,0 +1,225 @@
+import numpy as np
+import pandas as pd
+
+from esquema import DIMENSOES, LIMITE_NOTA_BAIXA, NOTA_MINIMA, NOTA_MAXIMA
+
+# ============================================================================
+# CUBO DE AGREGAÇÃO - ESTATÍSTICAS SUFICIENTES POR CÉLULA
+# Cada célula (atendente × tipo de contato × opportunity) guarda apenas
+# contagens e somas; médias, desvios e medianas são derivados delas.
+# ============================================================================
+
+NOTAS = list(range(NOTA_MINIMA, NOTA_MAXIMA + 1))
+COLUNAS_HISTOGRAMA = [f'nota_{nota}' for nota in NOTAS]
+
+# Como cada estatística é consolidada ao juntar células
+AGREGACOES = {
+    'n': 'sum',
+    'soma': 'sum',
+    'soma_quadrados': 'sum',
+    'min': 'min',
+    'max': 'max',
+    'baixas': 'sum',
+    **{coluna: 'sum' for coluna in COLUNAS_HISTOGRAMA},
+    'primeira_ocorrencia': 'min',
+}
+
+
+def construir_cubo(df, inicio=0, dimensoes=DIMENSOES):
+    """Varre o DataFrame uma única vez e monta o cubo de estatísticas suficientes
+
+    `inicio` é a posição da primeira linha do DataFrame no arquivo completo,
+    usada quando os dados chegam em blocos. `dimensoes` permite níveis a
+    mais (ex.: o dia, no serviço HTTP) além das dimensões padrão.
+    """
+    posicoes = np.arange(inicio, inicio + len(df))
+    presentes = df['csat'].notna().to_numpy()
+    if not presentes.all():
+        # Notas ausentes ficam de fora; as demais linhas mantêm a posição no arquivo
+        df, posicoes = df[presentes], posicoes[presentes]
+    csat = df['csat']
+    # Notas inteiras são acumuladas em int64 mesmo quando a coluna é compacta (int8)
+    if csat.dtype.kind in 'iu':
+        csat = csat.astype(np.int64)
+    linhas = pd.DataFrame({
+        **{dimensao: df[dimensao] for dimensao in dimensoes},
+        'n': csat.notna(),
+        'soma': csat,
+        'soma_quadrados': csat ** 2,
+        'min': csat,
+        'max': csat,
+        'baixas': df['nota_baixa'] if 'nota_baixa' in df else csat < LIMITE_NOTA_BAIXA,
+        **{f'nota_{nota}': csat == nota for nota in NOTAS},
+        'primeira_ocorrencia': posicoes,
+    })
+    # Rótulo ausente (ex.: tipo de contato em branco) vira uma célula própria: a
+    # avaliação continua contando nas dimensões preenchidas e nos totais
+    return linhas.groupby(dimensoes, sort=True, observed=True, dropna=False).agg(AGREGACOES)
+
+
+def combinar_cubos(cubos, dimensoes=DIMENSOES):
+    """Junta cubos parciais (blocos, arquivos, períodos) em um único cubo
+
+    Com `dimensoes` menores que as do cubo, também serve para consolidar
+    (ex.: somar os dias de um cubo diário).
+    """
+    return pd.concat(cubos).groupby(level=dimensoes, sort=True, observed=True, dropna=False).agg(AGREGACOES)
+
+
+def cubos_iguais(cubo_a, cubo_b):
+    """Compara dois cubos célula a célula, ignorando a ordem e o tipo dos rótulos"""
+    def normalizar(cubo):
+        tabela = cubo.reset_index()
+        tabela[DIMENSOES] = tabela[DIMENSOES].astype(str)
+        tabela = tabela.sort_values(DIMENSOES, ignore_index=True)
+        return tabela[DIMENSOES + list(AGREGACOES)].astype({coluna: 'int64' for coluna in AGREGACOES})
+    return normalizar(cubo_a).equals(normalizar(cubo_b))
+
+
+def agregar(cubo, dimensoes):
+    """Consolida o cubo nas dimensões pedidas e deriva média, desvio padrão e mediana
+
+    Só os grupos com rótulo em todas as dimensões pedidas aparecem (como no
+    `groupby` do pandas), mas as células com rótulo ausente em outras
+    dimensões entram na conta do grupo.
+    """
+    estatisticas = cubo.groupby(level=dimensoes, sort=True, observed=True).agg(AGREGACOES)
+    estatisticas.index = _rotulos(estatisticas.index)
+    return _derivar(estatisticas)
+
+
+def totais(cubo):
+    """Estatísticas de todo o conjunto de dados (sem nenhuma dimensão)"""
+    estatisticas = cubo.agg(AGREGACOES).to_frame().T.astype(cubo.dtypes)
+    return _derivar(estatisticas).astype(object).iloc[0]
+
+
+def ordem_aparicao(cubo, dimensao):
+    """Valores da dimensão na ordem em que aparecem pela primeira vez nos dados"""
+    primeira = cubo.groupby(level=dimensao, sort=True, observed=True)['primeira_ocorrencia'].min()
+    return _rotulos(primeira.sort_values(kind='stable').index)
+
+
+def contagem_notas(estatisticas, notas):
+    """Soma as colunas do histograma correspondentes às notas informadas"""
+    return estatisticas[[f'nota_{nota}' for nota in notas]].sum(axis=1)
+
+
+def restringir_notas(cubo, notas):
+    """Cubo só com as avaliações das notas informadas, recalculado pelo histograma
+
+    Contagens, somas, extremos e notas baixas saem do histograma de cada
+    célula; a primeira ocorrência continua sendo a da célula, pois o cubo não
+    guarda a posição de cada nota. Células sem nenhuma dessas notas saem.
+    """
+    escolhidas = np.array(sorted(set(notas) & set(NOTAS)), dtype=np.int64)
+    histograma = cubo[[f'nota_{nota}' for nota in escolhidas]].to_numpy(dtype=np.int64)
+    presentes = histograma > 0
+    restrito = cubo.copy()
+    restrito['n'] = histograma.sum(axis=1)
+    restrito['soma'] = histograma @ escolhidas
+    restrito['soma_quadrados'] = histograma @ escolhidas ** 2
+    if len(escolhidas):
+        restrito['min'] = escolhidas[presentes.argmax(axis=1)]
+        restrito['max'] = escolhidas[len(escolhidas) - 1 - presentes[:, ::-1].argmax(axis=1)]
+    restrito['baixas'] = histograma[:, escolhidas < LIMITE_NOTA_BAIXA].sum(axis=1)
+    for nota in NOTAS:
+        if nota not in escolhidas:
+            restrito[f'nota_{nota}'] = 0
+    return restrito[restrito['n'] > 0]
+
+
+def quantil_histograma(contagens, q):
+    """Quantil exato (interpolação linear, como `np.percentile`) de cada linha de uma matriz de histogramas"""
+    contagens = np.asarray(contagens)
+    n = contagens.sum(axis=1)
+    acumulado = contagens.cumsum(axis=1)
+    notas = np.asarray(NOTAS, dtype=float)
+
+    # Posição fracionária do quantil entre as notas ordenadas de cada grupo
+    posicao = (n - 1) * q
+    inferior = np.floor(posicao)
+    fracao = posicao - inferior
+    validos = n > 0
+    abaixo = notas[np.minimum((acumulado <= inferior[:, None]).sum(axis=1), len(NOTAS) - 1)]
+    acima = notas[np.minimum((acumulado <= np.ceil(posicao)[:, None]).sum(axis=1), len(NOTAS) - 1)]
+
+    # Mesma fórmula de interpolação do numpy, para resultados idênticos
+    diferenca = acima - abaixo
+    quantil = np.where(fracao >= 0.5, acima - diferenca * (1 - fracao), abaixo + diferenca * fracao)
+    return np.where(validos, quantil, np.nan)
+
+
+def mediana_histograma(contagens):
+    """Mediana exata de cada linha de uma matriz de histogramas de notas"""
+    return quantil_histograma(contagens, 0.5)
+
+
+def quantis(estatisticas, qs=(0.25, 0.5, 0.75)):
+    """Tabela com os quantis pedidos de cada grupo, calculados pelo histograma"""
+    contagens = estatisticas[COLUNAS_HISTOGRAMA]
+    return pd.DataFrame({q: quantil_histograma(contagens, q) for q in qs}, index=estatisticas.index)
+
+
+def resumo_boxplot(estatisticas, whis=1.5):
+    """Estatísticas do boxplot de cada grupo (formato de `Axes.bxp`) sem expandir as notas
+
+    Segue as regras de `matplotlib.cbook.boxplot_stats`; como as notas são
+    discretas, cada valor atípico aparece uma única vez.
+    """
+    contagens = estatisticas[COLUNAS_HISTOGRAMA].to_numpy()
+    n = contagens.sum(axis=1)
+    notas = np.asarray(NOTAS, dtype=float)
+    q1, mediana, q3 = (quantil_histograma(contagens, q) for q in (0.25, 0.5, 0.75))
+    iqr = q3 - q1
+    presentes = contagens > 0
+
+    # Bigodes: nota mais extrema dentro de 1.5 IQR, nunca aquém dos quartis
+    dentro_baixo = presentes & (notas >= (q1 - whis * iqr)[:, None])
+    dentro_alto = presentes & (notas <= (q3 + whis * iqr)[:, None])
+    bigode_baixo = np.where(dentro_baixo.any(axis=1), notas[dentro_baixo.argmax(axis=1)], q1)
+    bigode_alto = np.where(dentro_alto.any(axis=1),
+                           notas[len(NOTAS) - 1 - dentro_alto[:, ::-1].argmax(axis=1)], q3)
+    bigode_baixo = np.minimum(bigode_baixo, q1)
+    bigode_alto = np.maximum(bigode_alto, q3)
+
+    media = (contagens * notas).sum(axis=1) / n
+    resumo = []
+    for i, rotulo in enumerate(estatisticas.index):
+        atipicos = presentes[i] & ((notas < bigode_baixo[i]) | (notas > bigode_alto[i]))
+        resumo.append({
+            'label': rotulo, 'mean': media[i], 'iqr': iqr[i],
+            'cilo': mediana[i] - 1.57 * iqr[i] / np.sqrt(n[i]),
+            'cihi': mediana[i] + 1.57 * iqr[i] / np.sqrt(n[i]),
+            'whislo': bigode_baixo[i], 'whishi': bigode_alto[i], 'fliers': notas[atipicos],
+            'q1': q1[i], 'med': mediana[i], 'q3': q3[i],
+        })
+    return resumo
+
+
+def _rotulos(indice):
+    """Troca níveis categóricos do índice pelos próprios valores
+
+    As consolidações são pequenas, e rótulos simples evitam surpresas como
+    `pd.Categorical(..., categories=indice)` reordenar pelas categorias.
+    """
+    if isinstance(indice, pd.MultiIndex):
+        return pd.MultiIndex.from_arrays(
+            [np.asarray(indice.get_level_values(nivel)) for nivel in range(indice.nlevels)],
+            names=indice.names)
+    return pd.Index(np.asarray(indice), name=indice.name)
+
+
+def _derivar(estatisticas):
+    """Acrescenta média, desvio padrão amostral e mediana às estatísticas"""
+    n = estatisticas['n']
+    soma = estatisticas['soma']
+    estatisticas['media'] = soma / n
+
+    # Variância amostral calculada com inteiros para não perder precisão
+    numerador = n * estatisticas['soma_quadrados'] - soma * soma
+    denominador = n * (n - 1)
+    estatisticas['desvio_padrao'] = np.sqrt((numerador / denominador).where(n > 1))
+
+    estatisticas['mediana'] = mediana_histograma(estatisticas[COLUNAS_HISTOGRAMA])
+    return estatisticas
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# ESQUEMA COMPACTO DOS DADOS CSAT
+# Dimensões como categóricas, nota em int8 validada (1 a 5), data (se houver)
+# como datetime e as colunas derivadas (nota baixa e faixa da nota)
+# calculadas uma única vez.
+# ============================================================================
+
+DIMENSOES = ['attendant', 'contact type', 'opportunity']
+COLUNA_DATA = 'date'
+NOTA_MINIMA = 1
+NOTA_MAXIMA = 5
+LIMITE_NOTA_BAIXA = 3
+
+# Faixas usadas no gráfico de pizza do dashboard (intervalos fechados à direita)
+FAIXAS_CATEGORIA = [0, 3, 4, 5.1]
+ROTULOS_CATEGORIA = ['Baixa (<3)', 'Média (3-4)', 'Alta (4-5)']
+
+# Código da faixa de cada nota possível, indexado pela própria nota
+_CODIGOS_CATEGORIA = np.full(NOTA_MAXIMA + 1, -1, dtype=np.int8)
+_CODIGOS_CATEGORIA[NOTA_MINIMA:] = pd.cut(
+    np.arange(NOTA_MINIMA, NOTA_MAXIMA + 1), bins=FAIXAS_CATEGORIA,
+    labels=ROTULOS_CATEGORIA, include_lowest=True).codes
+
+
+def normalizar_esquema(df, derivados=True):
+    """Devolve uma cópia tipada do DataFrame, sem alterar o original
+
+    Levanta ValueError se houver nota fracionária ou fora de 1 a 5; notas
+    ausentes são mantidas (ver `validar_notas`).
+    """
+    normalizado = pd.DataFrame(index=df.index)
+    for coluna in df.columns:
+        if coluna in DIMENSOES:
+            normalizado[coluna] = df[coluna].astype('category')
+        elif coluna == 'csat':
+            normalizado[coluna] = validar_notas(df[coluna])
+        elif coluna == COLUNA_DATA:
+            normalizado[coluna] = pd.to_datetime(df[coluna], errors='coerce')
+        else:
+            normalizado[coluna] = df[coluna]
+
+    if derivados:
+        # Nota ausente: não é nota baixa e fica sem faixa (o código -1 da posição 0)
+        csat = normalizado['csat'].to_numpy(dtype=np.int64, na_value=0)
+        normalizado['nota_baixa'] = (csat >= NOTA_MINIMA) & (csat < LIMITE_NOTA_BAIXA)
+        normalizado['categoria'] = pd.Categorical.from_codes(_CODIGOS_CATEGORIA[csat],
+                                                             categories=ROTULOS_CATEGORIA)
+    return normalizado
+
+
+def validar_notas(csat):
+    """Converte as notas para int8 garantindo que sejam inteiros entre 1 e 5
+
+    Notas ausentes não são erro: como na média e na contagem do pandas, elas
+    ficam de fora das estatísticas (o cubo descarta essas linhas). Nesse caso
+    a coluna vira Int8 (inteiro com valores ausentes).
+    """
+    ausentes = csat.isna()
+    valores = pd.to_numeric(csat, errors='coerce')
+    invalidas = ~ausentes & (valores.isna() | (valores % 1 != 0)
+                             | (valores < NOTA_MINIMA) | (valores > NOTA_MAXIMA))
+    if invalidas.any():
+        exemplos = csat[invalidas].head(5).tolist()
+        raise ValueError(
+            f"{int(invalidas.sum())} nota(s) CSAT inválida(s); esperado inteiro de "
+            f"{NOTA_MINIMA} a {NOTA_MAXIMA}. Exemplos: {exemplos}")
+    return valores.astype('Int8' if ausentes.any() else np.int8)
+
+
+def uso_memoria(df):
+    """Bytes ocupados por coluna, contando o conteúdo das strings"""
+    return df.memory_usage(deep=True, index=False)
+
+
+def relatorio_memoria(antes, depois):
+    """Compara o uso de memória (em bytes por coluna) antes e depois da normalização"""
+    relatorio = pd.DataFrame({'Antes (KB)': antes, 'Depois (KB)': depois}).reindex(depois.index) / 1024
+    relatorio.loc['TOTAL'] = relatorio.sum()
+    relatorio['Redução (%)'] = (1 - relatorio['Depois (KB)'] / relatorio['Antes (KB)']) * 100
+    return relatorio.round(1)
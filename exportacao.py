@@ -0,0 +1,143 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+import perfil
+from relatorios import nomes_arquivos
+
+# ============================================================================
+# EXPORTAÇÃO DAS TABELAS DE RESULTADO
+# Todas as tabelas das análises são gravadas de uma vez numa planilha XLSX
+# (uma aba por tabela), em Parquet e em CSV (um arquivo por tabela), para
+# consumo por ferramentas de BI sem depender da saída do console. Cada
+# formato é gravado por uma thread própria, e as tabelas são escritas em
+# lotes de linhas (XLSX em modo write-only), sem cópias inteiras em memória.
+# openpyxl e pyarrow só são importados quando há exportação.
+# ============================================================================
+
+FORMATOS = ('xlsx', 'parquet', 'csv')
+DIRETORIO_EXPORTACAO = 'resultados_exportados'
+ARQUIVO_XLSX = 'resultados.xlsx'
+TAMANHO_LOTE = 50_000
+# Limites do Excel: linhas por aba (com o cabeçalho) e caracteres no nome da aba
+MAXIMO_LINHAS_ABA = 1_048_576
+MAXIMO_NOME_ABA = 31
+
+
+def tabelas_resultados(resultados, nomes):
+    """Tabelas exportáveis a partir do que cada análise devolveu, por nome
+
+    `resultados` é {número da análise: retorno}; o retorno pode ser a
+    tabela, uma tupla (tabela, gráfico) ou um dicionário de tabelas (que
+    vira uma tabela por chave). Análises sem tabela ficam de fora.
+    """
+    tabelas = {}
+    for numero, retorno in resultados.items():
+        if isinstance(retorno, tuple):
+            retorno = retorno[0]
+        prefixo = f"{numero:02d}_{nomes[numero]}"
+        if not isinstance(retorno, dict):
+            if isinstance(retorno, (pd.DataFrame, pd.Series)):
+                tabelas[prefixo] = _achatar(retorno)
+            continue
+        nomes_partes = nomes_arquivos(retorno)
+        for chave, tabela in retorno.items():
+            if isinstance(tabela, (pd.DataFrame, pd.Series)):
+                tabelas[f"{prefixo}_{nomes_partes[chave]}"] = _achatar(tabela)
+    return tabelas
+
+
+def _achatar(tabela):
+    """Tabela sem índice nomeado nem MultiIndex (os níveis viram colunas) e com nomes de coluna em texto"""
+    if isinstance(tabela, pd.Series):
+        tabela = tabela.to_frame(tabela.name if tabela.name is not None else 'valor')
+    if not isinstance(tabela.index, pd.RangeIndex) or any(nome is not None for nome in tabela.index.names):
+        tabela = tabela.reset_index()
+    return tabela.set_axis([str(coluna) for coluna in tabela.columns], axis=1)
+
+
+def _lotes(tabela, inicio=0, fim=None):
+    """Fatias consecutivas da tabela com até TAMANHO_LOTE linhas"""
+    fim = len(tabela) if fim is None else fim
+    for posicao in range(inicio, fim, TAMANHO_LOTE):
+        yield tabela.iloc[posicao:min(posicao + TAMANHO_LOTE, fim)]
+
+
+def _linhas_xlsx(lote):
+    """Linhas do lote como valores Python (NaN vira célula vazia)"""
+    valores = lote.astype(object)
+    return valores.where(lote.notna(), None).to_numpy().tolist()
+
+
+def escrever_xlsx(tabelas, diretorio):
+    """Grava todas as tabelas numa planilha, uma aba por tabela, em modo write-only
+
+    No modo write-only o openpyxl escreve cada linha direto no arquivo, sem
+    guardar a planilha em memória. Tabelas maiores que o limite do Excel
+    continuam em abas numeradas.
+    """
+    from openpyxl import Workbook
+
+    caminho = os.path.join(diretorio, ARQUIVO_XLSX)
+    with perfil.etapa('exportação xlsx', 'exportacao'):
+        planilha = Workbook(write_only=True)
+        por_aba = MAXIMO_LINHAS_ABA - 1
+        for nome, tabela in tabelas.items():
+            for parte, inicio in enumerate(range(0, max(len(tabela), 1), por_aba), start=1):
+                sufixo = f" ({parte})" if parte > 1 else ""
+                aba = planilha.create_sheet(nome[:MAXIMO_NOME_ABA - len(sufixo)] + sufixo)
+                aba.append(list(tabela.columns))
+                for lote in _lotes(tabela, inicio, min(inicio + por_aba, len(tabela))):
+                    for linha in _linhas_xlsx(lote):
+                        aba.append(linha)
+        planilha.save(caminho)
+        perfil.anotar(linhas=sum(map(len, tabelas.values())), bytes_saida=os.path.getsize(caminho))
+    return [caminho]
+
+
+def escrever_parquet(tabelas, diretorio):
+    """Grava um arquivo Parquet por tabela, um grupo de linhas por lote"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    pasta = os.path.join(diretorio, 'parquet')
+    os.makedirs(pasta, exist_ok=True)
+    caminhos = []
+    with perfil.etapa('exportação parquet', 'exportacao'):
+        for nome, tabela in tabelas.items():
+            caminho = os.path.join(pasta, f"{nome}.parquet")
+            esquema = pa.Schema.from_pandas(tabela, preserve_index=False)
+            with pq.ParquetWriter(caminho, esquema) as escritor:
+                for lote in _lotes(tabela):
+                    escritor.write_table(pa.Table.from_pandas(lote, schema=esquema, preserve_index=False))
+            caminhos.append(caminho)
+        perfil.anotar(bytes_saida=sum(map(os.path.getsize, caminhos)))
+    return caminhos
+
+
+def escrever_csv(tabelas, diretorio):
+    """Grava um CSV por tabela, em lotes de linhas"""
+    pasta = os.path.join(diretorio, 'csv')
+    os.makedirs(pasta, exist_ok=True)
+    caminhos = []
+    with perfil.etapa('exportação csv', 'exportacao'):
+        for nome, tabela in tabelas.items():
+            caminho = os.path.join(pasta, f"{nome}.csv")
+            tabela.to_csv(caminho, index=False, chunksize=TAMANHO_LOTE)
+            caminhos.append(caminho)
+        perfil.anotar(bytes_saida=sum(map(os.path.getsize, caminhos)))
+    return caminhos
+
+
+ESCRITORES = {'xlsx': escrever_xlsx, 'parquet': escrever_parquet, 'csv': escrever_csv}
+
+
+def exportar(tabelas, diretorio=DIRETORIO_EXPORTACAO, formatos=FORMATOS):
+    """Grava as tabelas em todos os formatos pedidos, um formato por thread, e devolve os arquivos"""
+    os.makedirs(diretorio, exist_ok=True)
+    if not tabelas or not formatos:
+        return []
+    with ThreadPoolExecutor(max_workers=len(formatos)) as executor:
+        futuros = [executor.submit(ESCRITORES[formato], tabelas, diretorio) for formato in formatos]
+        return [caminho for futuro in futuros for caminho in futuro.result()]
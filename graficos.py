@@ -0,0 +1,515 @@
+import colorsys
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import perfil
+from cache_graficos import buscar, chave_grafico, guardar
+from cubo import NOTAS, resumo_boxplot
+
+# ============================================================================
+# RENDERIZAÇÃO DOS GRÁFICOS
+# As análises só descrevem cada gráfico (arquivo, desenho e dados); aqui os
+# gráficos são desenhados e gravados, em paralelo, no backend Agg.
+# matplotlib e seaborn só são importados quando algum gráfico é desenhado.
+# ============================================================================
+
+plt = None
+sns = None
+
+# Heatmap do gráfico 4: anotado até este número de células; acima, só os grupos de maior volume
+LIMITE_CELULAS_ANOTADAS = 600
+MAXIMO_LINHAS_HEATMAP = 100
+MAXIMO_COLUNAS_HEATMAP = 60
+
+
+def configurar_estilo():
+    """Importa as bibliotecas de gráficos e aplica o estilo (em cada processo que desenha)"""
+    global plt, sns
+    if plt is None:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+    plt.style.use('seaborn-v0_8-darkgrid')
+    sns.set_palette("husl")
+    plt.rcParams['figure.figsize'] = (12, 6)
+    plt.rcParams['font.size'] = 10
+
+
+def especificar(arquivo, desenho, **dados):
+    """Monta a especificação de um gráfico: só dados simples, que podem ir para outro processo"""
+    return {'arquivo': arquivo, 'desenho': desenho, 'dados': dados}
+
+
+def renderizar_graficos(especificacoes, trabalhadores=None, usar_cache=True):
+    """Desenha e grava todos os gráficos, devolvendo (arquivo, reaproveitado) na ordem recebida
+
+    Com `usar_cache`, os gráficos cujos dados não mudaram desde uma execução
+    anterior são copiados do cache de renderizações em vez de redesenhados.
+    Com `trabalhadores` igual a 1 tudo é feito no processo atual; o padrão é
+    um processo por núcleo, limitado ao número de gráficos a desenhar.
+    """
+    chaves = {}
+    reaproveitados = set()
+    if usar_cache:
+        with perfil.etapa('cache dos gráficos', 'graficos'):
+            for posicao, especificacao in enumerate(especificacoes):
+                chave = chave_grafico(especificacao)
+                if buscar(chave, especificacao['arquivo']):
+                    reaproveitados.add(posicao)
+                else:
+                    chaves[posicao] = chave
+            perfil.anotar(reaproveitados=len(reaproveitados))
+
+    _renderizar_todos([especificacao for posicao, especificacao in enumerate(especificacoes)
+                       if posicao not in reaproveitados], trabalhadores)
+    for posicao, chave in chaves.items():
+        guardar(chave, especificacoes[posicao]['arquivo'])
+    return [(especificacao['arquivo'], posicao in reaproveitados)
+            for posicao, especificacao in enumerate(especificacoes)]
+
+
+def _renderizar_todos(especificacoes, trabalhadores):
+    """Desenha os gráficos no processo atual ou num conjunto de processos"""
+    if not especificacoes:
+        return []
+    if trabalhadores is None:
+        trabalhadores = os.cpu_count() or 1
+    trabalhadores = max(1, min(trabalhadores, len(especificacoes)))
+
+    if trabalhadores == 1:
+        configurar_estilo()
+        return [renderizar(especificacao) for especificacao in especificacoes]
+
+    # Com o perfil ativo, cada processo também mede suas etapas e as devolve junto com o arquivo
+    perfilar = perfil.ativo()
+    with ProcessPoolExecutor(max_workers=trabalhadores, initializer=_iniciar_processo,
+                             initargs=(perfilar,)) as executor:
+        if not perfilar:
+            return list(executor.map(renderizar, especificacoes))
+        arquivos = []
+        for arquivo, eventos in executor.map(_renderizar_com_perfil, especificacoes):
+            perfil.incorporar(eventos)
+            arquivos.append(arquivo)
+        return arquivos
+
+
+def renderizar(especificacao):
+    """Desenha um único gráfico a partir da especificação e grava o PNG"""
+    arquivo = especificacao['arquivo']
+    with perfil.etapa(f"desenho {especificacao['desenho']}", 'graficos'):
+        DESENHOS[especificacao['desenho']](**especificacao['dados'])
+    with perfil.etapa(f"savefig {arquivo}", 'graficos'):
+        plt.savefig(arquivo, dpi=300, bbox_inches='tight')
+        if perfil.ativo():
+            perfil.anotar(bytes_saida=os.path.getsize(arquivo))
+    plt.close()
+    return arquivo
+
+
+def _iniciar_processo(perfilar):
+    """Prepara um processo de desenho: estilo dos gráficos e, se pedido, o perfil"""
+    configurar_estilo()
+    if perfilar:
+        perfil.ativar()
+
+
+def _renderizar_com_perfil(especificacao):
+    """Renderiza no processo filho e devolve (arquivo, eventos medidos)"""
+    return renderizar(especificacao), perfil.coletar()
+
+
+def desenhar_resultados_individuais(resultados, histogramas, media_geral):
+    """Gráfico 1: média com desvio padrão e boxplot das notas por atendente"""
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
+
+    resultados_sorted = resultados.sort_values('Média', ascending=True)
+    ax1.barh(resultados_sorted.index, resultados_sorted['Média'],
+             xerr=resultados_sorted['Desvio Padrão'], capsize=5, alpha=0.7)
+    ax1.set_xlabel('Média CSAT')
+    ax1.set_title('Média CSAT por Atendente (com desvio padrão)')
+    ax1.axvline(media_geral, color='red', linestyle='--', label='Média Geral')
+    ax1.legend()
+    ax1.grid(axis='x', alpha=0.3)
+
+    # Distribuição de notas por atendente (boxplot a partir dos histogramas)
+    resumo = resumo_boxplot(histogramas.reindex(resultados_sorted.index))
+    cor = sns.desaturate(sns.color_palette()[0], 0.75)
+    cor_linha = (colorsys.rgb_to_hls(*cor)[1] * 0.6,) * 3
+    posicoes = np.arange(len(resumo))
+    ax2.bxp(resumo, positions=posicoes, widths=0.8, capwidths=0.4, orientation='horizontal',
+            patch_artist=True, manage_ticks=False,
+            boxprops={'facecolor': cor, 'edgecolor': cor_linha},
+            medianprops={'color': cor_linha, 'solid_capstyle': 'butt'},
+            whiskerprops={'color': cor_linha, 'solid_capstyle': 'butt'},
+            flierprops={'markeredgecolor': cor_linha}, capprops={'color': cor_linha})
+    ax2.set_yticks(posicoes, resultados_sorted.index)
+    ax2.yaxis.grid(False)
+    ax2.set_ylim(len(resumo) - 0.5, -0.5)
+    ax2.set_xlabel('CSAT')
+    ax2.set_ylabel('')
+    ax2.set_title('Distribuição de Notas por Atendente')
+    ax2.grid(axis='x', alpha=0.3)
+
+    plt.tight_layout()
+
+
+def desenhar_ranking_atendentes(ranking, media_geral):
+    """Gráfico 2: ranking por média e volume de avaliações por atendente"""
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
+
+    # Gráfico de barras horizontais
+    colors = plt.cm.RdYlGn(np.linspace(0.3, 0.9, len(ranking)))
+    ax1.barh(range(len(ranking)), ranking['Média CSAT'], color=colors)
+    ax1.set_yticks(range(len(ranking)))
+    ax1.set_yticklabels(ranking.index)
+    ax1.set_xlabel('Média CSAT')
+    ax1.set_title('Ranking de Atendentes por Média CSAT')
+    ax1.invert_yaxis()
+    ax1.axvline(media_geral, color='red', linestyle='--', label='Média Geral')
+    ax1.legend()
+    ax1.grid(axis='x', alpha=0.3)
+
+    # Adicionar valores nas barras
+    for i, (idx, row) in enumerate(ranking.iterrows()):
+        ax1.text(row['Média CSAT'] + 0.05, i, f"{row['Média CSAT']:.2f}",
+                va='center', fontsize=9)
+
+    # Gráfico de barras com total de avaliações
+    ax2.bar(range(len(ranking)), ranking['Total Avaliações'], color='skyblue', alpha=0.7)
+    ax2.set_xticks(range(len(ranking)))
+    ax2.set_xticklabels(ranking.index, rotation=45, ha='right')
+    ax2.set_ylabel('Total de Avaliações')
+    ax2.set_title('Volume de Avaliações por Atendente')
+    ax2.grid(axis='y', alpha=0.3)
+
+    # Adicionar valores nas barras
+    for i, (idx, row) in enumerate(ranking.iterrows()):
+        ax2.text(i, row['Total Avaliações'] + 1, f"{int(row['Total Avaliações'])}",
+                ha='center', fontsize=9)
+
+    plt.tight_layout()
+
+
+def desenhar_ranking_tipos_contato(ranking_tipos):
+    """Gráfico 3: média e volume por tipo de contato"""
+    fig, ax = plt.subplots(1, 1, figsize=(12, 6))
+
+    x = range(len(ranking_tipos))
+    width = 0.35
+
+    # Barras para média
+    bars1 = ax.bar([i - width/2 for i in x], ranking_tipos['Média CSAT'],
+                   width, label='Média CSAT', alpha=0.8, color='coral')
+
+    # Criar segundo eixo Y para total de avaliações
+    ax2 = ax.twinx()
+    bars2 = ax2.bar([i + width/2 for i in x], ranking_tipos['Total Avaliações'],
+                    width, label='Total Avaliações', alpha=0.8, color='steelblue')
+
+    ax.set_xlabel('Tipo de Contato')
+    ax.set_ylabel('Média CSAT', color='coral')
+    ax2.set_ylabel('Total de Avaliações', color='steelblue')
+    ax.set_title('Ranking de Tipos de Contato por Média CSAT e Volume')
+    ax.set_xticks(x)
+    ax.set_xticklabels(ranking_tipos.index, rotation=45, ha='right')
+    ax.tick_params(axis='y', labelcolor='coral')
+    ax2.tick_params(axis='y', labelcolor='steelblue')
+
+    # Adicionar valores nas barras
+    for i, (idx, row) in enumerate(ranking_tipos.iterrows()):
+        ax.text(i - width/2, row['Média CSAT'] + 0.05, f"{row['Média CSAT']:.2f}",
+               ha='center', fontsize=8)
+        ax2.text(i + width/2, row['Total Avaliações'] + 1, f"{int(row['Total Avaliações'])}",
+                ha='center', fontsize=8)
+
+    # Legendas
+    lines1, labels1 = ax.get_legend_handles_labels()
+    lines2, labels2 = ax2.get_legend_handles_labels()
+    ax.legend(lines1 + lines2, labels1 + labels2, loc='upper right')
+
+    ax.grid(axis='y', alpha=0.3)
+    plt.tight_layout()
+
+
+def matriz_heatmap(celulas, maximo_linhas=MAXIMO_LINHAS_HEATMAP, maximo_colunas=MAXIMO_COLUNAS_HEATMAP):
+    """Matriz atendente × tipo de contato limitada aos grupos de maior volume
+
+    Só as células dos `maximo_linhas` atendentes e `maximo_colunas` tipos com
+    mais avaliações viram matriz densa (float32), então a memória não cresce
+    com a cardinalidade. Linhas e colunas são ordenadas pela média das suas
+    células, o que aproxima grupos de desempenho parecido.
+    """
+    volumes = celulas['n']
+    linhas = volumes.groupby(level='attendant', sort=False).sum().nlargest(maximo_linhas, keep='first').index
+    colunas = volumes.groupby(level='contact type', sort=False).sum().nlargest(maximo_colunas, keep='first').index
+    mantidas = (celulas.index.get_level_values('attendant').isin(linhas)
+                & celulas.index.get_level_values('contact type').isin(colunas))
+    matriz = celulas.loc[mantidas, 'media'].astype(np.float32).unstack('contact type')
+    matriz = matriz.loc[matriz.mean(axis=1).sort_values(ascending=False, kind='stable').index]
+    return matriz[matriz.mean(axis=0).sort_values(ascending=False, kind='stable').index]
+
+
+def desenhar_heatmap_desempenho(celulas, media_geral):
+    """Gráfico 4: heatmap de desempenho por atendente e tipo de contato
+
+    Até LIMITE_CELULAS_ANOTADAS células, a matriz completa com a média
+    escrita em cada célula. Acima disso, só os atendentes e tipos de maior
+    volume, numa imagem rasterizada e sem anotações: o tempo de desenho e a
+    memória ficam limitados mesmo com centenas de atendentes e tipos.
+    """
+    total_linhas = celulas.index.get_level_values('attendant').nunique()
+    total_colunas = celulas.index.get_level_values('contact type').nunique()
+    fig, ax = plt.subplots(figsize=(14, 8))
+    if total_linhas * total_colunas <= LIMITE_CELULAS_ANOTADAS:
+        pivot_table = celulas['media'].unstack('contact type')
+        sns.heatmap(pivot_table, annot=True, fmt='.2f', cmap='RdYlGn',
+                    center=media_geral, ax=ax, cbar_kws={'label': 'Média CSAT'})
+        ax.set_title('Heatmap: Desempenho por Atendente e Tipo de Contato')
+    else:
+        matriz = matriz_heatmap(celulas)
+        # Escala centrada na média geral, como o `center` do seaborn
+        valores = matriz.to_numpy()
+        amplitude = max(np.nanmax(valores) - media_geral, media_geral - np.nanmin(valores))
+        imagem = ax.imshow(valores, aspect='auto', cmap='RdYlGn', vmin=media_geral - amplitude,
+                           vmax=media_geral + amplitude, interpolation='nearest', rasterized=True)
+        # Rótulos só quando cabem
+        for eixo, rotulos in [(ax.yaxis, matriz.index), (ax.xaxis, matriz.columns)]:
+            if len(rotulos) <= 40:
+                eixo.set_ticks(range(len(rotulos)))
+                eixo.set_ticklabels(rotulos, fontsize=8)
+            else:
+                eixo.set_ticks([])
+        ax.tick_params(axis='x', labelrotation=90)
+        ax.grid(False)
+        fig.colorbar(imagem, ax=ax, label='Média CSAT')
+        titulo = 'Heatmap: Desempenho por Atendente e Tipo de Contato'
+        if matriz.shape != (total_linhas, total_colunas):
+            titulo += (f'\n({len(matriz.index)} de {total_linhas} atendentes e {len(matriz.columns)} de '
+                       f'{total_colunas} tipos de contato com mais avaliações)')
+        ax.set_title(titulo)
+    ax.set_xlabel('Tipo de Contato')
+    ax.set_ylabel('Atendente')
+    plt.tight_layout()
+
+
+def desenhar_processos_problematicos(processos_problematicos, opportunity_stats):
+    """Gráfico 6: processos com mais notas baixas e média por opportunity"""
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
+
+    # Gráfico de barras para quantidade de notas baixas
+    ax1.barh(range(len(processos_problematicos)),
+            processos_problematicos['Qtd Notas Baixas'],
+            color='crimson', alpha=0.7)
+    ax1.set_yticks(range(len(processos_problematicos)))
+    ax1.set_yticklabels(processos_problematicos.index)
+    ax1.set_xlabel('Quantidade de Notas Baixas (CSAT < 3)')
+    ax1.set_title('Top 5 Processos com Mais Notas Baixas\n(Fluxo do Processo)')
+    ax1.invert_yaxis()
+    ax1.grid(axis='x', alpha=0.3)
+
+    # Adicionar valores
+    for i, (idx, row) in enumerate(processos_problematicos.iterrows()):
+        ax1.text(row['Qtd Notas Baixas'] + 0.2, i,
+                f"{int(row['Qtd Notas Baixas'])}", va='center')
+
+    # Análise por tipo de opportunity
+    colors_opp = ['crimson' if x < 3 else 'gold' if x < 4 else 'green'
+                 for x in opportunity_stats['Média']]
+
+    ax2.bar(range(len(opportunity_stats)), opportunity_stats['Média'],
+           color=colors_opp, alpha=0.7)
+    ax2.set_xticks(range(len(opportunity_stats)))
+    ax2.set_xticklabels(opportunity_stats.index, rotation=45, ha='right')
+    ax2.set_ylabel('Média CSAT')
+    ax2.set_title('Média CSAT por Tipo de Opportunity')
+    ax2.axhline(3, color='red', linestyle='--', alpha=0.5, label='Limite Nota Baixa')
+    ax2.axhline(4, color='orange', linestyle='--', alpha=0.5, label='Limite Nota Média')
+    ax2.legend()
+    ax2.grid(axis='y', alpha=0.3)
+
+    # Adicionar valores
+    for i, (idx, row) in enumerate(opportunity_stats.iterrows()):
+        ax2.text(i, row['Média'] + 0.1, f"{row['Média']:.2f}", ha='center')
+
+    plt.tight_layout()
+
+
+def desenhar_probabilidade_nota_baixa(df_prob, histograma, nota_min, nota_max, media, mediana):
+    """Gráfico 8: probabilidade de nota baixa e distribuição geral das notas"""
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
+
+    # Barras com a probabilidade ajustada; o losango marca a taxa observada e seu IC 95% de Wilson
+    ajustada = df_prob['Probabilidade Ajustada (%)']
+    colors_prob = ['darkred' if x > 30 else 'orange' if x > 20 else 'yellowgreen' for x in ajustada]
+
+    ax1.barh(range(len(df_prob)), ajustada, color=colors_prob, alpha=0.7)
+    observada = df_prob['Probabilidade (%)']
+    ax1.errorbar(observada, range(len(df_prob)),
+                 xerr=[observada - df_prob['IC 95% Inferior (%)'], df_prob['IC 95% Superior (%)'] - observada],
+                 fmt='D', color='black', markersize=4, capsize=3, linewidth=1, label='Observada (IC 95%)')
+    ax1.set_yticks(range(len(df_prob)))
+    ax1.set_yticklabels(df_prob['Atendente'])
+    ax1.set_xlabel('Probabilidade de Nota Baixa (%)')
+    ax1.set_title('Probabilidade Ajustada de Nota Baixa (CSAT < 3) por Atendente')
+    ax1.axvline(20, color='orange', linestyle='--', alpha=0.5, label='Limite Atenção (20%)')
+    ax1.axvline(30, color='red', linestyle='--', alpha=0.5, label='Limite Crítico (30%)')
+    ax1.legend()
+    ax1.grid(axis='x', alpha=0.3)
+    ax1.invert_yaxis()
+
+    # Adicionar valores
+    for i, valor in enumerate(ajustada):
+        ax1.text(df_prob['IC 95% Superior (%)'].iloc[i] + 1, i, f"{valor}%", va='center', fontsize=9)
+
+    # Distribuição geral de notas (histograma já consolidado no cubo)
+    ax2.hist(NOTAS, bins=5, range=(nota_min, nota_max), weights=histograma,
+             edgecolor='black', alpha=0.7, color='skyblue')
+    ax2.axvline(media, color='red', linestyle='--',
+               linewidth=2, label=f'Média: {media:.2f}')
+    ax2.axvline(mediana, color='green', linestyle='--',
+               linewidth=2, label=f'Mediana: {mediana:.2f}')
+    ax2.set_xlabel('CSAT')
+    ax2.set_ylabel('Frequência')
+    ax2.set_title('Distribuição Geral de Notas CSAT')
+    ax2.legend()
+    ax2.grid(axis='y', alpha=0.3)
+
+    plt.tight_layout()
+
+
+def desenhar_dashboard_recomendacoes(categoria_counts, ranking_atendentes, media_geral,
+                                     opp_data, vol_data, prob_notas_baixas):
+    """Gráfico 9: dashboard executivo com as recomendações"""
+    fig = plt.figure(figsize=(16, 10))
+    gs = fig.add_gridspec(3, 2, hspace=0.3, wspace=0.3)
+
+    # 1. Pizza - Distribuição de notas
+    ax1 = fig.add_subplot(gs[0, 0])
+    colors_pie = ['crimson', 'gold', 'green']
+    ax1.pie(categoria_counts, labels=categoria_counts.index, autopct='%1.1f%%',
+           colors=colors_pie, startangle=90)
+    ax1.set_title('Distribuição de Notas por Categoria')
+
+    # 2. Comparação Top 3 vs Bottom 3
+    ax2 = fig.add_subplot(gs[0, 1])
+    top_3 = ranking_atendentes.head(3)
+    bottom_3 = ranking_atendentes.tail(3)
+    comparison = pd.concat([top_3, bottom_3])
+    colors_comp = ['green']*3 + ['red']*3
+    ax2.barh(range(len(comparison)), comparison['Média CSAT'], color=colors_comp, alpha=0.7)
+    ax2.set_yticks(range(len(comparison)))
+    ax2.set_yticklabels(comparison.index)
+    ax2.set_xlabel('Média CSAT')
+    ax2.set_title('Top 3 vs Bottom 3 Atendentes')
+    ax2.axvline(media_geral, color='black', linestyle='--', alpha=0.5)
+    ax2.invert_yaxis()
+    ax2.grid(axis='x', alpha=0.3)
+
+    # 3. Notas por Opportunity
+    ax3 = fig.add_subplot(gs[1, 0])
+    colors_opp = ['red' if x < 3 else 'gold' if x < 4 else 'green' for x in opp_data]
+    ax3.barh(range(len(opp_data)), opp_data, color=colors_opp, alpha=0.7)
+    ax3.set_yticks(range(len(opp_data)))
+    ax3.set_yticklabels(opp_data.index)
+    ax3.set_xlabel('Média CSAT')
+    ax3.set_title('Média CSAT por Tipo de Opportunity')
+    ax3.invert_yaxis()
+    ax3.grid(axis='x', alpha=0.3)
+
+    # 4. Volume de avaliações por atendente
+    ax4 = fig.add_subplot(gs[1, 1])
+    ax4.barh(range(len(vol_data)), vol_data, color='steelblue', alpha=0.7)
+    ax4.set_yticks(range(len(vol_data)))
+    ax4.set_yticklabels(vol_data.index)
+    ax4.set_xlabel('Quantidade de Avaliações')
+    ax4.set_title('Volume de Avaliações por Atendente')
+    ax4.grid(axis='x', alpha=0.3)
+
+    # 5. Tendência de probabilidade de nota baixa
+    ax5 = fig.add_subplot(gs[2, :])
+    prob_sorted = prob_notas_baixas.sort_values('Probabilidade Ajustada (%)', kind='stable')
+    x_pos = range(len(prob_sorted))
+    bars = ax5.bar(x_pos, prob_sorted['Probabilidade Ajustada (%)'], alpha=0.7)
+
+    # Colorir barras baseado no nível de risco
+    for i, (idx, row) in enumerate(prob_sorted.iterrows()):
+        if row['Probabilidade Ajustada (%)'] > 30:
+            bars[i].set_color('darkred')
+        elif row['Probabilidade Ajustada (%)'] > 20:
+            bars[i].set_color('orange')
+        else:
+            bars[i].set_color('green')
+
+    ax5.set_xticks(x_pos)
+    ax5.set_xticklabels(prob_sorted['Atendente'], rotation=45, ha='right')
+    ax5.set_ylabel('Probabilidade Ajustada (%)')
+    ax5.set_title('Risco de Nota Baixa por Atendente (Verde: Baixo | Laranja: Médio | Vermelho: Alto)')
+    ax5.axhline(20, color='orange', linestyle='--', alpha=0.5, linewidth=1)
+    ax5.axhline(30, color='red', linestyle='--', alpha=0.5, linewidth=1)
+    ax5.grid(axis='y', alpha=0.3)
+
+    # Adicionar valores nas barras
+    for i, (idx, row) in enumerate(prob_sorted.iterrows()):
+        ax5.text(i, row['Probabilidade Ajustada (%)'] + 1, f"{row['Probabilidade Ajustada (%)']}%",
+                ha='center', fontsize=8)
+
+    plt.suptitle('Dashboard Executivo - Análise CSAT e Recomendações',
+                fontsize=16, fontweight='bold', y=0.995)
+
+
+def desenhar_tendencias(media_geral, taxa_geral, atendentes, tipos_contato):
+    """Gráfico 10: evolução geral e mapas das médias móveis semanais por grupo
+
+    Os mapas usam uma imagem (uma célula por semana e grupo), que continua
+    leve com centenas de atendentes, em vez de uma linha por atendente.
+    """
+    fig = plt.figure(figsize=(16, 12))
+    grade = fig.add_gridspec(2, 2, height_ratios=[1, 2])
+
+    ax1 = fig.add_subplot(grade[0, :])
+    ax1.plot(media_geral.index, media_geral.to_numpy(), color='steelblue', linewidth=2, label='Média móvel')
+    ax1.set_ylabel('Média CSAT')
+    ax1.set_title('Evolução Geral (média móvel semanal)')
+    ax1_taxa = ax1.twinx()
+    ax1_taxa.plot(taxa_geral.index, taxa_geral.to_numpy(), color='coral', linewidth=1.5,
+                  linestyle='--', label='Notas baixas (%)')
+    ax1_taxa.set_ylabel('Notas Baixas (%)')
+    ax1_taxa.grid(False)
+    linhas = ax1.get_lines() + ax1_taxa.get_lines()
+    ax1.legend(linhas, [linha.get_label() for linha in linhas], loc='upper left')
+
+    for posicao, (mapa, titulo) in enumerate([(atendentes, 'Atendentes'), (tipos_contato, 'Tipos de Contato')]):
+        ax = fig.add_subplot(grade[1, posicao])
+        imagem = ax.imshow(mapa.T.to_numpy(dtype=float), aspect='auto', cmap='RdYlGn', vmin=1, vmax=5,
+                           interpolation='nearest', rasterized=True)
+        # Rótulos dos grupos só quando cabem; as semanas são marcadas por mês
+        if len(mapa.columns) <= 40:
+            ax.set_yticks(range(len(mapa.columns)))
+            ax.set_yticklabels(mapa.columns, fontsize=8)
+        else:
+            ax.set_yticks([])
+            ax.set_ylabel(f'{len(mapa.columns)} grupos (piora recente no topo)')
+        marcas = np.linspace(0, len(mapa.index) - 1, min(8, len(mapa.index))).astype(int)
+        ax.set_xticks(marcas)
+        ax.set_xticklabels([f'{mapa.index[i]:%m/%Y}' for i in marcas], rotation=45, ha='right')
+        ax.set_title(f'Média Móvel Semanal - {titulo}')
+        ax.grid(False)
+        fig.colorbar(imagem, ax=ax, label='Média CSAT')
+
+    plt.tight_layout()
+
+
+DESENHOS = {
+    'resultados_individuais': desenhar_resultados_individuais,
+    'ranking_atendentes': desenhar_ranking_atendentes,
+    'ranking_tipos_contato': desenhar_ranking_tipos_contato,
+    'heatmap_desempenho': desenhar_heatmap_desempenho,
+    'processos_problematicos': desenhar_processos_problematicos,
+    'probabilidade_nota_baixa': desenhar_probabilidade_nota_baixa,
+    'dashboard_recomendacoes': desenhar_dashboard_recomendacoes,
+    'tendencias': desenhar_tendencias,
+}
@@ -0,0 +1,86 @@
+import json
+import os
+
+import pandas as pd
+
+from cache import DIRETORIO_CACHE, nome_cache
+
+# ============================================================================
+# MODO INCREMENTAL
+# O cubo de estatísticas suficientes é salvo em disco junto com a marca
+# d'água (quantas linhas já foram lidas). Como os dados só crescem, a
+# próxima execução lê apenas as linhas novas e as junta ao cubo salvo.
+# ============================================================================
+
+VERSAO_ESTADO = 2
+
+
+def caminhos_estado(caminho, diretorio=DIRETORIO_CACHE):
+    """Arquivos onde ficam o cubo salvo, seus metadados e o cubo temporal"""
+    nome = nome_cache(caminho)
+    return (os.path.join(diretorio, f'{nome}.cubo.parquet'),
+            os.path.join(diretorio, f'{nome}.cubo.json'),
+            os.path.join(diretorio, f'{nome}.temporal.parquet'))
+
+
+def carregar_estado(caminho, diretorio=DIRETORIO_CACHE):
+    """Devolve (cubo, cubo temporal, linhas já lidas) da última execução, ou (None, None, 0)"""
+    arquivo_cubo, arquivo_metadados, arquivo_temporal = caminhos_estado(caminho, diretorio)
+    try:
+        with open(arquivo_metadados, encoding='utf-8') as arquivo:
+            metadados = json.load(arquivo)
+        if metadados.get('versao') != VERSAO_ESTADO:
+            return None, None, 0
+        cubo = pd.read_parquet(arquivo_cubo)
+        temporal = pd.read_parquet(arquivo_temporal) if metadados['temporal'] else None
+    except (OSError, ValueError, KeyError):
+        return None, None, 0
+    return cubo, temporal, metadados['linhas']
+
+
+def salvar_estado(caminho, cubo, linhas, temporal=None, diretorio=DIRETORIO_CACHE):
+    """Grava os cubos e a marca d'água para a próxima execução incremental"""
+    arquivo_cubo, arquivo_metadados, arquivo_temporal = caminhos_estado(caminho, diretorio)
+    os.makedirs(diretorio, exist_ok=True)
+
+    # Arquivos temporários evitam um estado pela metade se a execução for interrompida
+    cubo.to_parquet(f'{arquivo_cubo}.tmp')
+    os.replace(f'{arquivo_cubo}.tmp', arquivo_cubo)
+    if temporal is not None:
+        temporal.to_parquet(f'{arquivo_temporal}.tmp')
+        os.replace(f'{arquivo_temporal}.tmp', arquivo_temporal)
+    with open(f'{arquivo_metadados}.tmp', 'w', encoding='utf-8') as arquivo:
+        estado = os.stat(caminho)
+        json.dump({'versao': VERSAO_ESTADO, 'origem': os.path.abspath(caminho),
+                   'tamanho': estado.st_size, 'mtime_ns': estado.st_mtime_ns, 'linhas': linhas,
+                   'temporal': temporal is not None}, arquivo, indent=2)
+    os.replace(f'{arquivo_metadados}.tmp', arquivo_metadados)
+
+
+def situacao_fonte(caminho, diretorio=DIRETORIO_CACHE):
+    """Como o arquivo está em relação à última execução: 'inalterada', 'encolheu' ou 'alterada'
+
+    Mesmo tamanho e data de modificação dispensam qualquer leitura. Um
+    arquivo menor indica que não recebeu só acréscimos; serve para o CSV, cujo
+    número de linhas só se sabe lendo tudo (numa planilha, que é compactada, o
+    tamanho não acompanha as linhas e a contagem vem do cache colunar).
+    """
+    arquivo_metadados = caminhos_estado(caminho, diretorio)[1]
+    try:
+        with open(arquivo_metadados, encoding='utf-8') as arquivo:
+            metadados = json.load(arquivo)
+    except (OSError, ValueError):
+        return 'alterada'
+    estado = os.stat(caminho)
+    if metadados.get('tamanho') == estado.st_size and metadados.get('mtime_ns') == estado.st_mtime_ns:
+        return 'inalterada'
+    if metadados.get('tamanho') is not None and estado.st_size < metadados['tamanho']:
+        return 'encolheu'
+    return 'alterada'
+
+
+def descartar_estado(caminho, diretorio=DIRETORIO_CACHE):
+    """Remove o estado salvo, forçando a próxima execução a recalcular tudo"""
+    for arquivo in caminhos_estado(caminho, diretorio):
+        if os.path.exists(arquivo):
+            os.remove(arquivo)
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+
+from cubo import NOTAS
+
+# ============================================================================
+# ÍNDICES POR VALOR DAS DIMENSÕES
+# Para cada valor de cada dimensão guarda, uma única vez, as posições
+# ordenadas das linhas em que ele aparece; as notas presentes em cada linha
+# ficam num mapa de bits (um bit por nota). Um filtro conjuntivo (ex.: notas
+# baixas E uma opportunity E um atendente) é resolvido cruzando as listas e
+# testando os bits só das linhas que sobraram, sem varrer as colunas nem
+# montar DataFrames intermediários: o custo acompanha o tamanho do
+# resultado, não o da tabela.
+# ============================================================================
+
+
+def _tipo_posicoes(linhas):
+    """Menor inteiro que guarda as posições (int32 até 2³¹ linhas, para economizar memória)"""
+    return np.int32 if linhas < 2 ** 31 else np.int64
+
+
+def _agrupar_posicoes(codigos, quantidade, tipo):
+    """Posições ordenadas das linhas de cada código (0 .. quantidade-1), de uma só ordenação"""
+    ordem = np.argsort(codigos, kind='stable').astype(tipo)
+    limites = np.r_[0, np.cumsum(np.bincount(codigos, minlength=quantidade))]
+    return [ordem[inicio:fim] for inicio, fim in zip(limites[:-1], limites[1:])]
+
+
+def _uniao(listas, linhas):
+    """União de listas ordenadas de posições
+
+    Listas pequenas são juntadas e ordenadas; quando somam uma fração grande
+    das linhas, marcar as posições num vetor booleano sai mais barato.
+    """
+    if len(listas) == 1:
+        return listas[0]
+    tipo = _tipo_posicoes(linhas)
+    if sum(map(len, listas)) < linhas // 64:
+        return np.unique(np.concatenate(listas)).astype(tipo)
+    marcadas = np.zeros(linhas, dtype=bool)
+    for lista in listas:
+        marcadas[lista] = True
+    return np.flatnonzero(marcadas).astype(tipo)
+
+
+def _intersecao(listas):
+    """Interseção de listas ordenadas de posições, partindo da menor
+
+    Cada posição da lista menor é procurada (busca binária) nas demais, o que
+    custa proporcionalmente à menor lista.
+    """
+    listas = sorted(listas, key=len)
+    resultado = listas[0]
+    for outra in listas[1:]:
+        if len(resultado) == 0:
+            break
+        encontradas = np.searchsorted(outra, resultado)
+        encontradas[encontradas == len(outra)] = 0
+        resultado = resultado[outra[encontradas] == resultado]
+    return resultado
+
+
+class IndiceDimensoes:
+    """Posições das linhas de cada valor das dimensões e notas de cada linha, para filtros conjuntivos
+
+    `tabela` é um cubo (dimensões no MultiIndex, histograma `nota_N` nas
+    colunas); as posições são as das linhas da tabela na ordem em que ela
+    está. O bit da nota N de uma linha fica ligado se a linha tiver ao menos
+    uma avaliação com essa nota.
+    """
+
+    def __init__(self, tabela, dimensoes):
+        self.linhas = len(tabela)
+        tipo = _tipo_posicoes(self.linhas)
+        self.valores = {}
+        for dimensao in dimensoes:
+            codigos, valores = pd.factorize(tabela.index.get_level_values(dimensao))
+            presentes = codigos >= 0
+            posicoes = _agrupar_posicoes(codigos[presentes], len(valores), tipo)
+            if not presentes.all():
+                posicoes = [np.flatnonzero(presentes).astype(tipo)[lista] for lista in posicoes]
+            self.valores[dimensao] = dict(zip(valores.tolist(), posicoes))
+        self.notas = np.zeros(self.linhas, dtype=np.uint8)
+        for nota in NOTAS:
+            self.notas |= (tabela[f'nota_{nota}'].to_numpy() > 0).astype(np.uint8) << np.uint8(nota)
+
+    def selecionar(self, filtros=None, notas=None, inicio=0, fim=None):
+        """Posições ordenadas, dentro de [início, fim), das linhas que atendem a todos os filtros
+
+        `filtros` é {dimensão: valores aceitos} (OU entre os valores de uma
+        dimensão, E entre dimensões) e `notas` as notas aceitas. Sem filtro
+        nenhum devolve None: a faixa inteira serve, sem listar posições.
+        """
+        fim = self.linhas if fim is None else fim
+        listas = []
+        for dimensao, valores in (filtros or {}).items():
+            posicoes = self.valores[dimensao]
+            escolhidas = [posicoes[valor] for valor in valores if valor in posicoes]
+            listas.append(_uniao(escolhidas, self.linhas) if escolhidas
+                          else np.empty(0, dtype=_tipo_posicoes(self.linhas)))
+        if not listas and notas is None:
+            return None
+
+        if listas:
+            # Só a faixa [início, fim) de cada lista (busca binária nas posições ordenadas)
+            listas = [lista[np.searchsorted(lista, inicio):np.searchsorted(lista, fim)] for lista in listas]
+            posicoes = _intersecao(listas)
+        if notas is None:
+            return posicoes
+        bits = np.uint8(sum(1 << nota for nota in set(notas) & set(NOTAS)))
+        if listas:
+            return posicoes[(self.notas[posicoes] & bits) != 0]
+        return np.flatnonzero((self.notas[inicio:fim] & bits) != 0).astype(_tipo_posicoes(self.linhas)) + inicio
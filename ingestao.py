@@ -0,0 +1,105 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import perfil
+from cache import preparar_cache
+from carregamento import TAMANHO_BLOCO, ler_blocos
+from cubo import construir_cubo, combinar_cubos
+from esquema import normalizar_esquema, uso_memoria
+from tendencias import construir_cubo_temporal, combinar_cubos_temporais
+
+# ============================================================================
+# INGESTÃO DE UM OU VÁRIOS ARQUIVOS
+# Cada arquivo é reduzido a um cubo parcial (em um processo próprio quando
+# há vários); só os cubos, pequenos, voltam para o processo principal.
+# ============================================================================
+
+# Cubos parciais acumulados antes de uma consolidação: juntar um bloco de cada
+# vez reagruparia o cubo inteiro a cada bloco (custo quadrático no histórico)
+BLOCOS_POR_COMBINACAO = 32
+
+
+def reduzir_fonte(fonte, tamanho_bloco=TAMANHO_BLOCO, inicio=0, cubo=None, temporal=None,
+                  mostrar_memoria=False):
+    """Lê a fonte em blocos e acumula o cubo de agregação (e o temporal, se houver datas)
+
+    `inicio` pula as linhas já lidas e `cubo`/`temporal` são os cubos aos
+    quais elas pertencem (modo incremental). Devolve um dicionário com os
+    cubos, as linhas lidas, as primeiras linhas, as colunas e o uso de memória.
+    """
+    total = inicio
+    primeiras_linhas = None
+    colunas = []
+    memoria_antes = memoria_depois = 0
+    cubos = [] if cubo is None else [cubo]
+    temporais = [temporal]
+
+    # Cada bloco vira um cubo parcial; a memória fica limitada ao tamanho do bloco
+    for bloco in perfil.medir_iteracao(ler_blocos(fonte, tamanho_bloco, inicio=inicio), 'leitura do bloco'):
+        with perfil.etapa('cubo do bloco'):
+            perfil.anotar(linhas=len(bloco))
+            tipado = normalizar_esquema(bloco)
+            if mostrar_memoria:
+                memoria_antes = memoria_antes + uso_memoria(bloco)
+                memoria_depois = memoria_depois + uso_memoria(tipado)
+            cubos.append(construir_cubo(tipado, inicio=total))
+            temporais.append(construir_cubo_temporal(tipado))
+            # Consolida de tempos em tempos, para a lista de parciais não crescer sem limite
+            if len(cubos) >= BLOCOS_POR_COMBINACAO:
+                cubos = [combinar_cubos(cubos)]
+                temporais = [combinar_cubos_temporais(temporais)]
+        if primeiras_linhas is None:
+            primeiras_linhas = bloco.head()
+            colunas = list(bloco.columns)
+        total += len(bloco)
+
+    cubo = combinar_cubos(cubos) if len(cubos) > 1 else (cubos[0] if cubos else None)
+    return {'cubo': cubo, 'temporal': combinar_cubos_temporais(temporais), 'linhas': total - inicio,
+            'primeiras_linhas': primeiras_linhas, 'colunas': colunas,
+            'memoria_antes': memoria_antes, 'memoria_depois': memoria_depois}
+
+
+def reduzir_arquivo(caminho, tamanho_bloco=TAMANHO_BLOCO, usar_cache=True, mostrar_memoria=False):
+    """Reduz um arquivo inteiro a um cubo parcial (executado em um processo de leitura)"""
+    fonte = preparar_cache(caminho, tamanho_bloco) if usar_cache else caminho
+    return reduzir_fonte(fonte, tamanho_bloco, mostrar_memoria=mostrar_memoria)
+
+
+def reduzir_arquivos(arquivos, tamanho_bloco=TAMANHO_BLOCO, usar_cache=True, mostrar_memoria=False,
+                     trabalhadores=None):
+    """Reduz vários arquivos em paralelo e junta os cubos parciais
+
+    Os arquivos são tratados como um único conjunto de dados, na ordem da
+    lista: as posições de primeira ocorrência de cada cubo são deslocadas
+    pelo total de linhas dos arquivos anteriores.
+    """
+    if trabalhadores is None:
+        trabalhadores = os.cpu_count() or 1
+    trabalhadores = max(1, min(trabalhadores, len(arquivos)))
+    parametros = ([tamanho_bloco] * len(arquivos), [usar_cache] * len(arquivos),
+                  [mostrar_memoria] * len(arquivos))
+
+    if trabalhadores == 1:
+        parciais = list(map(reduzir_arquivo, arquivos, *parametros))
+    else:
+        with ProcessPoolExecutor(max_workers=trabalhadores) as executor:
+            parciais = list(executor.map(reduzir_arquivo, arquivos, *parametros))
+
+    cubos = []
+    deslocamento = 0
+    for parcial in parciais:
+        if parcial['cubo'] is not None:
+            parcial['cubo']['primeira_ocorrencia'] += deslocamento
+            cubos.append(parcial['cubo'])
+        deslocamento += parcial['linhas']
+
+    com_dados = [parcial for parcial in parciais if parcial['primeiras_linhas'] is not None]
+    return {
+        'cubo': combinar_cubos(cubos) if cubos else None,
+        'temporal': combinar_cubos_temporais([parcial['temporal'] for parcial in parciais]),
+        'linhas': deslocamento,
+        'primeiras_linhas': com_dados[0]['primeiras_linhas'] if com_dados else None,
+        'colunas': com_dados[0]['colunas'] if com_dados else [],
+        'memoria_antes': sum(parcial['memoria_antes'] for parcial in parciais),
+        'memoria_depois': sum(parcial['memoria_depois'] for parcial in parciais),
+    }
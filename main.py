@@ -1,502 +1,348 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
+import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
-# Configurações de visualização
-plt.style.use('seaborn-v0_8-darkgrid')
-sns.set_palette("husl")
-plt.rcParams['figure.figsize'] = (12, 6)
-plt.rcParams['font.size'] = 10
+import api
+import perfil
+from cache import preparar_cache
+from carregamento import SALTO_BARATO, TAMANHO_BLOCO, listar_arquivos, contar_linhas
+from consultas_sql import BACKENDS, reduzir_sql
+from cubo import COLUNAS_HISTOGRAMA, cubos_iguais
+from esquema import COLUNA_DATA, relatorio_memoria
+from exportacao import DIRETORIO_EXPORTACAO, FORMATOS, exportar, tabelas_resultados
+from graficos import especificar, renderizar_graficos
+from incremental import carregar_estado, salvar_estado, descartar_estado, situacao_fonte
+from ingestao import reduzir_fonte, reduzir_arquivos
+from reamostragem import REPLICAS
+from relatorios import DIRETORIO_ATENDENTES, escrever_relatorios_atendentes
+from segmentos import SEGMENTACOES, DIRETORIO_RELATORIOS, analisar_segmentos, escrever_relatorios
+from tarefas import executar_grafo
+from tendencias import FREQUENCIAS
 
 # ============================================================================
 # ANÁLISE DE DADOS - SATISFAÇÃO DO CLIENTE (CSAT)
 # Projeto educacional: Probabilidade, Estatística e Análise de Dados
 # ============================================================================
 
-def carregar_dados():
-    """Carrega a planilha de análise de suporte"""
-    df = pd.read_excel('analise_suporte.xlsx')
+@perfil.perfilado('carregar_dados')
+def carregar_dados(caminho='analise_suporte.xlsx', tamanho_bloco=TAMANHO_BLOCO, usar_cache=True,
+                   mostrar_memoria=False, incremental=False, trabalhadores=None, com_temporal=False,
+                   backend='pandas'):
+    """Carrega os dados em blocos e acumula o cubo de agregação
+    
+    `caminho` pode ser um arquivo, uma pasta ou um padrão glob (ex.:
+    'dados/*.xlsx'); vários arquivos são lidos em paralelo, um processo por
+    arquivo. No modo incremental parte do cubo salvo na execução anterior e
+    lê só as linhas novas (os dados de CSAT só crescem). Com `com_temporal`
+    devolve (cubo, cubo temporal); o temporal é None se não houver coluna de data.
+    Com `backend='sqlite'` os cubos são calculados por consultas SQL sobre
+    um banco em disco (consultas_sql.py), em vez de pelo pandas.
+    """
+    arquivos = listar_arquivos(caminho)
+    if backend == 'sqlite':
+        if incremental:
+            raise ValueError("O modo incremental só está disponível no backend pandas")
+        reducao = reduzir_sql(arquivos, tamanho_bloco, usar_cache, mostrar_memoria, trabalhadores)
+        cubo, temporal, total, ja_lidos = reducao['cubo'], reducao['temporal'], reducao['linhas'], 0
+    elif len(arquivos) > 1:
+        if incremental:
+            raise ValueError("O modo incremental aceita um único arquivo de dados")
+        reducao = reduzir_arquivos(arquivos, tamanho_bloco, usar_cache, mostrar_memoria, trabalhadores)
+        cubo, temporal, total, ja_lidos = reducao['cubo'], reducao['temporal'], reducao['linhas'], 0
+    else:
+        caminho = arquivos[0]
+        cubo, temporal, ja_lidos = carregar_estado(caminho) if incremental else (None, None, 0)
+        situacao = situacao_fonte(caminho) if cubo is not None else None
+        if cubo is not None and situacao != 'inalterada':
+            if os.path.splitext(caminho)[1].lower() in SALTO_BARATO:
+                # Só as linhas novas, lidas direto da fonte: reconverter o arquivo todo para
+                # o cache custaria mais que pular as já lidas
+                fonte = caminho
+            else:
+                # A planilha mudou: reconverte para o cache colunar e lê dele a partir da marca d'água
+                with perfil.etapa('preparar_cache'):
+                    fonte = preparar_cache(caminho, tamanho_bloco) if usar_cache else caminho
+            linhas_fonte = contar_linhas(fonte)
+            encolheu = linhas_fonte < ja_lidos if linhas_fonte is not None else situacao == 'encolheu'
+            if encolheu:
+                # A fonte encolheu: não é mais um acréscimo, então recalcula do zero
+                print("⚠️ Os dados têm menos linhas que o estado salvo; recalculando tudo")
+                cubo, temporal, ja_lidos = None, None, 0
+        if situacao == 'inalterada':
+            # Mesmo tamanho e data de modificação: nada novo, nem abre o arquivo
+            reducao = {'cubo': cubo, 'temporal': temporal, 'linhas': 0, 'primeiras_linhas': None,
+                       'colunas': [], 'memoria_antes': 0, 'memoria_depois': 0}
+        else:
+            if cubo is None:
+                with perfil.etapa('preparar_cache'):
+                    fonte = preparar_cache(caminho, tamanho_bloco) if usar_cache else caminho
+            reducao = reduzir_fonte(fonte, tamanho_bloco, inicio=ja_lidos, cubo=cubo, temporal=temporal,
+                                    mostrar_memoria=mostrar_memoria)
+        cubo, temporal, total = reducao['cubo'], reducao['temporal'], ja_lidos + reducao['linhas']
+    primeiras_linhas = reducao['primeiras_linhas']
+    colunas = reducao['colunas']
+    memoria_antes, memoria_depois = reducao['memoria_antes'], reducao['memoria_depois']
+    
+    perfil.anotar(linhas=total - ja_lidos)
     print("=" * 80)
     print("DADOS CARREGADOS COM SUCESSO")
     print("=" * 80)
-    print(f"Total de registros: {len(df)}")
-    print(f"Colunas: {list(df.columns)}")
-    print(f"\nPrimeiras linhas:")
-    print(df.head())
+    if len(arquivos) > 1:
+        print(f"Arquivos lidos: {len(arquivos)}")
+    print(f"Total de registros: {total}")
+    if incremental:
+        print(f"Registros novos desde a última execução: {total - ja_lidos}")
+    if primeiras_linhas is not None:
+        print(f"Colunas: {colunas}")
+        print(f"\nPrimeiras linhas:")
+        print(primeiras_linhas)
+    print("\n" * 2)
+    
+    if mostrar_memoria:
+        print("=" * 80)
+        print("USO DE MEMÓRIA: DADOS LIDOS x ESQUEMA COMPACTO")
+        print("=" * 80)
+        print(relatorio_memoria(memoria_antes, memoria_depois))
+        print("\n" * 2)
+    
+    if incremental:
+        salvar_estado(caminho, cubo, total, temporal)
+    if com_temporal:
+        return cubo, temporal
+    return cubo
+
+
+def verificar_incremental(cubo_incremental, caminho='analise_suporte.xlsx', tamanho_bloco=TAMANHO_BLOCO):
+    """Confere se o cubo incremental é idêntico a um recálculo completo dos dados"""
+    cubo_completo = carregar_dados(caminho, tamanho_bloco)
+    
+    print("=" * 80)
+    print("VERIFICAÇÃO DO MODO INCREMENTAL")
+    print("=" * 80)
+    if cubos_iguais(cubo_incremental, cubo_completo):
+        print("✓ Cubo incremental idêntico ao recálculo completo")
+        print("\n" * 2)
+        return cubo_incremental
+    
+    # Estado divergente: descarta e segue com o recálculo completo
+    print("✗ Cubo incremental diverge do recálculo completo; estado salvo descartado")
+    descartar_estado(caminho)
     print("\n" * 2)
-    return df
+    return cubo_completo
 
 
-def analise_1_resultados_individuais(df):
+def avaliacoes(cubo):
+    """Avaliações de origem resumidas no cubo (não o número de células), para o perfil"""
+    return 0 if cubo is None else cubo['n'].sum()
+
+
+@perfil.perfilado('analise_1_resultados_individuais', linhas=avaliacoes)
+def analise_1_resultados_individuais(cubo):
     """1 - Avaliar os resultados individuais de cada atendente"""
     print("=" * 80)
     print("1. RESULTADOS INDIVIDUAIS DE CADA ATENDENTE")
     print("=" * 80)
     
-    resultados = df.groupby('attendant').agg({
-        'csat': ['mean', 'median', 'std', 'count', 'min', 'max', 'sum']
-    }).round(2)
+    resultado = api.resultados_individuais(cubo)
     
-    resultados.columns = ['Média', 'Mediana', 'Desvio Padrão', 'Total Avaliações', 'Nota Mín', 'Nota Máx', 'Soma']
-    
-    print(resultados)
+    print(resultado.tabela)
     print("\n" * 2)
     
-    # Gráfico 1: Média CSAT por atendente com barras de erro (desvio padrão)
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
-    
-    resultados_sorted = resultados.sort_values('Média', ascending=True)
-    ax1.barh(resultados_sorted.index, resultados_sorted['Média'], 
-             xerr=resultados_sorted['Desvio Padrão'], capsize=5, alpha=0.7)
-    ax1.set_xlabel('Média CSAT')
-    ax1.set_title('Média CSAT por Atendente (com desvio padrão)')
-    ax1.axvline(df['csat'].mean(), color='red', linestyle='--', label='Média Geral')
-    ax1.legend()
-    ax1.grid(axis='x', alpha=0.3)
-    
-    # Gráfico 2: Distribuição de notas por atendente (boxplot)
-    df_sorted_attendants = df.copy()
-    df_sorted_attendants['attendant'] = pd.Categorical(
-        df_sorted_attendants['attendant'],
-        categories=resultados_sorted.index,
-        ordered=True
-    )
-    df_sorted_attendants = df_sorted_attendants.sort_values('attendant')
-    
-    sns.boxplot(data=df_sorted_attendants, y='attendant', x='csat', ax=ax2)
-    ax2.set_xlabel('CSAT')
-    ax2.set_ylabel('')
-    ax2.set_title('Distribuição de Notas por Atendente')
-    ax2.grid(axis='x', alpha=0.3)
-    
-    plt.tight_layout()
-    plt.savefig('grafico_1_resultados_individuais.png', dpi=300, bbox_inches='tight')
-    print("📊 Gráfico salvo: grafico_1_resultados_individuais.png")
-    plt.close()
-    
-    return resultados
-
-
-def analise_2_ranking_atendentes(df):
+    # Gráfico 1: Média CSAT por atendente (desvio padrão) e distribuição das notas
+    grafico = especificar('grafico_1_resultados_individuais.png', 'resultados_individuais',
+                          resultados=resultado.tabela,
+                          histogramas=resultado.histogramas,
+                          media_geral=resultado.media_geral)
+    
+    return resultado.tabela, grafico
+
+
+@perfil.perfilado('analise_2_ranking_atendentes', linhas=avaliacoes)
+def analise_2_ranking_atendentes(cubo):
     """2 - Mapear os atendentes com melhores resultados em ordem decrescente"""
     print("=" * 80)
     print("2. RANKING DE ATENDENTES (Maior para Menor Média)")
     print("=" * 80)
     
-    ranking = df.groupby('attendant').agg({
-        'csat': ['mean', 'count']
-    }).round(2)
-    
-    ranking.columns = ['Média CSAT', 'Total Avaliações']
-    ranking = ranking.sort_values('Média CSAT', ascending=False)
-    ranking['Posição'] = range(1, len(ranking) + 1)
-    ranking = ranking[['Posição', 'Média CSAT', 'Total Avaliações']]
+    resultado = api.ranking_atendentes(cubo)
     
-    print(ranking)
+    print(resultado.tabela)
     print("\n" * 2)
     
     # Gráfico 2: Ranking de Atendentes
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
-    
-    # Gráfico de barras horizontais
-    colors = plt.cm.RdYlGn(np.linspace(0.3, 0.9, len(ranking)))
-    ax1.barh(range(len(ranking)), ranking['Média CSAT'], color=colors)
-    ax1.set_yticks(range(len(ranking)))
-    ax1.set_yticklabels(ranking.index)
-    ax1.set_xlabel('Média CSAT')
-    ax1.set_title('Ranking de Atendentes por Média CSAT')
-    ax1.invert_yaxis()
-    ax1.axvline(df['csat'].mean(), color='red', linestyle='--', label='Média Geral')
-    ax1.legend()
-    ax1.grid(axis='x', alpha=0.3)
-    
-    # Adicionar valores nas barras
-    for i, (idx, row) in enumerate(ranking.iterrows()):
-        ax1.text(row['Média CSAT'] + 0.05, i, f"{row['Média CSAT']:.2f}", 
-                va='center', fontsize=9)
-    
-    # Gráfico de barras com total de avaliações
-    ax2.bar(range(len(ranking)), ranking['Total Avaliações'], color='skyblue', alpha=0.7)
-    ax2.set_xticks(range(len(ranking)))
-    ax2.set_xticklabels(ranking.index, rotation=45, ha='right')
-    ax2.set_ylabel('Total de Avaliações')
-    ax2.set_title('Volume de Avaliações por Atendente')
-    ax2.grid(axis='y', alpha=0.3)
-    
-    # Adicionar valores nas barras
-    for i, (idx, row) in enumerate(ranking.iterrows()):
-        ax2.text(i, row['Total Avaliações'] + 1, f"{int(row['Total Avaliações'])}", 
-                ha='center', fontsize=9)
-    
-    plt.tight_layout()
-    plt.savefig('grafico_2_ranking_atendentes.png', dpi=300, bbox_inches='tight')
-    print("📊 Gráfico salvo: grafico_2_ranking_atendentes.png")
-    plt.close()
-    
-    return ranking
-
-
-def analise_3_ranking_tipos_contato(df):
+    grafico = especificar('grafico_2_ranking_atendentes.png', 'ranking_atendentes',
+                          ranking=resultado.tabela, media_geral=resultado.media_geral)
+    
+    return resultado.tabela, grafico
+
+
+@perfil.perfilado('analise_3_ranking_tipos_contato', linhas=avaliacoes)
+def analise_3_ranking_tipos_contato(cubo):
     """3 - Mapear os tipos de contato em ordem decrescente por avaliação"""
     print("=" * 80)
     print("3. RANKING DE TIPOS DE CONTATO (Melhores para Piores Notas)")
     print("=" * 80)
     
-    ranking_tipos = df.groupby('contact type').agg({
-        'csat': ['mean', 'count']
-    }).round(2)
-    
-    ranking_tipos.columns = ['Média CSAT', 'Total Avaliações']
-    ranking_tipos = ranking_tipos.sort_values('Média CSAT', ascending=False)
+    resultado = api.ranking_tipos_contato(cubo)
     
-    print(ranking_tipos)
+    print(resultado.tabela)
     print("\n" * 2)
     
     # Gráfico 3: Ranking de Tipos de Contato
-    fig, ax = plt.subplots(1, 1, figsize=(12, 6))
-    
-    x = range(len(ranking_tipos))
-    width = 0.35
-    
-    # Barras para média
-    bars1 = ax.bar([i - width/2 for i in x], ranking_tipos['Média CSAT'], 
-                   width, label='Média CSAT', alpha=0.8, color='coral')
-    
-    # Criar segundo eixo Y para total de avaliações
-    ax2 = ax.twinx()
-    bars2 = ax2.bar([i + width/2 for i in x], ranking_tipos['Total Avaliações'], 
-                    width, label='Total Avaliações', alpha=0.8, color='steelblue')
-    
-    ax.set_xlabel('Tipo de Contato')
-    ax.set_ylabel('Média CSAT', color='coral')
-    ax2.set_ylabel('Total de Avaliações', color='steelblue')
-    ax.set_title('Ranking de Tipos de Contato por Média CSAT e Volume')
-    ax.set_xticks(x)
-    ax.set_xticklabels(ranking_tipos.index, rotation=45, ha='right')
-    ax.tick_params(axis='y', labelcolor='coral')
-    ax2.tick_params(axis='y', labelcolor='steelblue')
-    
-    # Adicionar valores nas barras
-    for i, (idx, row) in enumerate(ranking_tipos.iterrows()):
-        ax.text(i - width/2, row['Média CSAT'] + 0.05, f"{row['Média CSAT']:.2f}", 
-               ha='center', fontsize=8)
-        ax2.text(i + width/2, row['Total Avaliações'] + 1, f"{int(row['Total Avaliações'])}", 
-                ha='center', fontsize=8)
-    
-    # Legendas
-    lines1, labels1 = ax.get_legend_handles_labels()
-    lines2, labels2 = ax2.get_legend_handles_labels()
-    ax.legend(lines1 + lines2, labels1 + labels2, loc='upper right')
-    
-    ax.grid(axis='y', alpha=0.3)
-    plt.tight_layout()
-    plt.savefig('grafico_3_ranking_tipos_contato.png', dpi=300, bbox_inches='tight')
-    print("📊 Gráfico salvo: grafico_3_ranking_tipos_contato.png")
-    plt.close()
-    
-    return ranking_tipos
-
-
-def analise_4_melhores_tipos_contato_por_atendente(df):
+    grafico = especificar('grafico_3_ranking_tipos_contato.png', 'ranking_tipos_contato',
+                          ranking_tipos=resultado.tabela)
+    
+    return resultado.tabela, grafico
+
+
+@perfil.perfilado('analise_4_melhores_tipos_contato_por_atendente', linhas=avaliacoes)
+def analise_4_melhores_tipos_contato_por_atendente(cubo):
     """4 - Identificar os tipos de contato onde os atendentes se saem melhor"""
     print("=" * 80)
     print("4. TIPOS DE CONTATO ONDE CADA ATENDENTE SE SAI MELHOR")
     print("=" * 80)
     
-    pivot = df.groupby(['attendant', 'contact type'])['csat'].mean().round(2)
-    
-    # Para cada atendente, encontrar o melhor tipo de contato
-    melhores = []
-    for atendente in df['attendant'].unique():
-        dados_atendente = pivot[atendente]
-        melhor_tipo = dados_atendente.idxmax()
-        melhor_media = dados_atendente.max()
-        total = len(df[(df['attendant'] == atendente) & (df['contact type'] == melhor_tipo)])
-        melhores.append({
-            'Atendente': atendente,
-            'Melhor Tipo de Contato': melhor_tipo,
-            'Média CSAT': melhor_media,
-            'Qtd Avaliações': total
-        })
-    
-    df_melhores = pd.DataFrame(melhores).sort_values('Média CSAT', ascending=False)
-    print(df_melhores.to_string(index=False))
+    resultado = api.melhores_tipos_contato(cubo)
+    
+    print(resultado.tabela.to_string(index=False))
     print("\n" * 2)
     
     # Gráfico 4: Heatmap de desempenho por atendente e tipo de contato
-    pivot_table = df.pivot_table(values='csat', index='attendant', 
-                                  columns='contact type', aggfunc='mean')
-    
-    fig, ax = plt.subplots(figsize=(14, 8))
-    sns.heatmap(pivot_table, annot=True, fmt='.2f', cmap='RdYlGn', 
-                center=df['csat'].mean(), ax=ax, cbar_kws={'label': 'Média CSAT'})
-    ax.set_title('Heatmap: Desempenho por Atendente e Tipo de Contato')
-    ax.set_xlabel('Tipo de Contato')
-    ax.set_ylabel('Atendente')
-    plt.tight_layout()
-    plt.savefig('grafico_4_heatmap_desempenho.png', dpi=300, bbox_inches='tight')
-    print("📊 Gráfico salvo: grafico_4_heatmap_desempenho.png")
-    plt.close()
+    grafico = especificar('grafico_4_heatmap_desempenho.png', 'heatmap_desempenho',
+                          celulas=resultado.celulas, media_geral=resultado.media_geral)
     
-    return df_melhores
+    return resultado.tabela, grafico
 
 
-def analise_5_piores_tipos_contato_por_atendente(df):
+@perfil.perfilado('analise_5_piores_tipos_contato_por_atendente', linhas=avaliacoes)
+def analise_5_piores_tipos_contato_por_atendente(cubo):
     """5 - Identificar os tipos de contato em que os atendentes se saem pior"""
     print("=" * 80)
     print("5. TIPOS DE CONTATO ONDE CADA ATENDENTE TEM MAIS DIFICULDADE")
     print("=" * 80)
     
-    pivot = df.groupby(['attendant', 'contact type'])['csat'].mean().round(2)
-    
-    # Para cada atendente, encontrar o pior tipo de contato
-    piores = []
-    for atendente in df['attendant'].unique():
-        dados_atendente = pivot[atendente]
-        pior_tipo = dados_atendente.idxmin()
-        pior_media = dados_atendente.min()
-        total = len(df[(df['attendant'] == atendente) & (df['contact type'] == pior_tipo)])
-        piores.append({
-            'Atendente': atendente,
-            'Pior Tipo de Contato': pior_tipo,
-            'Média CSAT': pior_media,
-            'Qtd Avaliações': total
-        })
-    
-    df_piores = pd.DataFrame(piores).sort_values('Média CSAT')
-    print(df_piores.to_string(index=False))
+    resultado = api.piores_tipos_contato(cubo)
+    
+    print(resultado.tabela.to_string(index=False))
     print("\n" * 2)
-    return df_piores
+    return resultado.tabela
 
 
-def analise_6_processos_notas_baixas(df):
+@perfil.perfilado('analise_6_processos_notas_baixas', linhas=avaliacoes)
+def analise_6_processos_notas_baixas(cubo):
     """6 - Mapear os 5 processos com mais notas baixas (abaixo de 3) devido fluxo do processo"""
     print("=" * 80)
     print("6. TOP 5 PROCESSOS COM MAIS NOTAS BAIXAS (<3) - FLUXO DO PROCESSO")
     print("=" * 80)
     
-    # Filtrar notas baixas e opportunity = "fluxo do processo"
-    notas_baixas = df[(df['csat'] < 3) & (df['opportunity'] == 'fluxo do processo')]
-    
-    # Contar por tipo de contato
-    processos_problematicos = notas_baixas.groupby('contact type').agg({
-        'csat': ['count', 'mean']
-    }).round(2)
+    resultado = api.processos_notas_baixas(cubo)
     
-    processos_problematicos.columns = ['Qtd Notas Baixas', 'Média Dessas Notas']
-    processos_problematicos = processos_problematicos.sort_values('Qtd Notas Baixas', ascending=False).head(5)
-    
-    print(processos_problematicos)
+    print(resultado.tabela)
     print("\n" * 2)
     
-    # Gráfico 6: Processos com mais notas baixas
-    if len(processos_problematicos) > 0:
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
-        
-        # Gráfico de barras para quantidade de notas baixas
-        ax1.barh(range(len(processos_problematicos)), 
-                processos_problematicos['Qtd Notas Baixas'], 
-                color='crimson', alpha=0.7)
-        ax1.set_yticks(range(len(processos_problematicos)))
-        ax1.set_yticklabels(processos_problematicos.index)
-        ax1.set_xlabel('Quantidade de Notas Baixas (CSAT < 3)')
-        ax1.set_title('Top 5 Processos com Mais Notas Baixas\n(Fluxo do Processo)')
-        ax1.invert_yaxis()
-        ax1.grid(axis='x', alpha=0.3)
-        
-        # Adicionar valores
-        for i, (idx, row) in enumerate(processos_problematicos.iterrows()):
-            ax1.text(row['Qtd Notas Baixas'] + 0.2, i, 
-                    f"{int(row['Qtd Notas Baixas'])}", va='center')
-        
-        # Análise por tipo de opportunity
-        opportunity_stats = df.groupby('opportunity').agg({
-            'csat': ['mean', 'count']
-        }).round(2)
-        opportunity_stats.columns = ['Média', 'Qtd']
-        
-        colors_opp = ['crimson' if x < 3 else 'gold' if x < 4 else 'green' 
-                     for x in opportunity_stats['Média']]
-        
-        ax2.bar(range(len(opportunity_stats)), opportunity_stats['Média'], 
-               color=colors_opp, alpha=0.7)
-        ax2.set_xticks(range(len(opportunity_stats)))
-        ax2.set_xticklabels(opportunity_stats.index, rotation=45, ha='right')
-        ax2.set_ylabel('Média CSAT')
-        ax2.set_title('Média CSAT por Tipo de Opportunity')
-        ax2.axhline(3, color='red', linestyle='--', alpha=0.5, label='Limite Nota Baixa')
-        ax2.axhline(4, color='orange', linestyle='--', alpha=0.5, label='Limite Nota Média')
-        ax2.legend()
-        ax2.grid(axis='y', alpha=0.3)
-        
-        # Adicionar valores
-        for i, (idx, row) in enumerate(opportunity_stats.iterrows()):
-            ax2.text(i, row['Média'] + 0.1, f"{row['Média']:.2f}", ha='center')
-        
-        plt.tight_layout()
-        plt.savefig('grafico_6_processos_problematicos.png', dpi=300, bbox_inches='tight')
-        print("📊 Gráfico salvo: grafico_6_processos_problematicos.png")
-        plt.close()
-    
-    return processos_problematicos
-
-
-def analise_7_destaque_dificuldade_por_atendente(df):
+    # Gráfico 6: Processos com mais notas baixas e análise por tipo de opportunity
+    grafico = None
+    if len(resultado.tabela) > 0:
+        grafico = especificar('grafico_6_processos_problematicos.png', 'processos_problematicos',
+                              processos_problematicos=resultado.tabela,
+                              opportunity_stats=resultado.por_opportunity)
+    
+    return resultado.tabela, grafico
+
+
+@perfil.perfilado('analise_7_destaque_dificuldade_por_atendente', linhas=avaliacoes)
+def analise_7_destaque_dificuldade_por_atendente(cubo, diretorio=DIRETORIO_ATENDENTES, trabalhadores=None):
     """7 - Entender onde cada atendente de suporte mais se destaca e onde tem mais dificuldade"""
     print("=" * 80)
     print("7. ANÁLISE DETALHADA: DESTAQUES E DIFICULDADES POR ATENDENTE")
     print("=" * 80)
     
-    for atendente in sorted(df['attendant'].unique()):
-        dados_atendente = df[df['attendant'] == atendente]
-        
-        print(f"\n{'─' * 80}")
-        print(f"ATENDENTE: {atendente}")
-        print(f"{'─' * 80}")
-        
-        # Estatísticas gerais
-        print(f"Média Geral: {dados_atendente['csat'].mean():.2f}")
-        print(f"Total de Avaliações: {len(dados_atendente)}")
-        
-        # Performance por tipo de contato
-        print(f"\nPerformance por Tipo de Contato:")
-        perf_tipo = dados_atendente.groupby('contact type').agg({
-            'csat': ['mean', 'count']
-        }).round(2)
-        perf_tipo.columns = ['Média', 'Qtd']
-        perf_tipo = perf_tipo.sort_values('Média', ascending=False)
-        print(perf_tipo)
-        
-        # Performance por opportunity
-        print(f"\nPerformance por Tipo de Opportunity:")
-        perf_opp = dados_atendente.groupby('opportunity').agg({
-            'csat': ['mean', 'count']
-        }).round(2)
-        perf_opp.columns = ['Média', 'Qtd']
-        perf_opp = perf_opp.sort_values('Média', ascending=False)
-        print(perf_opp)
-        
-        # Pontos fortes e fracos
-        melhor_tipo = perf_tipo['Média'].idxmax()
-        pior_tipo = perf_tipo['Média'].idxmin()
-        print(f"\n✓ DESTAQUE: {melhor_tipo} (Média: {perf_tipo.loc[melhor_tipo, 'Média']})")
-        print(f"✗ DIFICULDADE: {pior_tipo} (Média: {perf_tipo.loc[pior_tipo, 'Média']})")
+    resultado = api.destaques_atendentes(cubo)
     
+    # No console, uma linha por atendente; o detalhamento vai para um arquivo por atendente
+    print(resultado.perfis.to_string())
+    arquivos = escrever_relatorios_atendentes(resultado, diretorio, trabalhadores)
+    print(f"\n📝 Relatórios por atendente salvos: {len(arquivos)} arquivos em {diretorio}")
     print("\n" * 2)
+    return resultado.perfis
 
 
-def analise_8_probabilidade_nota_baixa(df):
+@perfil.perfilado('analise_8_probabilidade_nota_baixa', linhas=avaliacoes)
+def analise_8_probabilidade_nota_baixa(cubo):
     """8 - Mapear qual o atendente tem probabilidade maior de receber uma nota baixa"""
     print("=" * 80)
     print("8. PROBABILIDADE DE NOTA BAIXA POR ATENDENTE (CSAT < 3)")
     print("=" * 80)
     
-    # Definir nota baixa como < 3
-    df['nota_baixa'] = df['csat'] < 3
-    
-    probabilidades = []
-    for atendente in df['attendant'].unique():
-        dados_atendente = df[df['attendant'] == atendente]
-        total = len(dados_atendente)
-        notas_baixas = dados_atendente['nota_baixa'].sum()
-        probabilidade = (notas_baixas / total) * 100
-        
-        probabilidades.append({
-            'Atendente': atendente,
-            'Total Avaliações': total,
-            'Notas Baixas': notas_baixas,
-            'Probabilidade (%)': round(probabilidade, 2)
-        })
-    
-    df_prob = pd.DataFrame(probabilidades).sort_values('Probabilidade (%)', ascending=False)
+    resultado = api.probabilidade_nota_baixa(cubo)
+    df_prob = resultado.tabela
     print(df_prob.to_string(index=False))
+    
+    print("\n🔎 Células atendente × tipo de contato com maior risco ajustado:")
+    print(resultado.celulas.head(10).rename(columns={
+        'n': 'Avaliações', 'taxa': 'Taxa (%)', 'ic_inferior': 'IC Inf. (%)',
+        'ic_superior': 'IC Sup. (%)', 'ajustada': 'Ajustada (%)'}).to_string())
     print("\n" * 2)
     
-    # Gráfico 8: Probabilidade de nota baixa
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
-    
-    # Gráfico de barras de probabilidade
-    colors_prob = ['darkred' if x > 30 else 'orange' if x > 20 else 'yellowgreen' 
-                   for x in df_prob['Probabilidade (%)']]
-    
-    ax1.barh(range(len(df_prob)), df_prob['Probabilidade (%)'], color=colors_prob, alpha=0.7)
-    ax1.set_yticks(range(len(df_prob)))
-    ax1.set_yticklabels(df_prob['Atendente'])
-    ax1.set_xlabel('Probabilidade de Nota Baixa (%)')
-    ax1.set_title('Probabilidade de Receber Nota Baixa (CSAT < 3) por Atendente')
-    ax1.axvline(20, color='orange', linestyle='--', alpha=0.5, label='Limite Atenção (20%)')
-    ax1.axvline(30, color='red', linestyle='--', alpha=0.5, label='Limite Crítico (30%)')
-    ax1.legend()
-    ax1.grid(axis='x', alpha=0.3)
-    ax1.invert_yaxis()
-    
-    # Adicionar valores
-    for i, (idx, row) in enumerate(df_prob.iterrows()):
-        ax1.text(row['Probabilidade (%)'] + 1, i, f"{row['Probabilidade (%)']}%", 
-                va='center', fontsize=9)
-    
-    # Distribuição geral de notas
-    ax2.hist(df['csat'], bins=5, edgecolor='black', alpha=0.7, color='skyblue')
-    ax2.axvline(df['csat'].mean(), color='red', linestyle='--', 
-               linewidth=2, label=f'Média: {df["csat"].mean():.2f}')
-    ax2.axvline(df['csat'].median(), color='green', linestyle='--', 
-               linewidth=2, label=f'Mediana: {df["csat"].median():.2f}')
-    ax2.set_xlabel('CSAT')
-    ax2.set_ylabel('Frequência')
-    ax2.set_title('Distribuição Geral de Notas CSAT')
-    ax2.legend()
-    ax2.grid(axis='y', alpha=0.3)
-    
-    plt.tight_layout()
-    plt.savefig('grafico_8_probabilidade_nota_baixa.png', dpi=300, bbox_inches='tight')
-    print("📊 Gráfico salvo: grafico_8_probabilidade_nota_baixa.png")
-    plt.close()
-    
-    return df_prob
-
-
-def analise_9_recomendacoes(df, prob_notas_baixas, ranking_atendentes):
+    # Gráfico 8: Probabilidade de nota baixa e distribuição geral (histograma do cubo)
+    geral = resultado.geral
+    grafico = especificar('grafico_8_probabilidade_nota_baixa.png', 'probabilidade_nota_baixa',
+                          df_prob=df_prob,
+                          histograma=geral[COLUNAS_HISTOGRAMA].to_numpy(dtype=int),
+                          nota_min=geral['min'], nota_max=geral['max'],
+                          media=geral['media'], mediana=geral['mediana'])
+    
+    return df_prob, grafico
+
+
+@perfil.perfilado('analise_9_recomendacoes', linhas=avaliacoes)
+def analise_9_recomendacoes(cubo, prob_notas_baixas, ranking_atendentes):
     """9 - Recomendações para melhoria de processos e treinamentos"""
     print("=" * 80)
     print("9. RECOMENDAÇÕES ESTRATÉGICAS PARA MELHORIA")
     print("=" * 80)
     
+    resultado = api.recomendacoes(cubo, prob_notas_baixas, ranking_atendentes)
+    geral = resultado.geral
+    total = geral['n']
+    notas_baixas = geral['baixas']
+    notas_altas = resultado.notas_altas
+    
     print("\n📊 ANÁLISE GERAL:")
-    print(f"   • Média geral CSAT: {df['csat'].mean():.2f}")
-    print(f"   • Total de avaliações: {len(df)}")
-    print(f"   • Notas baixas (<3): {len(df[df['csat'] < 3])} ({(len(df[df['csat'] < 3])/len(df)*100):.1f}%)")
-    print(f"   • Notas altas (>=4): {len(df[df['csat'] >= 4])} ({(len(df[df['csat'] >= 4])/len(df)*100):.1f}%)")
+    print(f"   • Média geral CSAT: {geral['media']:.2f}")
+    print(f"   • Total de avaliações: {total}")
+    print(f"   • Notas baixas (<3): {notas_baixas} ({(notas_baixas/total*100):.1f}%)")
+    print(f"   • Notas altas (>=4): {notas_altas} ({(notas_altas/total*100):.1f}%)")
     
     print("\n🎯 RECOMENDAÇÕES DE TREINAMENTO:")
     
-    # Identificar atendentes que precisam de treinamento (probabilidade de nota baixa > 20%)
-    atendentes_treinamento = prob_notas_baixas[prob_notas_baixas['Probabilidade (%)'] > 20]
+    # Atendentes que precisam de treinamento: IC 95% da probabilidade de nota baixa acima de 20%
+    atendentes_treinamento = resultado.treinamento
     
     if len(atendentes_treinamento) > 0:
         print(f"   • {len(atendentes_treinamento)} atendente(s) com alta probabilidade de notas baixas:")
         for _, row in atendentes_treinamento.iterrows():
-            print(f"     - {row['Atendente']}: {row['Probabilidade (%)']}% de chance de nota baixa")
+            print(f"     - {row['Atendente']}: {row['Probabilidade Ajustada (%)']}% de chance de nota baixa "
+                  f"(observado {row['Probabilidade (%)']}%, IC 95% {row['IC 95% Inferior (%)']}%"
+                  f"–{row['IC 95% Superior (%)']}%)")
     
     # Identificar tipos de contato problemáticos
     print("\n🔧 PROCESSOS QUE NECESSITAM REVISÃO:")
-    tipos_problematicos = df[df['csat'] < 3].groupby('contact type').size().sort_values(ascending=False).head(3)
-    for tipo, qtd in tipos_problematicos.items():
+    for tipo, qtd in resultado.tipos_problematicos.items():
         print(f"   • {tipo}: {qtd} notas baixas")
     
     # Identificar opportunities problemáticas
     print("\n⚠️ ANÁLISE POR TIPO DE OPPORTUNITY:")
-    opp_stats = df.groupby('opportunity').agg({
-        'csat': ['mean', 'count']
-    }).round(2)
+    por_opp = resultado.por_opportunity
+    opp_stats = por_opp[['media', 'n']].round(2)
     opp_stats.columns = ['Média', 'Qtd']
     for opp, row in opp_stats.iterrows():
         print(f"   • {opp}: Média {row['Média']} ({row['Qtd']} avaliações)")
     
     # Melhores práticas
     print("\n⭐ MELHORES PRÁTICAS (Atendentes com melhor desempenho):")
-    top_3 = ranking_atendentes.head(3)
-    for idx, row in top_3.iterrows():
+    for idx, row in resultado.melhores_atendentes.iterrows():
         print(f"   • {idx}: Média {row['Média CSAT']} - pode compartilhar conhecimento com a equipe")
     
     print("\n💡 AÇÕES RECOMENDADAS:")
@@ -509,97 +355,144 @@ def analise_9_recomendacoes(df, prob_notas_baixas, ranking_atendentes):
     print("   7. Documentar melhores práticas dos atendentes top performers")
     
     # Gráfico 9: Dashboard de Recomendações
-    fig = plt.figure(figsize=(16, 10))
-    gs = fig.add_gridspec(3, 2, hspace=0.3, wspace=0.3)
-    
-    # 1. Pizza - Distribuição de notas
-    ax1 = fig.add_subplot(gs[0, 0])
-    bins = [0, 3, 4, 5.1]
-    labels = ['Baixa (<3)', 'Média (3-4)', 'Alta (4-5)']
-    colors_pie = ['crimson', 'gold', 'green']
-    df['categoria'] = pd.cut(df['csat'], bins=bins, labels=labels, include_lowest=True)
-    categoria_counts = df['categoria'].value_counts()
-    ax1.pie(categoria_counts, labels=categoria_counts.index, autopct='%1.1f%%', 
-           colors=colors_pie, startangle=90)
-    ax1.set_title('Distribuição de Notas por Categoria')
-    
-    # 2. Comparação Top 3 vs Bottom 3
-    ax2 = fig.add_subplot(gs[0, 1])
-    top_3 = ranking_atendentes.head(3)
-    bottom_3 = ranking_atendentes.tail(3)
-    comparison = pd.concat([top_3, bottom_3])
-    colors_comp = ['green']*3 + ['red']*3
-    ax2.barh(range(len(comparison)), comparison['Média CSAT'], color=colors_comp, alpha=0.7)
-    ax2.set_yticks(range(len(comparison)))
-    ax2.set_yticklabels(comparison.index)
-    ax2.set_xlabel('Média CSAT')
-    ax2.set_title('Top 3 vs Bottom 3 Atendentes')
-    ax2.axvline(df['csat'].mean(), color='black', linestyle='--', alpha=0.5)
-    ax2.invert_yaxis()
-    ax2.grid(axis='x', alpha=0.3)
-    
-    # 3. Notas por Opportunity
-    ax3 = fig.add_subplot(gs[1, 0])
-    opp_data = df.groupby('opportunity')['csat'].mean().sort_values()
-    colors_opp = ['red' if x < 3 else 'gold' if x < 4 else 'green' for x in opp_data]
-    ax3.barh(range(len(opp_data)), opp_data, color=colors_opp, alpha=0.7)
-    ax3.set_yticks(range(len(opp_data)))
-    ax3.set_yticklabels(opp_data.index)
-    ax3.set_xlabel('Média CSAT')
-    ax3.set_title('Média CSAT por Tipo de Opportunity')
-    ax3.invert_yaxis()
-    ax3.grid(axis='x', alpha=0.3)
-    
-    # 4. Volume de avaliações por atendente
-    ax4 = fig.add_subplot(gs[1, 1])
-    vol_data = df['attendant'].value_counts().sort_values(ascending=True)
-    ax4.barh(range(len(vol_data)), vol_data, color='steelblue', alpha=0.7)
-    ax4.set_yticks(range(len(vol_data)))
-    ax4.set_yticklabels(vol_data.index)
-    ax4.set_xlabel('Quantidade de Avaliações')
-    ax4.set_title('Volume de Avaliações por Atendente')
-    ax4.grid(axis='x', alpha=0.3)
-    
-    # 5. Tendência de probabilidade de nota baixa
-    ax5 = fig.add_subplot(gs[2, :])
-    prob_sorted = prob_notas_baixas.sort_values('Probabilidade (%)')
-    x_pos = range(len(prob_sorted))
-    bars = ax5.bar(x_pos, prob_sorted['Probabilidade (%)'], alpha=0.7)
-    
-    # Colorir barras baseado no nível de risco
-    for i, (idx, row) in enumerate(prob_sorted.iterrows()):
-        if row['Probabilidade (%)'] > 30:
-            bars[i].set_color('darkred')
-        elif row['Probabilidade (%)'] > 20:
-            bars[i].set_color('orange')
-        else:
-            bars[i].set_color('green')
+    grafico = especificar('grafico_9_dashboard_recomendacoes.png', 'dashboard_recomendacoes',
+                          categoria_counts=resultado.categorias,
+                          ranking_atendentes=ranking_atendentes,
+                          media_geral=geral['media'],
+                          opp_data=por_opp['media'].sort_values(),
+                          vol_data=resultado.volume,
+                          prob_notas_baixas=prob_notas_baixas)
     
-    ax5.set_xticks(x_pos)
-    ax5.set_xticklabels(prob_sorted['Atendente'], rotation=45, ha='right')
-    ax5.set_ylabel('Probabilidade (%)')
-    ax5.set_title('Risco de Nota Baixa por Atendente (Verde: Baixo | Laranja: Médio | Vermelho: Alto)')
-    ax5.axhline(20, color='orange', linestyle='--', alpha=0.5, linewidth=1)
-    ax5.axhline(30, color='red', linestyle='--', alpha=0.5, linewidth=1)
-    ax5.grid(axis='y', alpha=0.3)
+    print("\n" * 2)
+    return atendentes_treinamento, grafico
+
+
+@perfil.perfilado('analise_10_tendencias', linhas=avaliacoes)
+def analise_10_tendencias(temporal):
+    """10 - Acompanhar a evolução (médias móveis) da nota e da taxa de notas baixas"""
+    print("=" * 80)
+    print("10. TENDÊNCIAS: MÉDIAS MÓVEIS POR ATENDENTE E TIPO DE CONTATO")
+    print("=" * 80)
     
-    # Adicionar valores nas barras
-    for i, (idx, row) in enumerate(prob_sorted.iterrows()):
-        ax5.text(i, row['Probabilidade (%)'] + 1, f"{row['Probabilidade (%)']}%", 
-                ha='center', fontsize=8)
+    resultado = api.tendencias_recentes(temporal)
+    if resultado is None:
+        print(f"Os dados não têm a coluna de data '{COLUNA_DATA}'; análise de tendências ignorada.")
+        print("\n" * 2)
+        return None, None
     
-    plt.suptitle('Dashboard Executivo - Análise CSAT e Recomendações', 
-                fontsize=16, fontweight='bold', y=0.995)
+    dias = temporal.index.get_level_values('dia')
+    print(f"Período: {dias.min():%d/%m/%Y} a {dias.max():%d/%m/%Y}")
     
-    plt.savefig('grafico_9_dashboard_recomendacoes.png', dpi=300, bbox_inches='tight')
-    print("📊 Gráfico salvo: grafico_9_dashboard_recomendacoes.png")
-    plt.close()
+    _, janela = FREQUENCIAS['semanal']
+    variacao_atendentes = resultado.variacao_atendentes
+    print(f"\n📉 Atendentes que mais pioraram (média das últimas {janela} semanas vs. as {janela} anteriores):")
+    print(variacao_atendentes.head(5).to_string())
+    print(f"\n📈 Atendentes que mais melhoraram:")
+    print(variacao_atendentes.tail(5).iloc[::-1].to_string())
     
+    print(f"\n📋 Tipos de contato (últimas {janela} semanas):")
+    print(resultado.variacao_tipos.to_string())
     print("\n" * 2)
+    
+    # Gráfico 10: evolução geral e mapas das médias móveis semanais por grupo
+    semanal = resultado.tabela.xs('semanal', level='frequencia')['media_movel']
+    moveis = resultado.geral_semanal
+    grafico = especificar('grafico_10_tendencias.png', 'tendencias',
+                          media_geral=(moveis['soma'] / moveis['n']),
+                          taxa_geral=(moveis['baixas'] / moveis['n'] * 100),
+                          atendentes=semanal.loc['attendant'].unstack('grupo')[variacao_atendentes.index],
+                          tipos_contato=semanal.loc['contact type'].unstack('grupo')[resultado.variacao_tipos.index])
+    
+    return resultado.tabela, grafico
 
 
-def main():
-    """Função principal que executa todas as análises"""
+@perfil.perfilado('analise_11_significancia', linhas=avaliacoes)
+def analise_11_significancia(cubo, replicas=REPLICAS, semente=0, trabalhadores=None):
+    """11 - Medir a incerteza dos rankings (bootstrap) e testar as piores células (permutação)"""
+    print("=" * 80)
+    print("11. SIGNIFICÂNCIA DOS RANKINGS (BOOTSTRAP E PERMUTAÇÃO)")
+    print("=" * 80)
+    print(f"Réplicas: {replicas:,}  |  semente: {semente}")
+    
+    resultado = api.significancia(cubo, replicas, semente, trabalhadores)
+    for titulo, estabilidade in [('atendentes', resultado.atendentes), ('tipos de contato', resultado.tipos_contato)]:
+        print(f"\n📏 Intervalos bootstrap e estabilidade do ranking de {titulo}:")
+        print(estabilidade.to_string())
+    
+    celulas = resultado.celulas
+    significativas = celulas[celulas['q-valor (BH)'] < 0.05]
+    print(f"\n🔬 Tipos de contato em que o atendente é pior que a própria média "
+          f"(teste de permutação unilateral, q < 0,05): {len(significativas)} de {len(celulas)} células")
+    if len(significativas) > 0:
+        print(significativas.to_string())
+    else:
+        print("Nenhuma célula significativa; as 5 de menor p-valor:")
+        print(celulas.head(5).to_string())
+    print("\n" * 2)
+    
+    return resultado.tabela, None
+
+
+def grafo_analises(cubo, temporal=None, replicas=REPLICAS, semente=0, trabalhadores=None,
+                   diretorio_atendentes=DIRETORIO_ATENDENTES):
+    """Grafo das análises: cada uma com suas dependências (a 9 usa as tabelas da 2 e da 8)"""
+    def recomendacoes(probabilidade, ranking):
+        return analise_9_recomendacoes(cubo, probabilidade[0], ranking[0])
+
+    return {
+        1: (partial(analise_1_resultados_individuais, cubo), ()),
+        2: (partial(analise_2_ranking_atendentes, cubo), ()),
+        3: (partial(analise_3_ranking_tipos_contato, cubo), ()),
+        4: (partial(analise_4_melhores_tipos_contato_por_atendente, cubo), ()),
+        5: (partial(analise_5_piores_tipos_contato_por_atendente, cubo), ()),
+        6: (partial(analise_6_processos_notas_baixas, cubo), ()),
+        7: (partial(analise_7_destaque_dificuldade_por_atendente, cubo, diretorio_atendentes, trabalhadores), ()),
+        8: (partial(analise_8_probabilidade_nota_baixa, cubo), ()),
+        9: (recomendacoes, (8, 2)),
+        10: (partial(analise_10_tendencias, temporal), ()),
+        11: (partial(analise_11_significancia, cubo, replicas, semente, trabalhadores), ()),
+    }
+
+
+ANALISES = list(range(1, 12))
+# Nome das tabelas de cada análise na exportação
+TABELAS_ANALISES = {
+    1: 'resultados_individuais',
+    2: 'ranking_atendentes',
+    3: 'ranking_tipos_contato',
+    4: 'melhores_tipos_contato',
+    5: 'piores_tipos_contato',
+    6: 'processos_notas_baixas',
+    7: 'destaques_atendentes',
+    8: 'probabilidade_nota_baixa',
+    9: 'atendentes_treinamento',
+    10: 'tendencias',
+    11: 'significancia',
+}
+
+
+def main(caminho='analise_suporte.xlsx', trabalhadores=None, incremental=False, verificar=False,
+         analises=None, graficos=True, perfilar=None, replicas=REPLICAS, semente=0, cache_graficos=True,
+         segmentar=(), diretorio_segmentos=DIRETORIO_RELATORIOS, diretorio_atendentes=DIRETORIO_ATENDENTES,
+         backend='pandas', exportar_formatos=(), diretorio_exportacao=DIRETORIO_EXPORTACAO,
+         significancia=False):
+    """Função principal que executa as análises pedidas (todas, por padrão)
+
+    `perfilar` é o prefixo dos arquivos de perfil (JSON lines e trace do
+    Chrome); quando informado, cada etapa é medida. A análise de
+    significância (11) só entra no padrão com `significancia`; `replicas` e
+    `semente` controlam a sua reamostragem. Com
+    `cache_graficos` desligado todos os gráficos são redesenhados. Cada
+    segmentação em `segmentar` ('opportunity', 'tipo_contato') grava um
+    relatório por segmento em `diretorio_segmentos`; o detalhamento de cada
+    atendente (análise 7) vai para `diretorio_atendentes`. `backend` escolhe
+    quem calcula os cubos: 'pandas' (padrão) ou 'sqlite'. As tabelas das
+    análises pedidas são exportadas em cada formato de `exportar_formatos`
+    ('xlsx', 'parquet', 'csv') para `diretorio_exportacao`, enquanto os
+    gráficos são desenhados.
+    """
+    if perfilar:
+        perfil.ativar()
     print("\n" * 2)
     print("╔" + "=" * 78 + "╗")
     print("║" + " " * 20 + "ANÁLISE DE SATISFAÇÃO - CSAT" + " " * 30 + "║")
@@ -607,19 +500,71 @@ def main():
     print("╚" + "=" * 78 + "╝")
     print("\n" * 2)
     
-    # Carregar dados
-    df = carregar_dados()
-    
-    # Executar todas as análises
-    resultados_individuais = analise_1_resultados_individuais(df)
-    ranking_atendentes = analise_2_ranking_atendentes(df)
-    ranking_tipos_contato = analise_3_ranking_tipos_contato(df)
-    melhores_tipos = analise_4_melhores_tipos_contato_por_atendente(df)
-    piores_tipos = analise_5_piores_tipos_contato_por_atendente(df)
-    processos_problematicos = analise_6_processos_notas_baixas(df)
-    analise_7_destaque_dificuldade_por_atendente(df)
-    prob_notas_baixas = analise_8_probabilidade_nota_baixa(df)
-    analise_9_recomendacoes(df, prob_notas_baixas, ranking_atendentes)
+    # Carregar dados em blocos, consolidando o cubo de agregação (única varredura)
+    cubo, temporal = carregar_dados(caminho, incremental=incremental or verificar, com_temporal=True,
+                                    trabalhadores=trabalhadores, backend=backend)
+    if verificar:
+        cubo = verificar_incremental(cubo, caminho)
+    
+    # Por padrão, todas as análises; a de tendências só quando os dados têm data e a de
+    # significância (milhares de réplicas) só quando pedida
+    if analises is None:
+        analises = [numero for numero in ANALISES
+                    if (numero != 10 or temporal is not None) and (numero != 11 or significancia)]
+    analises = sorted(analises)
+    
+    # Executar só as análises pedidas e suas dependências; as independentes rodam juntas.
+    # O texto de cada análise é exibido na ordem, e o das dependências não pedidas é omitido
+    # Com o perfil ativo as análises rodam uma de cada vez, para que as medições não se misturem
+    grafo = grafo_analises(cubo, temporal, replicas, semente, trabalhadores, diretorio_atendentes)
+    resultados, saidas = executar_grafo(grafo, analises, 1 if perfilar else None)
+    for numero in analises:
+        print(saidas[numero], end='')
+    
+    # Exportar as tabelas numa thread, ao mesmo tempo que os gráficos e os relatórios
+    exportacao = None
+    if exportar_formatos:
+        exportadas = tabelas_resultados({numero: resultados[numero] for numero in analises}, TABELAS_ANALISES)
+        fundo = ThreadPoolExecutor(max_workers=1)
+        exportacao = fundo.submit(exportar, exportadas, diretorio_exportacao, exportar_formatos)
+        fundo.shutdown(wait=False)
+    
+    # Desenhar os gráficos das análises pedidas em paralelo
+    if graficos:
+        especificacoes = [resultados[numero][1] for numero in analises
+                          if isinstance(resultados[numero], tuple) and resultados[numero][1] is not None]
+        for arquivo, reaproveitado in renderizar_graficos(especificacoes, trabalhadores, cache_graficos):
+            if reaproveitado:
+                print(f"📊 Gráfico salvo: {arquivo} (dados sem alteração, reaproveitado do cache)")
+            else:
+                print(f"📊 Gráfico salvo: {arquivo}")
+        print("\n")
+    
+    # Relatórios por segmento: todos os segmentos saem do mesmo cubo, sem reler os dados
+    for segmentacao in segmentar:
+        dimensao = SEGMENTACOES[segmentacao]
+        with perfil.etapa(f'segmentos por {dimensao}', 'segmentos'):
+            tabelas = analisar_segmentos(cubo, dimensao)
+            arquivos = escrever_relatorios(tabelas, dimensao, diretorio_segmentos)
+        print(f"📝 Relatórios por {dimensao} salvos: {len(arquivos)} segmentos em {diretorio_segmentos}")
+    if segmentar:
+        print("\n")
+    
+    if exportacao is not None:
+        arquivos = exportacao.result()
+        print(f"💾 Resultados exportados: {len(exportadas)} tabelas em {diretorio_exportacao} "
+              f"({', '.join(exportar_formatos)}; {len(arquivos)} arquivos)")
+        print("\n")
+    
+    if perfilar:
+        eventos = perfil.desativar()
+        print("=" * 80)
+        print("PERFIL DE EXECUÇÃO")
+        print("=" * 80)
+        print(perfil.resumo(eventos))
+        for arquivo in perfil.gravar(eventos, perfilar):
+            print(f"⏱️ Perfil salvo: {arquivo}")
+        print("\n")
     
     print("╔" + "=" * 78 + "╗")
     print("║" + " " * 25 + "ANÁLISE CONCLUÍDA COM SUCESSO" + " " * 24 + "║")
@@ -627,5 +572,60 @@ def main():
     print("\n")
 
 
+def _lista_analises(texto):
+    """Converte '2,8' em [2, 8], validando os números das análises"""
+    try:
+        analises = [int(parte) for parte in texto.split(',') if parte.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"lista de análises inválida: {texto!r}")
+    invalidas = [numero for numero in analises if numero not in ANALISES]
+    if invalidas or not analises:
+        raise argparse.ArgumentTypeError(f"análises devem estar entre 1 e {ANALISES[-1]}: {texto!r}")
+    return analises
+
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Análise de satisfação do cliente (CSAT)")
+    parser.add_argument('dados', nargs='?', default='analise_suporte.xlsx',
+                        help="arquivo, pasta ou padrão glob (ex.: 'dados/*.xlsx') com os dados de CSAT")
+    parser.add_argument('--somente', '--only', type=_lista_analises, default=None, metavar='N[,N...]',
+                        help="executa só estas análises (ex.: 2,8), calculando as dependências necessárias")
+    parser.add_argument('--sem-graficos', '--no-charts', action='store_true',
+                        help="não desenha nenhum gráfico")
+    parser.add_argument('--redesenhar', action='store_true',
+                        help="redesenha todos os gráficos, sem reaproveitar os de dados inalterados")
+    parser.add_argument('--perfil', '--profile', nargs='?', const='perfil_csat', default=None,
+                        metavar='PREFIXO',
+                        help="mede cada etapa e grava PREFIXO.jsonl e PREFIXO.trace.json (padrão: perfil_csat)")
+    parser.add_argument('--trabalhadores', type=int, default=None,
+                        help="processos usados na leitura, nos gráficos e na reamostragem (padrão: um por núcleo)")
+    parser.add_argument('--significancia', action='store_true',
+                        help="inclui a análise 11 (bootstrap e permutação), que fica de fora por padrão")
+    parser.add_argument('--replicas', type=int, default=REPLICAS,
+                        help=f"réplicas do bootstrap e do teste de permutação (padrão: {REPLICAS})")
+    parser.add_argument('--semente', type=int, default=0,
+                        help="semente da reamostragem; o resultado não depende do número de processos")
+    parser.add_argument('--segmentar', '--segment', action='append', choices=list(SEGMENTACOES), default=[],
+                        help="grava um relatório por segmento (pode repetir: --segmentar opportunity --segmentar tipo_contato)")
+    parser.add_argument('--pasta-segmentos', default=DIRETORIO_RELATORIOS,
+                        help=f"pasta dos relatórios por segmento (padrão: {DIRETORIO_RELATORIOS})")
+    parser.add_argument('--pasta-atendentes', default=DIRETORIO_ATENDENTES,
+                        help=f"pasta dos relatórios por atendente da análise 7 (padrão: {DIRETORIO_ATENDENTES})")
+    parser.add_argument('--exportar', nargs='*', choices=FORMATOS, default=None, metavar='FORMATO',
+                        help=f"exporta as tabelas das análises ({', '.join(FORMATOS)}; sem formato, todos)")
+    parser.add_argument('--pasta-exportacao', default=DIRETORIO_EXPORTACAO,
+                        help=f"pasta das tabelas exportadas (padrão: {DIRETORIO_EXPORTACAO})")
+    parser.add_argument('--backend', choices=BACKENDS, default='pandas',
+                        help="quem calcula os cubos: pandas (em memória) ou sqlite (banco em disco, consultas SQL)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="lê só as linhas novas desde a última execução e atualiza o cubo salvo")
+    parser.add_argument('--verificar-incremental', action='store_true',
+                        help="roda em modo incremental e confere o resultado com um recálculo completo")
+    args = parser.parse_args()
+    main(args.dados, trabalhadores=args.trabalhadores, incremental=args.incremental,
+         verificar=args.verificar_incremental, analises=args.somente, graficos=not args.sem_graficos,
+         perfilar=args.perfil, replicas=args.replicas, semente=args.semente,
+         cache_graficos=not args.redesenhar, segmentar=args.segmentar, diretorio_segmentos=args.pasta_segmentos,
+         diretorio_atendentes=args.pasta_atendentes, backend=args.backend,
+         exportar_formatos=FORMATOS if args.exportar == [] else tuple(dict.fromkeys(args.exportar or ())),
+         diretorio_exportacao=args.pasta_exportacao, significancia=args.significancia)
@@ -0,0 +1,159 @@
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# ============================================================================
+# PERFIL DE EXECUÇÃO
+# Mede cada etapa do pipeline (tempo de parede, CPU, linhas, memória alocada
+# e bytes gravados). Desativado, cada etapa custa só uma verificação.
+# ============================================================================
+
+_eventos = None
+_local = threading.local()
+_FIM = object()
+
+
+def ativar():
+    """Começa a registrar as etapas (inclusive as alocações, via tracemalloc)"""
+    global _eventos
+    _eventos = []
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def desativar():
+    """Para de registrar e devolve os eventos coletados"""
+    global _eventos
+    eventos, _eventos = _eventos or [], None
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+    return eventos
+
+
+def ativo():
+    """Indica se o perfil está sendo registrado"""
+    return _eventos is not None
+
+
+def coletar():
+    """Devolve e esvazia os eventos já registrados (usado pelos processos de gráficos)"""
+    eventos = list(_eventos or [])
+    if _eventos is not None:
+        _eventos.clear()
+    return eventos
+
+
+def incorporar(eventos):
+    """Acrescenta eventos registrados em outro processo"""
+    if _eventos is not None:
+        _eventos.extend(eventos)
+
+
+@contextmanager
+def etapa(nome, categoria='pipeline'):
+    """Mede o bloco como uma etapa; dentro dele, `anotar` acrescenta linhas e bytes"""
+    if _eventos is None:
+        yield
+        return
+
+    pilha = _local.__dict__.setdefault('pilha', [])
+    evento = {'nome': nome, 'categoria': categoria, 'pid': os.getpid(),
+              'thread': threading.get_ident(), 'inicio_us': time.time_ns() // 1000}
+    pilha.append(evento)
+    tracemalloc.reset_peak()
+    memoria_inicial = tracemalloc.get_traced_memory()[0]
+    cpu_inicial = time.process_time()
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        evento['duracao_s'] = time.perf_counter() - inicio
+        evento['cpu_s'] = time.process_time() - cpu_inicial
+        memoria_final, pico = tracemalloc.get_traced_memory()
+        # Etapas internas zeram o pico do tracemalloc; o maior pico delas é repassado à externa
+        pico = max(pico, evento.pop('_pico_interno', 0))
+        evento['memoria_pico_bytes'] = max(pico - memoria_inicial, 0)
+        evento['memoria_liquida_bytes'] = memoria_final - memoria_inicial
+        pilha.pop()
+        if pilha:
+            pilha[-1]['_pico_interno'] = max(pilha[-1].get('_pico_interno', 0), pico)
+        _eventos.append(evento)
+
+
+def anotar(**atributos):
+    """Acrescenta atributos (linhas, bytes_saida...) à etapa em andamento nesta thread"""
+    pilha = getattr(_local, 'pilha', None)
+    if _eventos is not None and pilha:
+        pilha[-1].update(atributos)
+
+
+def medir_iteracao(iteravel, nome, categoria='pipeline'):
+    """Mede a produção de cada item do iterável (ex.: a leitura de cada bloco) como uma etapa"""
+    if _eventos is None:
+        return iteravel
+    return _iterar_medindo(iter(iteravel), nome, categoria)
+
+
+def _iterar_medindo(iterador, nome, categoria):
+    while True:
+        with etapa(nome, categoria):
+            item = next(iterador, _FIM)
+            if item is not _FIM and hasattr(item, '__len__'):
+                anotar(linhas=len(item))
+        if item is _FIM:
+            return
+        yield item
+
+
+def perfilado(nome, linhas=None):
+    """Decorador que mede cada chamada da função como uma etapa
+
+    `linhas`, se informado, recebe o primeiro argumento e devolve quantas
+    linhas a etapa processou.
+    """
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            if _eventos is None:
+                return funcao(*args, **kwargs)
+            with etapa(nome):
+                if linhas is not None and args:
+                    anotar(linhas=int(linhas(args[0])))
+                return funcao(*args, **kwargs)
+        return envoltorio
+    return decorador
+
+
+def gravar(eventos, prefixo):
+    """Grava os eventos em JSON lines e no formato de trace do Chrome (chrome://tracing, Perfetto)"""
+    arquivo_jsonl = f'{prefixo}.jsonl'
+    arquivo_trace = f'{prefixo}.trace.json'
+    eventos = sorted(eventos, key=lambda evento: evento['inicio_us'])
+
+    with open(arquivo_jsonl, 'w', encoding='utf-8') as arquivo:
+        for evento in eventos:
+            arquivo.write(json.dumps(evento, ensure_ascii=False) + '\n')
+
+    trace = [{
+        'name': evento['nome'], 'cat': evento['categoria'], 'ph': 'X',
+        'ts': evento['inicio_us'], 'dur': round(evento['duracao_s'] * 1e6),
+        'pid': evento['pid'], 'tid': evento['thread'],
+        'args': {chave: valor for chave, valor in evento.items()
+                 if chave not in ('nome', 'categoria', 'pid', 'thread', 'inicio_us', 'duracao_s')},
+    } for evento in eventos]
+    with open(arquivo_trace, 'w', encoding='utf-8') as arquivo:
+        json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, arquivo, ensure_ascii=False)
+    return arquivo_jsonl, arquivo_trace
+
+
+def resumo(eventos):
+    """Texto com as etapas mais demoradas, para exibir no console"""
+    linhas = [f"{'Etapa':<48}{'Parede (s)':>12}{'CPU (s)':>10}{'Pico (MB)':>11}"]
+    for evento in sorted(eventos, key=lambda evento: evento['duracao_s'], reverse=True):
+        linhas.append(f"{evento['nome'][:47]:<48}{evento['duracao_s']:>12.3f}{evento['cpu_s']:>10.3f}"
+                      f"{evento['memoria_pico_bytes'] / 1e6:>11.1f}")
+    return '\n'.join(linhas)
@@ -0,0 +1,164 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from cubo import COLUNAS_HISTOGRAMA, NOTAS
+
+# ============================================================================
+# REAMOSTRAGEM (BOOTSTRAP E PERMUTAÇÃO) A PARTIR DOS HISTOGRAMAS
+# Como as notas são discretas, cada réplica sorteia as contagens de cada nota
+# (multinomial ou hipergeométrica) em vez de reamostrar linhas: o custo
+# depende do número de grupos, não do número de avaliações.
+# ============================================================================
+
+REPLICAS = 10_000
+# Réplicas por tarefa; fixo para que o resultado não dependa do número de processos
+REPLICAS_POR_LOTE = 500
+# Células por tarefa no teste de permutação
+CELULAS_POR_LOTE = 256
+# Resultados extremos que encerram o teste de uma célula (p-valor claramente alto)
+LIMITE_EXTREMOS = 100
+_NOTAS = np.asarray(NOTAS, dtype=float)
+
+
+def _lotes(replicas, semente):
+    """Divide as réplicas em lotes, cada um com sua semente derivada da semente principal"""
+    tamanhos = [min(REPLICAS_POR_LOTE, replicas - inicio) for inicio in range(0, replicas, REPLICAS_POR_LOTE)]
+    return list(zip(tamanhos, np.random.SeedSequence(semente).spawn(len(tamanhos))))
+
+
+def _executar(funcao, argumentos, trabalhadores):
+    """Executa os lotes em paralelo (ou no próprio processo, com um trabalhador)"""
+    if trabalhadores is None:
+        trabalhadores = os.cpu_count() or 1
+    trabalhadores = max(1, min(trabalhadores, len(argumentos)))
+    if trabalhadores == 1:
+        return [funcao(*argumento) for argumento in argumentos]
+    with ProcessPoolExecutor(max_workers=trabalhadores) as executor:
+        return list(executor.map(funcao, *zip(*argumentos)))
+
+
+def _medias_bootstrap(contagens, replicas, semente):
+    """Médias de `replicas` reamostragens multinomiais de cada grupo (réplicas × grupos)"""
+    gerador = np.random.default_rng(semente)
+    n = contagens.sum(axis=1)
+    sorteios = gerador.multinomial(n, contagens / n[:, None], size=(replicas, len(n)))
+    return (sorteios @ _NOTAS / n).astype(np.float32)
+
+
+def bootstrap_medias(estatisticas, replicas=REPLICAS, semente=0, confianca=0.95, trabalhadores=None):
+    """Intervalo bootstrap da média de cada grupo e a estabilidade da sua posição no ranking
+
+    Devolve uma tabela com a média observada, os limites do intervalo
+    percentil, a posição observada, a probabilidade de o grupo manter essa
+    posição, de ficar em primeiro e de ficar entre os três primeiros.
+    """
+    estatisticas = estatisticas[estatisticas['n'] > 0]
+    contagens = estatisticas[COLUNAS_HISTOGRAMA].to_numpy(dtype=np.int64)
+    medias = np.concatenate(_executar(
+        _medias_bootstrap, [(contagens, tamanho, semente_lote) for tamanho, semente_lote in _lotes(replicas, semente)],
+        trabalhadores))
+
+    # Posição de cada grupo em cada réplica (1 = maior média)
+    posicoes = (-medias).argsort(axis=1, kind='stable').argsort(axis=1) + 1
+    media_observada = contagens @ _NOTAS / contagens.sum(axis=1)
+    posicao_observada = (-media_observada).argsort(kind='stable').argsort() + 1
+
+    cauda = (1 - confianca) / 2
+    return pd.DataFrame({
+        'media': media_observada,
+        'ic_inferior': np.quantile(medias, cauda, axis=0),
+        'ic_superior': np.quantile(medias, 1 - cauda, axis=0),
+        'posicao': posicao_observada,
+        'prob_mesma_posicao': (posicoes == posicao_observada).mean(axis=0),
+        'prob_primeiro': (posicoes == 1).mean(axis=0),
+        'prob_top3': (posicoes <= 3).mean(axis=0),
+    }, index=estatisticas.index)
+
+
+def _sorteio_permutacao(gerador, contagens_grupo, tamanhos, replicas):
+    """Soma das notas de `replicas` sorteios sem reposição das notas do grupo, célula a célula
+
+    O sorteio hipergeométrico multivariado é feito nota a nota (hipergeométricas
+    condicionais), de uma vez para todas as células e réplicas.
+    """
+    restantes_grupo = contagens_grupo.sum(axis=1)
+    restantes_celula = np.broadcast_to(tamanhos, (replicas, len(tamanhos))).copy()
+    somas = np.zeros((replicas, len(tamanhos)))
+    for coluna, nota in enumerate(_NOTAS[:-1]):
+        boas = contagens_grupo[:, coluna]
+        restantes_grupo = restantes_grupo - boas
+        sorteadas = gerador.hypergeometric(np.broadcast_to(boas, restantes_celula.shape),
+                                           np.broadcast_to(restantes_grupo, restantes_celula.shape),
+                                           restantes_celula)
+        somas += sorteadas * nota
+        restantes_celula -= sorteadas
+    return somas + restantes_celula * _NOTAS[-1]
+
+
+def _permutacoes(contagens_grupo, contagens_celula, replicas, semente):
+    """Permutações feitas e quantas deram média da célula menor ou igual à observada
+
+    Sequencial (Besag e Clifford): a célula deixa de ser sorteada assim que
+    acumula LIMITE_EXTREMOS resultados extremos, pois já está claro que não é
+    significativa; só as células com p-valor pequeno recebem todas as réplicas.
+    """
+    gerador = np.random.default_rng(semente)
+    tamanhos = contagens_celula.sum(axis=1)
+    observadas = contagens_celula @ _NOTAS
+    extremos = np.zeros(len(tamanhos), dtype=np.int64)
+    realizadas = np.zeros(len(tamanhos), dtype=np.int64)
+    ativas = np.arange(len(tamanhos))
+    while len(ativas) > 0:
+        lote = min(REPLICAS_POR_LOTE, replicas - realizadas[ativas[0]])
+        somas = _sorteio_permutacao(gerador, contagens_grupo[ativas], tamanhos[ativas], lote)
+        extremos[ativas] += np.count_nonzero(somas <= observadas[ativas] + 1e-9, axis=0)
+        realizadas[ativas] += lote
+        ativas = ativas[(extremos[ativas] < LIMITE_EXTREMOS) & (realizadas[ativas] < replicas)]
+    return extremos, realizadas
+
+
+def teste_permutacao_celulas(cubo, grupo, subgrupo, replicas=REPLICAS, semente=0, trabalhadores=None):
+    """Testa, para cada célula grupo × subgrupo, se a média é pior que a do próprio grupo
+
+    Sob a hipótese nula as notas da célula são uma amostra sem reposição das
+    notas do grupo (permutação dos rótulos do subgrupo dentro do grupo). O
+    p-valor é unilateral: chance de uma média tão baixa quanto a observada.
+    """
+    celulas = cubo.groupby(level=[grupo, subgrupo], sort=True, observed=True)[COLUNAS_HISTOGRAMA].sum()
+    celulas = celulas[celulas.sum(axis=1) > 0]
+    grupos = celulas.groupby(level=grupo, sort=False, observed=True).transform('sum')
+    contagens_celula = celulas.to_numpy(dtype=np.int64)
+    contagens_grupo = grupos.to_numpy(dtype=np.int64)
+
+    # As células são divididas em lotes fixos, cada um com sua semente
+    inicios = range(0, len(celulas), CELULAS_POR_LOTE)
+    sementes = np.random.SeedSequence(semente).spawn(len(inicios))
+    parciais = _executar(_permutacoes, [
+        (contagens_grupo[inicio:inicio + CELULAS_POR_LOTE], contagens_celula[inicio:inicio + CELULAS_POR_LOTE],
+         replicas, semente_lote) for inicio, semente_lote in zip(inicios, sementes)], trabalhadores)
+    extremos = np.concatenate([parcial[0] for parcial in parciais])
+    realizadas = np.concatenate([parcial[1] for parcial in parciais])
+
+    n = contagens_celula.sum(axis=1)
+    return pd.DataFrame({
+        'n': n,
+        'media_celula': contagens_celula @ _NOTAS / n,
+        'media_grupo': contagens_grupo @ _NOTAS / contagens_grupo.sum(axis=1),
+        'permutacoes': realizadas,
+        'p_valor': (extremos + 1) / (realizadas + 1),
+    }, index=celulas.index)
+
+
+def ajuste_benjamini_hochberg(p_valores):
+    """p-valores ajustados (q-valores) para controlar a taxa de falsas descobertas entre muitos testes"""
+    p_valores = np.asarray(p_valores, dtype=float)
+    m = len(p_valores)
+    ordem = np.argsort(p_valores, kind='stable')
+    ajustados = p_valores[ordem] * m / np.arange(1, m + 1)
+    ajustados = np.minimum.accumulate(ajustados[::-1])[::-1]
+    resultado = np.empty(m)
+    resultado[ordem] = np.minimum(ajustados, 1.0)
+    return resultado
@@ -0,0 +1,130 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# ============================================================================
+# RELATÓRIOS EM ARQUIVO
+# Relatórios detalhados (um arquivo por atendente ou por segmento) gravados
+# em disco em vez de impressos no console. As tabelas chegam já agregadas e
+# ordenadas; cada arquivo é montado em memória e gravado de uma vez, em
+# paralelo numa pool de threads (a gravação libera o GIL).
+# ============================================================================
+
+DIRETORIO_ATENDENTES = 'relatorios_atendentes'
+TAMANHO_BUFFER = 1 << 16
+
+
+def nome_arquivo(rotulo):
+    """Nome de arquivo seguro a partir de um rótulo (atendente, segmento...)"""
+    return re.sub(r'[^\w.-]+', '_', str(rotulo)).strip('_') or 'vazio'
+
+
+def nomes_arquivos(rotulos):
+    """Nome de arquivo seguro e único para cada rótulo: {rótulo: nome}
+
+    Rótulos diferentes podem virar o mesmo nome (ex.: 'Ana Silva' e
+    'Ana/Silva'), e no Windows e no macOS nomes que só diferem em maiúsculas
+    são o mesmo arquivo; os repetidos ganham um sufixo (_2, _3...) na ordem
+    recebida, em vez de um relatório sobrescrever o outro.
+    """
+    nomes = {}
+    usados = set()
+    for rotulo in rotulos:
+        base = nome = nome_arquivo(rotulo)
+        repeticao = 1
+        while nome.lower() in usados:
+            repeticao += 1
+            nome = f"{base}_{repeticao}"
+        usados.add(nome.lower())
+        nomes[rotulo] = nome
+    return nomes
+
+
+def gravar_textos(textos, trabalhadores=None):
+    """Grava {caminho: texto} em paralelo e devolve os caminhos na ordem recebida"""
+    def gravar(caminho):
+        with open(caminho, 'w', encoding='utf-8', buffering=TAMANHO_BUFFER) as saida:
+            saida.write(textos[caminho])
+        return caminho
+
+    if not textos:
+        return []
+    with ThreadPoolExecutor(max_workers=trabalhadores) as executor:
+        return list(executor.map(gravar, textos))
+
+
+def _fatias(tabela):
+    """Desempenho de todos os atendentes já formatado em texto, com o intervalo de linhas de cada atendente
+
+    Uma única ordenação (por atendente e média) e uma única formatação de
+    toda a tabela substituem, por atendente, um filtro, uma ordenação e um
+    `to_string` do pandas; cada atendente é depois só um recorte [início, fim).
+    """
+    desempenho = tabela[['media', 'n']].round(2)
+    desempenho = desempenho.sort_values(['attendant', 'media'], ascending=[True, False], kind='stable')
+    atendentes = desempenho.index.get_level_values('attendant')
+    inicios = np.flatnonzero(np.r_[True, atendentes[1:] != atendentes[:-1]])
+    fins = np.r_[inicios[1:], len(desempenho)]
+    intervalos = dict(zip(atendentes[inicios], zip(inicios.tolist(), fins.tolist())))
+    nivel = desempenho.index.names[1]
+    colunas = {
+        'Média': [f"{media:.2f}" for media in desempenho['media'].tolist()],
+        'Qtd': [str(quantidade) for quantidade in desempenho['n'].tolist()],
+    }
+    return nivel, desempenho.index.get_level_values(nivel).astype(str).tolist(), colunas, intervalos
+
+
+def _tabela_texto(nome_indice, rotulos, colunas):
+    """Tabela alinhada em colunas, no mesmo leiaute do `to_string` do pandas"""
+    largura = max(len(nome_indice), *map(len, rotulos))
+    larguras = {nome: max(len(nome), *map(len, valores)) for nome, valores in colunas.items()}
+    cabecalho = " " * largura + "".join(f"  {nome:>{larguras[nome]}}" for nome in colunas)
+    linhas = [cabecalho, nome_indice.ljust(len(cabecalho))]
+    for posicao, rotulo in enumerate(rotulos):
+        linhas.append(rotulo.ljust(largura) + "".join(f"  {valores[posicao]:>{larguras[nome]}}"
+                                                      for nome, valores in colunas.items()))
+    return "\n".join(linhas)
+
+
+def relatorios_atendentes(resultado):
+    """Texto do relatório de destaques e dificuldades (análise 7) de cada atendente"""
+    tabelas = [_fatias(resultado.por_tipo), _fatias(resultado.por_opportunity)]
+
+    medias = resultado.geral['media'].to_dict()
+    textos = {}
+    for atendente, perfil in zip(resultado.perfis.index, resultado.perfis.to_dict('records')):
+        desempenho = []
+        for nivel, rotulos, colunas, intervalos in tabelas:
+            inicio, fim = intervalos[atendente]
+            desempenho.append(_tabela_texto(nivel, rotulos[inicio:fim],
+                                            {nome: valores[inicio:fim] for nome, valores in colunas.items()}))
+        textos[atendente] = "\n".join([
+            "─" * 80,
+            f"ATENDENTE: {atendente}",
+            "─" * 80,
+            f"Média Geral: {medias[atendente]:.2f}",
+            f"Total de Avaliações: {perfil['Total Avaliações']}",
+            "",
+            "Performance por Tipo de Contato:",
+            desempenho[0],
+            "",
+            "Performance por Tipo de Opportunity:",
+            desempenho[1],
+            "",
+            f"✓ DESTAQUE: {perfil['Destaque']} (Média: {perfil['Média Destaque']})",
+            f"✗ DIFICULDADE: {perfil['Dificuldade']} (Média: {perfil['Média Dificuldade']})",
+            "",
+        ])
+    return textos
+
+
+def escrever_relatorios_atendentes(resultado, diretorio=DIRETORIO_ATENDENTES, trabalhadores=None):
+    """Grava um relatório por atendente (análise 7) e devolve os caminhos dos arquivos"""
+    os.makedirs(diretorio, exist_ok=True)
+    relatorios = relatorios_atendentes(resultado)
+    nomes = nomes_arquivos(relatorios)
+    textos = {os.path.join(diretorio, f"{nomes[atendente]}.txt"): texto
+              for atendente, texto in relatorios.items()}
+    return gravar_textos(textos, trabalhadores)
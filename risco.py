@@ -0,0 +1,78 @@
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# RISCO DE NOTA BAIXA COM INCERTEZA
+# Intervalo de Wilson e estimativa bayesiana empírica (beta-binomial) para
+# todos os grupos de uma vez, a partir das contagens do cubo. Grupos com
+# poucas avaliações são puxados para a taxa geral em vez de liderar rankings.
+# ============================================================================
+
+CONFIANCA = 0.95
+
+
+def intervalo_wilson(sucessos, n, confianca=CONFIANCA):
+    """Limites inferior e superior do intervalo de Wilson para cada proporção sucessos/n"""
+    sucessos = np.asarray(sucessos, dtype=float)
+    n = np.asarray(n, dtype=float)
+    z = NormalDist().inv_cdf(0.5 + confianca / 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        proporcao = sucessos / n
+        denominador = 1 + z * z / n
+        centro = (proporcao + z * z / (2 * n)) / denominador
+        margem = z * np.sqrt(proporcao * (1 - proporcao) / n + z * z / (4 * n * n)) / denominador
+    return centro - margem, centro + margem
+
+
+def priori_beta(sucessos, n):
+    """Parâmetros (alfa, beta) da priori Beta ajustados pelo método dos momentos
+
+    A variância entre os grupos, descontado o ruído binomial esperado, mede
+    quanto os grupos realmente diferem; quanto menor, mais forte a priori. A
+    força (alfa + beta) nunca passa do tamanho do maior grupo: a priori não
+    pesa mais que as avaliações de nenhum grupo.
+    """
+    sucessos = np.asarray(sucessos, dtype=float)
+    n = np.asarray(n, dtype=float)
+    validos = n > 0
+    sucessos, n = sucessos[validos], n[validos]
+    if not len(n):
+        # Nenhum grupo com avaliações: priori uniforme, em vez de 0/0
+        return 1.0, 1.0
+    media = sucessos.sum() / n.sum()
+    if len(n) < 2 or media in (0.0, 1.0):
+        return media, 1 - media
+
+    proporcoes = sucessos / n
+    variancia = np.average((proporcoes - media) ** 2, weights=n)
+    variancia_real = variancia - media * (1 - media) * np.mean(1 / n)
+
+    # Sem variação além do ruído o método dos momentos não limita a força, então ela
+    # fica no teto; ligada ao total de dados, puxaria todos os grupos para a taxa geral
+    forca = n.max()
+    if variancia_real > 0:
+        forca = min(media * (1 - media) / variancia_real - 1, forca)
+    forca = max(forca, 1.0)
+    return media * forca, (1 - media) * forca
+
+
+def estimativa_bayes(sucessos, n, alfa, beta):
+    """Média a posteriori de cada proporção, encolhida em direção à taxa geral"""
+    return (np.asarray(sucessos, dtype=float) + alfa) / (np.asarray(n, dtype=float) + alfa + beta)
+
+
+def tabela_risco(sucessos, n, confianca=CONFIANCA):
+    """Taxa bruta, intervalo de Wilson e estimativa ajustada (em %) para cada grupo"""
+    indice = getattr(sucessos, 'index', None)
+    inferior, superior = intervalo_wilson(sucessos, n, confianca)
+    alfa, beta = priori_beta(sucessos, n)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bruta = np.asarray(sucessos, dtype=float) / np.asarray(n, dtype=float)
+    return pd.DataFrame({
+        'taxa': bruta * 100,
+        'ic_inferior': inferior * 100,
+        'ic_superior': superior * 100,
+        'ajustada': estimativa_bayes(sucessos, n, alfa, beta) * 100,
+    }, index=indice)
@@ -150,6 +150,32 @@ function Clean-Files {
     
     Get-ChildItem -Filter "*.pyc" -Recurse | Remove-Item -Force
     
+    # Remove cache colunar da planilha
+    if (Test-Path ".cache_csat") {
+        Remove-Item ".cache_csat" -Recurse -Force
+        Write-Host "✓ Cache da planilha removido" -ForegroundColor Green
+    }
+    
+    # Remove arquivos de perfil
+    if (Test-Path "perfil_csat.*") {
+        Remove-Item "perfil_csat.*" -Force
+        Write-Host "✓ Arquivos de perfil removidos" -ForegroundColor Green
+    }
+    
+    # Remove relatórios por segmento
+    if (Test-Path "relatorios_segmentos") {
+        Remove-Item "relatorios_segmentos" -Recurse -Force
+        Write-Host "✓ Relatórios por segmento removidos" -ForegroundColor Green
+    }
+    if (Test-Path "relatorios_atendentes") {
+        Remove-Item "relatorios_atendentes" -Recurse -Force
+        Write-Host "✓ Relatórios por atendente removidos" -ForegroundColor Green
+    }
+    if (Test-Path "resultados_exportados") {
+        Remove-Item "resultados_exportados" -Recurse -Force
+        Write-Host "✓ Tabelas exportadas removidas" -ForegroundColor Green
+    }
+    
     Write-Host "✓ Limpeza concluída" -ForegroundColor Green
 }
 
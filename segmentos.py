@@ -0,0 +1,122 @@
+import os
+
+import pandas as pd
+
+from cubo import agregar
+from relatorios import gravar_textos, nomes_arquivos
+from risco import tabela_risco
+
+# ============================================================================
+# ANÁLISES POR SEGMENTO
+# As estatísticas de todos os segmentos (opportunity ou tipo de contato) saem
+# de agrupamentos com várias chaves sobre o mesmo cubo, numa única passada:
+# o custo cresce com as células do cubo, não com células × segmentos.
+# ============================================================================
+
+# Opção da linha de comando → dimensão do cubo usada como segmento
+SEGMENTACOES = {'opportunity': 'opportunity', 'tipo_contato': 'contact type'}
+DIRETORIO_RELATORIOS = 'relatorios_segmentos'
+
+
+def analisar_segmentos(cubo, dimensao):
+    """Tabelas das análises 1 a 5 e 8 para todos os segmentos de uma vez
+
+    Devolve um dicionário de DataFrames cujo primeiro nível do índice é o
+    segmento. O ranking de tipos de contato e os melhores/piores tipos por
+    atendente só existem quando o segmento não é o próprio tipo de contato.
+    """
+    por_atendente = agregar(cubo, [dimensao, 'attendant'])
+    tabelas = {
+        'resultados': _resultados(por_atendente),
+        'ranking': _ranking(por_atendente, dimensao),
+        'probabilidade': _probabilidade(por_atendente, dimensao),
+    }
+    if dimensao != 'contact type':
+        por_tipo = agregar(cubo, [dimensao, 'contact type'])
+        tabelas['ranking_tipos'] = _ranking(por_tipo, dimensao, posicao=False)
+        celulas = agregar(cubo, [dimensao, 'attendant', 'contact type'])
+        tabelas['melhores'] = _tipo_extremo(celulas, por_atendente, dimensao, 'idxmax')
+        tabelas['piores'] = _tipo_extremo(celulas, por_atendente, dimensao, 'idxmin')
+    return tabelas
+
+
+def _resultados(por_atendente):
+    """Estatísticas de cada atendente em cada segmento (análise 1)"""
+    resultados = por_atendente[['media', 'mediana', 'desvio_padrao', 'n', 'min', 'max', 'soma']].round(2)
+    resultados.columns = ['Média', 'Mediana', 'Desvio Padrão', 'Total Avaliações', 'Nota Mín', 'Nota Máx', 'Soma']
+    return resultados
+
+
+def _ranking(estatisticas, dimensao, posicao=True):
+    """Grupos por média decrescente dentro de cada segmento (análises 2 e 3)"""
+    ranking = estatisticas[['media', 'n']].round(2)
+    ranking.columns = ['Média CSAT', 'Total Avaliações']
+    ranking = ranking.sort_values([dimensao, 'Média CSAT'], ascending=[True, False], kind='stable')
+    if posicao:
+        ranking.insert(0, 'Posição', ranking.groupby(level=dimensao, sort=False).cumcount().to_numpy() + 1)
+    return ranking
+
+
+def _tipo_extremo(celulas, por_atendente, dimensao, extremo):
+    """Melhor (idxmax) ou pior (idxmin) tipo de contato de cada atendente em cada segmento (análises 4 e 5)"""
+    medias = celulas['media'].round(2)
+    # Empates ficam com o primeiro tipo em ordem alfabética, como no relatório geral
+    posicoes = medias.groupby(level=[dimensao, 'attendant'], sort=False).agg(extremo).to_list()
+    escolhidas = celulas.loc[posicoes]
+    tabela = pd.DataFrame({
+        'Tipo de Contato': escolhidas.index.get_level_values('contact type'),
+        'Média CSAT': medias.loc[posicoes].to_numpy(),
+        'Qtd Avaliações': escolhidas['n'].to_numpy(),
+        # Ordem de aparição do atendente no segmento, para desempatar como no relatório geral
+        'ordem': por_atendente['primeira_ocorrencia'].reindex(escolhidas.index.droplevel('contact type')).to_numpy(),
+    }, index=escolhidas.index.droplevel('contact type'))
+    tabela = tabela.sort_values([dimensao, 'ordem']).drop(columns='ordem')
+    ascendente = extremo == 'idxmin'
+    return tabela.sort_values([dimensao, 'Média CSAT'], ascending=[True, ascendente], kind='stable')
+
+
+def _probabilidade(por_atendente, dimensao):
+    """Risco de nota baixa por atendente em cada segmento, com priori ajustada por segmento (análise 8)"""
+    partes = []
+    for _, grupo in por_atendente.groupby(level=dimensao, sort=True, observed=True):
+        grupo = grupo.sort_values('primeira_ocorrencia')
+        risco = tabela_risco(grupo['baixas'], grupo['n'])
+        partes.append(pd.DataFrame({
+            'Total Avaliações': grupo['n'],
+            'Notas Baixas': grupo['baixas'],
+            'Probabilidade (%)': risco['taxa'].round(2),
+            'IC 95% Inferior (%)': risco['ic_inferior'].round(2),
+            'IC 95% Superior (%)': risco['ic_superior'].round(2),
+            'Probabilidade Ajustada (%)': risco['ajustada'].round(2),
+        }).sort_values('Probabilidade Ajustada (%)', ascending=False, kind='stable'))
+    return pd.concat(partes)
+
+
+def escrever_relatorios(tabelas, dimensao, diretorio=DIRETORIO_RELATORIOS):
+    """Grava um relatório de texto por segmento e devolve os caminhos dos arquivos"""
+    titulos = {
+        'resultados': '1. RESULTADOS INDIVIDUAIS DE CADA ATENDENTE',
+        'ranking': '2. RANKING DE ATENDENTES (Maior para Menor Média)',
+        'ranking_tipos': '3. RANKING DE TIPOS DE CONTATO (Melhores para Piores Notas)',
+        'melhores': '4. TIPOS DE CONTATO ONDE CADA ATENDENTE SE SAI MELHOR',
+        'piores': '5. TIPOS DE CONTATO ONDE CADA ATENDENTE TEM MAIS DIFICULDADE',
+        'probabilidade': '8. PROBABILIDADE DE NOTA BAIXA POR ATENDENTE (CSAT < 3)',
+    }
+    pasta = os.path.join(diretorio, dimensao.replace(' ', '_'))
+    os.makedirs(pasta, exist_ok=True)
+
+    # Um único agrupamento por tabela separa as linhas de todos os segmentos
+    por_segmento = {}
+    for chave, tabela in tabelas.items():
+        for segmento, linhas in tabela.groupby(level=dimensao, sort=True, observed=True):
+            por_segmento.setdefault(segmento, {})[chave] = linhas.droplevel(dimensao)
+
+    nomes = nomes_arquivos(por_segmento)
+    textos = {}
+    for segmento, partes in por_segmento.items():
+        blocos = [f"SEGMENTO: {dimensao} = {segmento}\n\n"]
+        for chave, titulo in titulos.items():
+            if chave in partes:
+                blocos.append("=" * 80 + "\n" + titulo + "\n" + "=" * 80 + "\n" + partes[chave].to_string() + "\n\n")
+        textos[os.path.join(pasta, f"{nomes[segmento]}.txt")] = "".join(blocos)
+    return gravar_textos(textos)
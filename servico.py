@@ -0,0 +1,431 @@
+"""
+Serviço HTTP local de consultas CSAT.
+
+Carrega os dados uma única vez num cubo diário em memória (atendente × tipo de
+contato × opportunity × dia) e responde às análises 1 a 10 com filtros, sem
+reler os arquivos. As respostas ficam num cache LRU que é esvaziado sempre que
+os dados são recarregados.
+
+Uso:
+    python servico.py analise_suporte.xlsx --porta 8000
+    curl 'http://127.0.0.1:8000/analises/2?tipo_contato=coletagem&desde=2024-01-01'
+    curl 'http://127.0.0.1:8000/analises/1?notas=1,2&opportunity=fluxo%20do%20processo'
+
+Rotas:
+    GET  /analises/N     análise N (1 a 10); filtros: atendente, tipo_contato,
+                         opportunity, notas (listas separadas por vírgula), desde e
+                         ate (AAAA-MM-DD)
+    GET  /saude          linhas carregadas, versão dos dados e estatísticas do cache
+    POST /recarregar     relê os arquivos e invalida o cache
+"""
+import argparse
+import asyncio
+import dataclasses
+import json
+import os
+import threading
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+import api
+from cache import preparar_cache
+from carregamento import TAMANHO_BLOCO, ler_blocos, listar_arquivos
+from cubo import AGREGACOES, NOTAS, construir_cubo, combinar_cubos, restringir_notas
+from esquema import COLUNA_DATA, DIMENSOES, normalizar_esquema
+from indices import IndiceDimensoes
+from ingestao import BLOCOS_POR_COMBINACAO
+from tendencias import DIMENSOES_TEMPORAIS
+
+# ============================================================================
+# ESTADO EM MEMÓRIA E CONSULTAS
+# ============================================================================
+
+DIMENSOES_SERVICO = DIMENSOES + ['dia']
+# Dia das avaliações sem data válida: ficam no cubo, mas fora de qualquer filtro de data
+SEM_DATA = pd.Timestamp('1900-01-01')
+TAMANHO_CACHE = 1024
+# Parâmetro da URL → nível do cubo
+FILTROS = {'atendente': 'attendant', 'tipo_contato': 'contact type', 'opportunity': 'opportunity'}
+
+CONSULTAS = {
+    1: api.resultados_individuais,
+    2: api.ranking_atendentes,
+    3: api.ranking_tipos_contato,
+    4: api.melhores_tipos_contato,
+    5: api.piores_tipos_contato,
+    6: api.processos_notas_baixas,
+    7: api.destaques_atendentes,
+    8: api.probabilidade_nota_baixa,
+    9: api.recomendacoes,
+    10: api.tendencias_recentes,
+}
+
+
+class ErroConsulta(Exception):
+    """Consulta inválida ou sem dados; carrega o status HTTP da resposta"""
+
+    def __init__(self, status, mensagem):
+        super().__init__(mensagem)
+        self.status = status
+
+
+def carregar_cubo_diario(caminho, tamanho_bloco=TAMANHO_BLOCO, usar_cache=True):
+    """Lê todos os arquivos e monta o cubo com o dia como dimensão extra
+
+    Devolve (cubo diário, linhas lidas, se os dados têm a coluna de data).
+    """
+    cubos = []
+    total = 0
+    com_data = False
+    for arquivo in listar_arquivos(caminho):
+        fonte = preparar_cache(arquivo, tamanho_bloco) if usar_cache else arquivo
+        for bloco in ler_blocos(fonte, tamanho_bloco):
+            tipado = normalizar_esquema(bloco)
+            if COLUNA_DATA in tipado:
+                com_data = True
+                tipado['dia'] = tipado[COLUNA_DATA].dt.floor('D').fillna(SEM_DATA)
+            else:
+                tipado['dia'] = SEM_DATA
+            cubos.append(construir_cubo(tipado, inicio=total, dimensoes=DIMENSOES_SERVICO))
+            # Parciais consolidados de tempos em tempos, não a cada bloco (ver ingestao.py)
+            if len(cubos) >= BLOCOS_POR_COMBINACAO:
+                cubos = [combinar_cubos(cubos, DIMENSOES_SERVICO)]
+            total += len(bloco)
+    if not cubos:
+        raise ValueError(f"Nenhuma avaliação encontrada em: {caminho}")
+    cubo = combinar_cubos(cubos, DIMENSOES_SERVICO) if len(cubos) > 1 else cubos[0]
+    return cubo, total, com_data
+
+
+class CacheLRU:
+    """Cache LRU de respostas, seguro entre threads, com contagem de acertos e falhas"""
+
+    def __init__(self, tamanho=TAMANHO_CACHE):
+        self.tamanho = tamanho
+        self._itens = OrderedDict()
+        self._trava = threading.Lock()
+        self.acertos = self.falhas = 0
+
+    def obter(self, chave):
+        """Valor guardado (e marcado como o mais recente), ou None"""
+        with self._trava:
+            valor = self._itens.get(chave)
+            if valor is None:
+                self.falhas += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return valor
+
+    def guardar(self, chave, valor):
+        """Guarda o valor, descartando o usado há mais tempo se o cache estiver cheio"""
+        with self._trava:
+            self._itens[chave] = valor
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.tamanho:
+                self._itens.popitem(last=False)
+
+    def limpar(self):
+        """Esvazia o cache e zera as estatísticas"""
+        with self._trava:
+            self._itens.clear()
+            self.acertos = self.falhas = 0
+
+    def estatisticas(self):
+        """Acertos, falhas e itens guardados"""
+        return {'acertos': self.acertos, 'falhas': self.falhas, 'itens': len(self._itens)}
+
+
+class CuboDiario:
+    """Cubo diário em colunas NumPy ordenadas por dia, para recortes rápidos
+
+    Um intervalo de datas é uma fatia contígua (busca binária nos dias), os
+    filtros por atendente, tipo de contato, opportunity e nota cruzam os
+    índices por valor (indices.py) montados na carga, e a consolidação por
+    célula usa bincount/ufunc.at em vez de um groupby, de modo que cada
+    consulta custa proporcionalmente às linhas do recorte.
+    """
+
+    def __init__(self, cubo):
+        ordem = np.argsort(cubo.index.get_level_values('dia').to_numpy(), kind='stable')
+        cubo = cubo.iloc[ordem]
+        self.linhas = len(cubo)
+        self.dias = cubo.index.get_level_values('dia').to_numpy()
+        self.celulas_dias = cubo.index
+        # Células distintas (sem o dia), em ordem, e a posição da célula de cada linha
+        celulas = cubo.index.droplevel('dia')
+        self.celulas = celulas.unique().sort_values()
+        self.codigos = self.celulas.get_indexer(celulas).astype(np.intp)
+        self.colunas = {coluna: cubo[coluna].to_numpy() for coluna in AGREGACOES}
+        self.indice = IndiceDimensoes(cubo, DIMENSOES)
+
+    def recortar(self, filtros):
+        """Cubo padrão (sem o dia) das avaliações que atendem aos filtros, ou None se não houver nenhuma"""
+        posicoes = self._posicoes(filtros, *self._fatia(filtros))
+        codigos = self.codigos[posicoes]
+        if len(codigos) == 0:
+            return None
+
+        quantidade = len(self.celulas)
+        colunas = {}
+        for coluna, agregacao in AGREGACOES.items():
+            valores = self.colunas[coluna][posicoes]
+            if agregacao == 'sum':
+                colunas[coluna] = np.bincount(codigos, weights=valores, minlength=quantidade).astype(np.int64)
+            else:
+                extremo = np.iinfo(np.int64).max if agregacao == 'min' else np.iinfo(np.int64).min
+                acumulado = np.full(quantidade, extremo, dtype=np.int64)
+                (np.minimum if agregacao == 'min' else np.maximum).at(acumulado, codigos, valores)
+                colunas[coluna] = acumulado
+        presentes = np.bincount(codigos, minlength=quantidade) > 0
+        recorte = pd.DataFrame(colunas, index=self.celulas)[presentes]
+        return restringir_notas(recorte, filtros['notas']) if 'notas' in filtros else recorte
+
+    def temporal(self, filtros):
+        """Cubo temporal (dia × atendente × tipo de contato) do recorte, só com avaliações datadas"""
+        inicio, fim = self._fatia(filtros)
+        inicio = max(inicio, int(np.searchsorted(self.dias, SEM_DATA, side='right')))
+        posicoes = self._posicoes(filtros, inicio, max(inicio, fim))
+        if len(self.codigos[posicoes]) == 0:
+            return None
+        colunas = AGREGACOES if 'notas' in filtros else ('n', 'soma', 'baixas')
+        linhas = pd.DataFrame({coluna: self.colunas[coluna][posicoes] for coluna in colunas},
+                              index=self.celulas_dias[posicoes])
+        if 'notas' in filtros:
+            linhas = restringir_notas(linhas, filtros['notas'])[['n', 'soma', 'baixas']]
+        return linhas.groupby(level=DIMENSOES_TEMPORAIS, sort=True, observed=True).sum()
+
+    def _posicoes(self, filtros, inicio, fim):
+        """Linhas em [início, fim) que atendem aos filtros: a própria fatia, sem filtros, ou as posições do índice"""
+        por_dimensao = {nivel: filtros[parametro] for parametro, nivel in FILTROS.items() if parametro in filtros}
+        posicoes = self.indice.selecionar(por_dimensao, filtros.get('notas'), inicio, fim)
+        return slice(inicio, fim) if posicoes is None else posicoes
+
+    def _fatia(self, filtros):
+        """Início e fim das linhas dentro do intervalo de datas (busca binária nos dias ordenados)"""
+        inicio, fim = 0, self.linhas
+        if 'desde' in filtros or 'ate' in filtros:
+            # Avaliações sem data ficam de fora de qualquer filtro de data
+            inicio = int(np.searchsorted(self.dias, SEM_DATA, side='right'))
+        if 'desde' in filtros:
+            inicio = max(inicio, int(np.searchsorted(self.dias, np.datetime64(filtros['desde']), side='left')))
+        if 'ate' in filtros:
+            fim = int(np.searchsorted(self.dias, np.datetime64(filtros['ate']), side='right'))
+        return inicio, max(inicio, fim)
+
+
+class Estado:
+    """Cubo diário em memória, recarregável; cada recarga incrementa a versão e esvazia o cache"""
+
+    def __init__(self, caminho, tamanho_cache=TAMANHO_CACHE):
+        self.caminho = caminho
+        self.versao = 0
+        self.cache = CacheLRU(tamanho_cache)
+        self._trava = threading.Lock()
+        self.recarregar()
+
+    def recarregar(self):
+        """Relê os arquivos e troca o cubo em memória de uma só vez"""
+        with self._trava:
+            assinatura = self._assinatura()
+            cubo, linhas, com_data = carregar_cubo_diario(self.caminho)
+            self.dados = CuboDiario(cubo)
+            self.linhas, self.com_data, self.assinatura = linhas, com_data, assinatura
+            self.versao += 1
+            self.cache.limpar()
+
+    def mudou(self):
+        """Se algum arquivo de dados foi criado, removido ou alterado desde a última carga"""
+        return self._assinatura() != self.assinatura
+
+    def em_cache(self, numero, filtros):
+        """Resposta já calculada para a consulta, ou None"""
+        return self.cache.obter((self.versao, numero, filtros))
+
+    def consultar(self, numero, filtros):
+        """Calcula a análise `numero` sobre o recorte dos filtros e guarda o corpo JSON no cache
+
+        A versão faz parte da chave: um cálculo que termine depois de uma
+        recarga nunca é servido.
+        """
+        versao, dados = self.versao, self.dados
+        if numero == 10:
+            if not self.com_data:
+                raise ErroConsulta(404, f"Os dados não têm a coluna de data '{COLUNA_DATA}'")
+            recorte = dados.temporal(dict(filtros))
+        else:
+            recorte = dados.recortar(dict(filtros))
+        if recorte is None:
+            raise ErroConsulta(404, "Nenhuma avaliação com esses filtros")
+
+        resultado = CONSULTAS[numero](recorte)
+        corpo = {'analise': numero, 'filtros': {parametro: _serializar(valor) for parametro, valor in filtros},
+                 'versao_dados': versao, 'resultado': _serializar(resultado)}
+        corpo = json.dumps(corpo, ensure_ascii=False).encode('utf-8')
+        self.cache.guardar((versao, numero, filtros), corpo)
+        return corpo
+
+    def _assinatura(self):
+        """Tamanho e data de modificação de cada arquivo de dados"""
+        assinatura = []
+        for arquivo in listar_arquivos(self.caminho):
+            estado = os.stat(arquivo)
+            assinatura.append((arquivo, estado.st_size, estado.st_mtime_ns))
+        return tuple(assinatura)
+
+
+def ler_filtros(consulta):
+    """Converte a query string em filtros normalizados (tupla ordenada, usada como chave do cache)"""
+    parametros = parse_qs(consulta, keep_blank_values=False)
+    desconhecidos = set(parametros) - set(FILTROS) - {'notas', 'desde', 'ate'}
+    if desconhecidos:
+        raise ErroConsulta(400, f"Parâmetros desconhecidos: {', '.join(sorted(desconhecidos))}")
+    filtros = {}
+    for parametro in FILTROS:
+        if parametro in parametros:
+            valores = [valor.strip() for texto in parametros[parametro] for valor in texto.split(',')]
+            filtros[parametro] = tuple(sorted(set(valor for valor in valores if valor)))
+    if 'notas' in parametros:
+        valores = [valor.strip() for texto in parametros['notas'] for valor in texto.split(',') if valor.strip()]
+        if not all(valor.isdigit() and int(valor) in NOTAS for valor in valores):
+            raise ErroConsulta(400, f"Notas inválidas: {', '.join(valores)} (válidas: {NOTAS[0]} a {NOTAS[-1]})")
+        filtros['notas'] = tuple(sorted(set(map(int, valores))))
+    for parametro in ('desde', 'ate'):
+        if parametro in parametros:
+            try:
+                filtros[parametro] = pd.Timestamp(parametros[parametro][-1])
+            except ValueError:
+                raise ErroConsulta(400, f"Data inválida em '{parametro}': {parametros[parametro][-1]!r}")
+    return tuple(sorted(filtros.items()))
+
+
+def _serializar(valor):
+    """Converte o resultado da API (dataclass com tabelas) em estruturas JSON"""
+    if dataclasses.is_dataclass(valor):
+        return {campo.name: _serializar(getattr(valor, campo.name)) for campo in dataclasses.fields(valor)}
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        return json.loads(valor.to_json(orient='split', date_format='iso', force_ascii=False))
+    if isinstance(valor, pd.Timestamp):
+        return valor.date().isoformat()
+    if isinstance(valor, tuple):
+        return list(valor)
+    if hasattr(valor, 'item'):
+        return valor.item()
+    return valor
+
+
+# ============================================================================
+# SERVIDOR HTTP (asyncio)
+# ============================================================================
+
+async def atender(estado, leitor, escritor):
+    """Atende uma conexão HTTP/1.1, com keep-alive, até o cliente fechar"""
+    laco = asyncio.get_running_loop()
+    try:
+        while True:
+            linha = await leitor.readline()
+            if not linha:
+                break
+            try:
+                metodo, alvo, _ = linha.decode('latin-1').split(' ', 2)
+            except ValueError:
+                await _responder(escritor, 400, {'erro': 'Requisição inválida'}, fechar=True)
+                break
+            cabecalhos = {}
+            while True:
+                cabecalho = await leitor.readline()
+                if cabecalho in (b'\r\n', b'\n', b''):
+                    break
+                nome, _, valor = cabecalho.decode('latin-1').partition(':')
+                cabecalhos[nome.strip().lower()] = valor.strip()
+            if int(cabecalhos.get('content-length', 0) or 0):
+                await leitor.readexactly(int(cabecalhos['content-length']))
+
+            fechar = cabecalhos.get('connection', '').lower() == 'close'
+            status, corpo = await _rotear(estado, laco, metodo, alvo)
+            await _responder(escritor, status, corpo, fechar)
+            if fechar:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        escritor.close()
+
+
+async def _rotear(estado, laco, metodo, alvo):
+    """Executa a rota pedida e devolve (status, corpo)"""
+    url = urlsplit(alvo)
+    partes = [parte for parte in url.path.split('/') if parte]
+    try:
+        if metodo == 'GET' and len(partes) == 2 and partes[0] == 'analises':
+            if not partes[1].isdigit() or int(partes[1]) not in CONSULTAS:
+                raise ErroConsulta(404, f"Análise inexistente: {partes[1]} (disponíveis: 1 a {max(CONSULTAS)})")
+            numero, filtros = int(partes[1]), ler_filtros(url.query)
+            # Resposta em cache sai direto; senão o cálculo roda numa thread para não travar o laço
+            corpo = estado.em_cache(numero, filtros)
+            if corpo is None:
+                corpo = await laco.run_in_executor(None, estado.consultar, numero, filtros)
+            return 200, corpo
+        if metodo == 'GET' and partes == ['saude']:
+            return 200, {'linhas': estado.linhas, 'versao_dados': estado.versao, 'celulas': estado.dados.linhas,
+                         'cache': estado.cache.estatisticas()}
+        if metodo == 'POST' and partes == ['recarregar']:
+            await laco.run_in_executor(None, estado.recarregar)
+            return 200, {'linhas': estado.linhas, 'versao_dados': estado.versao}
+        raise ErroConsulta(404, f"Rota inexistente: {metodo} {url.path}")
+    except ErroConsulta as erro:
+        return erro.status, {'erro': str(erro)}
+
+
+async def _responder(escritor, status, corpo, fechar=False):
+    """Grava a resposta HTTP com corpo JSON"""
+    if not isinstance(corpo, bytes):
+        corpo = json.dumps(corpo, ensure_ascii=False).encode('utf-8')
+    motivo = {200: 'OK', 400: 'Bad Request', 404: 'Not Found'}.get(status, '')
+    escritor.write(
+        f"HTTP/1.1 {status} {motivo}\r\n"
+        f"Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(corpo)}\r\n"
+        f"Connection: {'close' if fechar else 'keep-alive'}\r\n\r\n".encode('latin-1') + corpo)
+    await escritor.drain()
+
+
+async def vigiar(estado, intervalo):
+    """Recarrega os dados (e invalida o cache) quando algum arquivo muda"""
+    laco = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(intervalo)
+        if await laco.run_in_executor(None, estado.mudou):
+            await laco.run_in_executor(None, estado.recarregar)
+            print(f"🔄 Dados recarregados: {estado.linhas} linhas (versão {estado.versao})", flush=True)
+
+
+async def servir(caminho, host='127.0.0.1', porta=8000, intervalo_vigia=None, tamanho_cache=TAMANHO_CACHE):
+    """Carrega os dados e atende até ser interrompido"""
+    estado = Estado(caminho, tamanho_cache)
+    servidor = await asyncio.start_server(lambda leitor, escritor: atender(estado, leitor, escritor), host, porta)
+    print(f"Serviço CSAT em http://{host}:{porta} ({estado.linhas} linhas, {estado.dados.linhas} células)",
+          flush=True)
+    vigia = asyncio.ensure_future(vigiar(estado, intervalo_vigia)) if intervalo_vigia else None
+    async with servidor:
+        await servidor.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('dados', nargs='?', default='analise_suporte.xlsx',
+                        help="arquivo, pasta ou padrão glob com os dados de CSAT")
+    parser.add_argument('--host', default='127.0.0.1', help="endereço de escuta (padrão: 127.0.0.1)")
+    parser.add_argument('--porta', type=int, default=8000, help="porta de escuta (padrão: 8000)")
+    parser.add_argument('--vigiar', type=float, default=None, metavar='SEGUNDOS',
+                        help="verifica os arquivos a cada SEGUNDOS e recarrega quando mudam")
+    parser.add_argument('--tamanho-cache', type=int, default=TAMANHO_CACHE,
+                        help=f"respostas guardadas no cache LRU (padrão: {TAMANHO_CACHE})")
+    args = parser.parse_args()
+    try:
+        asyncio.run(servir(args.dados, args.host, args.porta, args.vigiar, args.tamanho_cache))
+    except KeyboardInterrupt:
+        pass
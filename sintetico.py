@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# GERADOR DE DADOS SINTÉTICOS CSAT
+# Produz planilhas com o mesmo esquema de analise_suporte.xlsx para medir
+# o desempenho do projeto com volumes maiores.
+# ============================================================================
+
+OPPORTUNITIES_REAIS = ['operacional', 'fluxo do processo', 'cliente resistente']
+
+
+def gerar_dados(linhas, atendentes=10, tipos_contato=7, opportunities=3, assimetria=0.0, dias=None,
+                semente=0):
+    """Gera um DataFrame com as colunas attendant, contact type, csat e opportunity
+
+    `assimetria` inclina a distribuição das notas: 0 é uniforme, valores
+    positivos concentram as notas altas e negativos as baixas. Com `dias`
+    acrescenta a coluna date, espalhada pelos `dias` dias anteriores a 2025.
+    """
+    gerador = np.random.default_rng(semente)
+    nomes_atendentes = [f'Atendente {i:04d}' for i in range(1, atendentes + 1)]
+    nomes_tipos = [f'tipo de contato {i:03d}' for i in range(1, tipos_contato + 1)]
+    nomes_opportunities = (OPPORTUNITIES_REAIS + [
+        f'opportunity {i:03d}' for i in range(len(OPPORTUNITIES_REAIS) + 1, opportunities + 1)
+    ])[:opportunities]
+
+    if assimetria:
+        pesos = np.exp(assimetria * np.arange(5))
+        notas = gerador.choice(np.arange(1, 6), size=linhas, p=pesos / pesos.sum())
+    else:
+        notas = gerador.integers(1, 6, linhas)
+
+    dados = pd.DataFrame({
+        'attendant': np.asarray(nomes_atendentes, dtype=object)[gerador.integers(0, atendentes, linhas)],
+        'contact type': np.asarray(nomes_tipos, dtype=object)[gerador.integers(0, tipos_contato, linhas)],
+        'csat': notas,
+        'opportunity': np.asarray(nomes_opportunities, dtype=object)[gerador.integers(0, opportunities, linhas)],
+    })
+    if dias:
+        dados['date'] = pd.Timestamp('2025-01-01') - pd.to_timedelta(gerador.integers(1, dias + 1, linhas), unit='D')
+    return dados
+
+
+def gerar_blocos(linhas, tamanho_bloco=1_000_000, semente=0, **parametros):
+    """Gera os dados em blocos (cada um com sua semente), para volumes que não cabem na memória"""
+    for numero, inicio in enumerate(range(0, linhas, tamanho_bloco)):
+        yield gerar_dados(min(tamanho_bloco, linhas - inicio), semente=semente + numero, **parametros)
+
+
+def salvar_parquet(caminho, linhas, tamanho_bloco=1_000_000, **parametros):
+    """Grava dados sintéticos em Parquet, um row group por bloco, sem montar tudo na memória"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    escritor = None
+    try:
+        for bloco in gerar_blocos(linhas, tamanho_bloco, **parametros):
+            tabela = pa.Table.from_pandas(bloco, preserve_index=False)
+            if escritor is None:
+                escritor = pq.ParquetWriter(caminho, tabela.schema)
+            escritor.write_table(tabela)
+    finally:
+        if escritor is not None:
+            escritor.close()
+
+
+def salvar_planilha(df, caminho):
+    """Grava o DataFrame em XLSX com o openpyxl em modo de escrita contínua"""
+    from openpyxl import Workbook
+
+    planilha = Workbook(write_only=True)
+    aba = planilha.create_sheet()
+    aba.append(list(df.columns))
+    for linha in df.itertuples(index=False, name=None):
+        aba.append([valor.item() if isinstance(valor, np.generic) else valor for valor in linha])
+    planilha.save(caminho)
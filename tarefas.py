@@ -0,0 +1,94 @@
+import io
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# ============================================================================
+# GRAFO DE TAREFAS
+# Cada tarefa declara de quais outras depende; só as tarefas necessárias
+# para os alvos pedidos são executadas, e as independentes rodam juntas.
+# ============================================================================
+
+
+def tarefas_necessarias(grafo, alvos):
+    """Alvos mais todas as tarefas das quais eles dependem, direta ou indiretamente"""
+    necessarias = set()
+    pendentes = list(alvos)
+    while pendentes:
+        tarefa = pendentes.pop()
+        if tarefa not in grafo:
+            raise ValueError(f"Tarefa desconhecida: {tarefa}")
+        if tarefa not in necessarias:
+            necessarias.add(tarefa)
+            pendentes.extend(grafo[tarefa][1])
+    return necessarias
+
+
+def ondas_execucao(grafo, alvos):
+    """Agrupa as tarefas necessárias em ondas; cada onda depende só das anteriores"""
+    restantes = tarefas_necessarias(grafo, alvos)
+    concluidas = set()
+    ondas = []
+    while restantes:
+        onda = sorted(tarefa for tarefa in restantes if set(grafo[tarefa][1]) <= concluidas)
+        if not onda:
+            raise ValueError(f"Dependência circular entre as tarefas: {sorted(restantes)}")
+        ondas.append(onda)
+        concluidas.update(onda)
+        restantes.difference_update(onda)
+    return ondas
+
+
+def executar_grafo(grafo, alvos, trabalhadores=None):
+    """Executa as tarefas necessárias e devolve (resultados, saídas impressas por tarefa)
+
+    O grafo é um dicionário `{tarefa: (funcao, dependencias)}`; cada função
+    recebe os resultados das suas dependências, na ordem declarada. O que
+    cada tarefa imprime é capturado separadamente, para ser exibido na ordem
+    certa mesmo quando as tarefas rodam em paralelo.
+    """
+    resultados = {}
+    saidas = {}
+    saida = _SaidaPorTarefa(sys.stdout)
+
+    def executar(tarefa):
+        funcao, dependencias = grafo[tarefa]
+        saida.capturar()
+        try:
+            return funcao(*(resultados[dependencia] for dependencia in dependencias))
+        finally:
+            saidas[tarefa] = saida.liberar()
+
+    sys.stdout = saida
+    try:
+        with ThreadPoolExecutor(max_workers=trabalhadores) as executor:
+            for onda in ondas_execucao(grafo, alvos):
+                futuros = {tarefa: executor.submit(executar, tarefa) for tarefa in onda}
+                for tarefa, futuro in futuros.items():
+                    resultados[tarefa] = futuro.result()
+    finally:
+        sys.stdout = saida.original
+    return resultados, saidas
+
+
+class _SaidaPorTarefa(io.TextIOBase):
+    """Substituto do stdout que separa o texto impresso por cada thread"""
+
+    def __init__(self, original):
+        self.original = original
+        self.local = threading.local()
+
+    def capturar(self):
+        self.local.buffer = io.StringIO()
+
+    def liberar(self):
+        texto = self.local.buffer.getvalue()
+        self.local.buffer = None
+        return texto
+
+    def write(self, texto):
+        buffer = getattr(self.local, 'buffer', None)
+        return (self.original if buffer is None else buffer).write(texto)
+
+    def flush(self):
+        self.original.flush()
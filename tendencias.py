@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+from esquema import COLUNA_DATA, LIMITE_NOTA_BAIXA
+
+# ============================================================================
+# CUBO TEMPORAL E TENDÊNCIAS
+# As notas são pré-agregadas por dia × atendente × tipo de contato; semanas e
+# meses saem desse cubo, e as médias móveis são calculadas de uma vez para
+# todos os grupos sobre a grade período × grupo.
+# ============================================================================
+
+DIMENSOES_TEMPORAIS = ['dia', 'attendant', 'contact type']
+
+# Frequência do pandas e tamanho da janela móvel (em períodos) de cada granularidade
+FREQUENCIAS = {
+    'diária': ('D', 7),
+    'semanal': ('W-SUN', 4),
+    'mensal': ('MS', 3),
+}
+
+
+def construir_cubo_temporal(df):
+    """Conta avaliações, soma das notas e notas baixas por dia, atendente e tipo de contato
+
+    Devolve None quando os dados não têm a coluna de data; linhas sem data
+    válida ficam de fora, e as sem atendente ou tipo de contato formam um
+    grupo próprio (ver `cubo.construir_cubo`).
+    """
+    if COLUNA_DATA not in df:
+        return None
+    validas = df['csat'].notna() & df[COLUNA_DATA].notna()
+    if not validas.all():
+        df = df[validas]
+    csat = df['csat']
+    if csat.dtype.kind in 'iu':
+        csat = csat.astype(np.int64)
+    linhas = pd.DataFrame({
+        'dia': df[COLUNA_DATA].dt.floor('D'),
+        'attendant': df['attendant'],
+        'contact type': df['contact type'],
+        'n': csat.notna().astype(np.int64),
+        'soma': csat,
+        'baixas': (df['nota_baixa'] if 'nota_baixa' in df else csat < LIMITE_NOTA_BAIXA).astype(np.int64),
+    })
+    return linhas.groupby(DIMENSOES_TEMPORAIS, sort=True, observed=True, dropna=False).sum()
+
+
+def combinar_cubos_temporais(cubos):
+    """Junta cubos temporais parciais (blocos, arquivos) em um único cubo"""
+    cubos = [cubo for cubo in cubos if cubo is not None]
+    if not cubos:
+        return None
+    return pd.concat(cubos).groupby(level=DIMENSOES_TEMPORAIS, sort=True, observed=True, dropna=False).sum()
+
+
+def tendencias(temporal, dimensao, frequencia='semanal'):
+    """Média CSAT e taxa de notas baixas por período e a média móvel de cada grupo
+
+    Os períodos sem avaliações contam como zero na janela, e a janela móvel
+    é calculada para todos os grupos numa única operação sobre a grade.
+    """
+    regra, janela = FREQUENCIAS[frequencia]
+    por_periodo = temporal.groupby(
+        [pd.Grouper(level='dia', freq=regra), pd.Grouper(level=dimensao)], observed=True).sum()
+    por_periodo.index = por_periodo.index.set_names(['periodo', dimensao])
+
+    # Grade completa período × grupo (períodos vazios ficam com zero)
+    periodos = pd.date_range(por_periodo.index.get_level_values('periodo').min(),
+                             por_periodo.index.get_level_values('periodo').max(), freq=regra)
+    grades = {coluna: por_periodo[coluna].unstack(dimensao, fill_value=0).reindex(periodos, fill_value=0)
+              for coluna in ('n', 'soma', 'baixas')}
+    moveis = {coluna: grade.rolling(janela, min_periods=1).sum() for coluna, grade in grades.items()}
+
+    tabela = pd.DataFrame({
+        'n': grades['n'].stack(),
+        'media': (grades['soma'] / grades['n'].replace(0, np.nan)).stack(),
+        'n_janela': moveis['n'].stack(),
+        'media_movel': (moveis['soma'] / moveis['n'].replace(0, np.nan)).stack(),
+        'taxa_baixas_movel': (moveis['baixas'] / moveis['n'].replace(0, np.nan)).stack(),
+    })
+    tabela.index = tabela.index.set_names(['periodo', dimensao])
+    return tabela
+
+
+def variacao_recente(tabela, dimensao, frequencia='semanal'):
+    """Diferença entre a última janela móvel de cada grupo e a janela imediatamente anterior"""
+    _, janela = FREQUENCIAS[frequencia]
+    media = tabela['media_movel'].unstack(dimensao)
+    taxa = tabela['taxa_baixas_movel'].unstack(dimensao)
+    anterior = -1 - janela
+    if len(media) <= janela:
+        anterior = 0
+    variacao = pd.DataFrame({
+        'Média Atual': media.iloc[-1],
+        'Média Anterior': media.iloc[anterior],
+        'Variação Média': media.iloc[-1] - media.iloc[anterior],
+        'Taxa Baixas Atual (%)': taxa.iloc[-1] * 100,
+        'Variação Taxa (p.p.)': (taxa.iloc[-1] - taxa.iloc[anterior]) * 100,
+    }).round(2)
+    variacao['Avaliações na Janela'] = tabela['n_janela'].unstack(dimensao).iloc[-1].astype(np.int64)
+    return variacao
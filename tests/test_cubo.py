@@ -0,0 +1,40 @@
+import pandas as pd
+
+import api
+from cubo import construir_cubo, combinar_cubos, totais
+from esquema import normalizar_esquema
+
+
+def avaliacoes_com_rotulos_ausentes():
+    return pd.DataFrame({
+        'attendant': ['A', 'A', 'B', None],
+        'contact type': ['x', None, 'x', 'y'],
+        'opportunity': ['o', 'o', None, 'o'],
+        'csat': [5, 1, 3, 2],
+    })
+
+
+def test_rotulo_ausente_continua_nas_estatisticas_do_atendente():
+    tabela = api.resultados_individuais(avaliacoes_com_rotulos_ausentes()).tabela
+    assert tabela.loc['A', 'Média'] == 3.0
+    assert tabela.loc['B', 'Média'] == 3.0
+    assert list(tabela.index) == ['A', 'B']
+
+
+def test_rotulo_ausente_entra_nos_totais_e_sobrevive_a_combinacao():
+    df = avaliacoes_com_rotulos_ausentes()
+    tipado = normalizar_esquema(df)
+    cubo = construir_cubo(tipado)
+    assert cubo['n'].sum() == len(df)
+    assert totais(cubo)['soma'] == df['csat'].sum()
+
+    # Em blocos, as células de rótulo ausente se juntam como as demais
+    combinado = combinar_cubos([construir_cubo(tipado.iloc[:2]), construir_cubo(tipado.iloc[2:], inicio=2)])
+    assert combinado['n'].sum() == len(df)
+    assert combinado['primeira_ocorrencia'].min() == 0
+
+
+def test_ranking_de_tipos_ignora_so_o_tipo_ausente():
+    tabela = api.ranking_tipos_contato(avaliacoes_com_rotulos_ausentes()).tabela
+    assert tabela.loc['x', 'Total Avaliações'] == 2
+    assert tabela['Total Avaliações'].sum() == 3
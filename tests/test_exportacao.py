@@ -0,0 +1,10 @@
+import pandas as pd
+
+from exportacao import tabelas_resultados
+
+
+def test_dicionario_seguido_de_tabela_usa_os_nomes_das_analises():
+    tabela = pd.DataFrame({'n': [1, 2]})
+    nomes = {1: 'por_atendente', 2: 'por_tipo'}
+    tabelas = tabelas_resultados({1: {'x': tabela}, 2: tabela}, nomes)
+    assert list(tabelas) == ['01_por_atendente_x', '02_por_tipo']
@@ -0,0 +1,13 @@
+import numpy as np
+
+from risco import estimativa_bayes, priori_beta
+
+
+def test_priori_sem_avaliacoes_e_uniforme():
+    alfa, beta = priori_beta([0, 0], [0, 0])
+    assert (alfa, beta) == (1.0, 1.0)
+    assert np.isfinite(estimativa_bayes([0, 0], [0, 0], alfa, beta)).all()
+
+
+def test_priori_vazia_e_uniforme():
+    assert priori_beta([], []) == (1.0, 1.0)